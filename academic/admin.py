@@ -1,10 +1,14 @@
 from django.contrib import admin
 
+from .models.attendance_summaries import StudentAttendanceSummary
 from .models.lesson import Lesson, Attendance
+from .models.term_positions import TermPosition
 from .models.term_results import TermResult
 from .models.exams import Exam
 
 admin.site.register(Lesson)
 admin.site.register(Attendance)
+admin.site.register(StudentAttendanceSummary)
 admin.site.register(TermResult)
+admin.site.register(TermPosition)
 admin.site.register(Exam)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AcademicConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'academic'
+
+    def ready(self):
+        # keeping assessments and attendance summaries in sync with their sources
+        from academic import signals  # noqa: F401
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.methods.positions import rank_term_results
+from academic.methods.term_results import compute_term_results
+from academic.models.marks import Mark
+from institutions.methods.academic_year import get_active_academic_year
+from institutions.models.class_subjects import ClassSubject
+from institutions.models.institution import Institution
+from institutions.models.terms import Terms
+
+# class subjects computed per transaction
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = 'Computes the term results of every class subject with marks in a term, for the active academic years'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--term', type=int, required=True)
+        parser.add_argument('--institution', type=int, help='only compute the results of this institution')
+        parser.add_argument('--class-subject', type=int, help='only compute the results of this class subject')
+
+    def handle(self, *args, **options):
+        term = Terms.objects.filter(pk=options['term']).first()
+        if term is None:
+            raise CommandError('Term not found')
+
+        institutions = Institution.objects.all()
+        if options.get('institution'):
+            institutions = institutions.filter(pk=options['institution'])
+
+        for institution in institutions.order_by('id'):
+            academic_year = get_active_academic_year(institution)
+            if academic_year is None:
+                continue
+
+            class_subject_ids = ClassSubject.objects.filter(
+                _class__institution=institution,
+                id__in=Mark.objects.filter(term=term, academic_year=academic_year).values('class_subject_id')
+            ).order_by('id').values_list('id', flat=True)
+
+            if options.get('class_subject'):
+                class_subject_ids = class_subject_ids.filter(pk=options['class_subject'])
+
+            class_subject_ids = list(class_subject_ids)
+
+            for index in range(0, len(class_subject_ids), BATCH_SIZE):
+                counts = compute_term_results(class_subject_ids[index:index + BATCH_SIZE], term, academic_year)
+                self.stdout.write(
+                    f'{institution}: {counts["created"]} term results created, {counts["updated"]} updated'
+                )
+
+            if class_subject_ids:
+                rank_term_results(term, academic_year)
+
+        self.stdout.write(self.style.SUCCESS('term results computed'))
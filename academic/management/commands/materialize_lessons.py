@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.methods.lessons import materialize_active_lessons
+from institutions.models.institution import Institution
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'{value} is not a YYYY-MM-DD date')
+
+
+class Command(BaseCommand):
+    help = 'Creates the dated lessons of every timetabled period for the active academic years'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--institution', type=int, help='only create the lessons of this institution')
+        parser.add_argument('--start', type=parse_date, help='first date (YYYY-MM-DD), today by default')
+        parser.add_argument('--end', type=parse_date, help='last date (YYYY-MM-DD), the end of the academic year '
+                                                           'by default')
+
+    def handle(self, *args, **options):
+        counts = materialize_active_lessons(options.get('start'), options.get('end'), options.get('institution'))
+
+        institutions = Institution.objects.in_bulk(counts.keys())
+        for institution_id, count in counts.items():
+            self.stdout.write(f'{institutions[institution_id]}: {count} lessons')
+
+        self.stdout.write(self.style.SUCCESS('lessons materialized'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.methods.positions import rank_term_results
+from institutions.methods.academic_year import get_active_academic_year
+from institutions.models.institution import Institution
+from institutions.models.terms import Terms
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the subject, class and grade positions of a term for the active academic years'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--term', type=int, required=True)
+        parser.add_argument('--institution', type=int, help='only rank the results of this institution')
+
+    def handle(self, *args, **options):
+        term = Terms.objects.filter(pk=options['term']).first()
+        if term is None:
+            raise CommandError('Term not found')
+
+        institutions = Institution.objects.all()
+        if options.get('institution'):
+            institutions = institutions.filter(pk=options['institution'])
+
+        for institution in institutions.order_by('id'):
+            academic_year = get_active_academic_year(institution)
+            if academic_year is None:
+                continue
+
+            count = rank_term_results(term, academic_year)
+            self.stdout.write(f'{institution}: {count} term positions')
+
+        self.stdout.write(self.style.SUCCESS('term results ranked'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.methods.attendance_summaries import rebuild_attendance_summaries
+from institutions.models.academic_years import AcademicYear
+
+
+class Command(BaseCommand):
+    help = 'Recounts the per-student attendance ledger from the attendance table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--academic-year', type=int, help='only recount this academic year')
+
+    def handle(self, *args, **options):
+        academic_year = None
+        if options.get('academic_year'):
+            academic_year = AcademicYear.objects.filter(pk=options['academic_year']).first()
+            if academic_year is None:
+                raise CommandError('AcademicYear not found')
+
+        count = rebuild_attendance_summaries(academic_year)
+        self.stdout.write(self.style.SUCCESS(f'{count} attendance summaries stored'))
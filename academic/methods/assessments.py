@@ -0,0 +1,46 @@
+from academic.models.assessments import Assessment
+
+# assessment_type -> date field of the source model
+ASSESSMENT_DATE_FIELDS = {
+    'assignment': 'due_date',
+    'exam': 'date',
+}
+
+
+def get_assessment_values(source, assessment_type) -> dict:
+    return {
+        'class_subject_id': source.class_subject_id,
+        'title': source.title,
+        'max_marks': source.max_marks,
+        'marking_criterion_id': source.marking_criterion_id,
+        'academic_year_id': source.academic_year_id,
+        'term_id': source.term_id,
+        'date': getattr(source, ASSESSMENT_DATE_FIELDS[assessment_type]),
+    }
+
+
+def sync_assessment(source, assessment_type) -> Assessment:
+    """
+    Creates or updates the Assessment row of an assignment or exam
+    :param source: Assignment | Exam
+    :param assessment_type: assignment | exam
+    :return: Assessment
+    """
+    assessment, _ = Assessment.objects.update_or_create(
+        assessment_type=assessment_type,
+        **{assessment_type: source},
+        defaults=get_assessment_values(source, assessment_type),
+    )
+    return assessment
+
+
+def get_assessment_id(assessment_type, source_id):
+    """
+    Resolves the Assessment of a legacy (assessment_type, assessment_id) pair
+    :param assessment_type: assignment | exam
+    :param source_id: pk of the assignment or exam
+    :return: pk | None
+    """
+    if assessment_type not in ASSESSMENT_DATE_FIELDS:
+        return None
+    return Assessment.objects.filter(**{f'{assessment_type}_id': source_id}).values_list('id', flat=True).first()
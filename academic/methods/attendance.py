@@ -0,0 +1,105 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from academic.methods.attendance_summaries import apply_attendance_deltas, get_attendance_deltas, get_summary_key
+from academic.models.lesson import Attendance, Lesson
+from academic.signals import attendance_roster_saved
+
+
+def get_or_create_lesson(period_id, date, academic_year):
+    # lessons are usually materialized ahead of time, the (period, date) constraint settles concurrent creations
+    lesson, _ = Lesson.objects.get_or_create(period_id=period_id, date=date, defaults={'academic_year': academic_year})
+    return lesson
+
+
+def submit_roster_attendance(period_id, date, term_id, records, academic_year):
+    """
+    Upserts the attendance of a roster of students for the lesson of a period and date in one transaction.
+    The lesson row is locked so concurrent submissions for the same lesson are applied one after the other;
+    existing rows are updated with one bulk update and missing rows inserted with one bulk insert.
+    The students' attendance ledger counters are moved in the same transaction.
+    :param period_id: pk
+    :param date: date
+    :param term_id: pk | None
+    :param records: list of {'student': pk, 'attendance_group': pk}, the last entry of a student wins
+    :param academic_year: AcademicYear
+    :return: Lesson
+    """
+    groups = {record['student']: record['attendance_group'] for record in records}
+    now = timezone.now()
+
+    with transaction.atomic():
+        lesson = get_or_create_lesson(period_id, date, academic_year)
+        Lesson.objects.select_for_update().filter(pk=lesson.pk).first()
+
+        existing = {
+            attendance.student_id: attendance
+            for attendance in Attendance.objects.filter(lesson=lesson, student_id__in=groups)
+        }
+
+        changes = []
+        deltas = Counter()
+        to_update = []
+        to_create = []
+
+        for student_id, attendance_group_id in groups.items():
+            attendance = existing.get(student_id)
+
+            if attendance is None:
+                to_create.append(Attendance(
+                    lesson=lesson,
+                    student_id=student_id,
+                    attendance_group_id=attendance_group_id,
+                    academic_year=academic_year,
+                    term_id=term_id,
+                ))
+                changes.append((student_id, None, attendance_group_id))
+                deltas.update(get_attendance_deltas(key=get_summary_key(to_create[-1])))
+                continue
+
+            changes.append((student_id, attendance.attendance_group_id, attendance_group_id))
+            previous_key = get_summary_key(attendance)
+            attendance.attendance_group_id = attendance_group_id
+            attendance.academic_year = academic_year
+            attendance.term_id = term_id
+            attendance.updated_at = now
+            to_update.append(attendance)
+            deltas.update(get_attendance_deltas(previous_key, get_summary_key(attendance)))
+
+        Attendance.objects.bulk_update(to_update, ['attendance_group', 'academic_year', 'term', 'updated_at'])
+        Attendance.objects.bulk_create(to_create)
+        apply_attendance_deltas(deltas)
+
+        transaction.on_commit(lambda: attendance_roster_saved.send(sender=Attendance, lesson=lesson, changes=changes))
+
+    return lesson
+
+
+def get_attendance_summary(queryset) -> list:
+    """
+    Counts attendance rows per class subject and attendance group in one grouped query
+    :param queryset: Queryset of Attendance
+    :return: list of {'class_subject', 'lessons', 'attendance_groups': [{'attendance_group', 'name', 'count'}]}
+    """
+    rows = queryset.values(
+        'lesson__period__class_subject_id', 'attendance_group_id', 'attendance_group__name'
+    ).annotate(count=Count('id')).order_by('lesson__period__class_subject_id', 'attendance_group_id')
+
+    summary = {}
+    for row in rows:
+        class_subject = summary.setdefault(row['lesson__period__class_subject_id'], {
+            'class_subject': row['lesson__period__class_subject_id'],
+            'lessons': 0,
+            'attendance_groups': [],
+        })
+        class_subject['lessons'] += row['count']
+        class_subject['attendance_groups'].append({
+            'attendance_group': row['attendance_group_id'],
+            'name': row['attendance_group__name'],
+            'count': row['count'],
+        })
+
+    return list(summary.values())
@@ -0,0 +1,149 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Q, Sum
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from academic.models.attendance_summaries import StudentAttendanceSummary
+from academic.models.lesson import Attendance
+
+# attendance rate (%) below which a student is chronically absent
+CHRONIC_ABSENCE_THRESHOLD = 80
+
+
+def get_summary_key(row) -> tuple:
+    """
+    Returns the ledger counter an attendance row counts in, or the key of a ledger counter
+    :param row: Attendance | StudentAttendanceSummary
+    :return: tuple (student_id, academic_year_id, term_id, attendance_group_id)
+    """
+    return row.student_id, row.academic_year_id, row.term_id, row.attendance_group_id
+
+
+def get_attendance_deltas(previous_key=None, key=None) -> Counter:
+    """
+    Returns the counter changes of an attendance row moving from one counter to another
+    :param previous_key: summary key before the write, None for a new row
+    :param key: summary key after the write, None for a deleted row
+    :return: Counter summary key -> int
+    """
+    deltas = Counter()
+    if previous_key is not None:
+        deltas[previous_key] -= 1
+    if key is not None:
+        deltas[key] += 1
+    return deltas
+
+
+def apply_attendance_deltas(deltas):
+    """
+    Adds counter changes to the ledger in the current transaction.
+    Missing counters are inserted first, skipping existing ones, so concurrent writers never collide on insert;
+    the counters are then locked in id order and changed with one bulk update.
+    :param deltas: dict summary key -> int
+    :return: None
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        StudentAttendanceSummary.objects.bulk_create([
+            StudentAttendanceSummary(
+                student_id=student_id,
+                academic_year_id=academic_year_id,
+                term_id=term_id,
+                attendance_group_id=attendance_group_id,
+            ) for student_id, academic_year_id, term_id, attendance_group_id in deltas
+        ], ignore_conflicts=True)
+
+        summaries = StudentAttendanceSummary.objects.select_for_update().filter(
+            student__in={key[0] for key in deltas}, academic_year__in={key[1] for key in deltas}
+        ).order_by('id')
+
+        to_update = []
+        for summary in summaries:
+            delta = deltas.get(get_summary_key(summary))
+            if not delta:
+                continue
+            summary.count += delta
+            summary.updated_at = now
+            to_update.append(summary)
+
+        StudentAttendanceSummary.objects.bulk_update(to_update, ['count', 'updated_at'], batch_size=1000)
+
+
+def rebuild_attendance_summaries(academic_year=None) -> int:
+    """
+    Recounts the ledger from the attendance table with one grouped query, replacing the stored counters
+    :param academic_year: AcademicYear | None for every academic year
+    :return: number of counters stored
+    """
+    attendance = Attendance.objects.all()
+    summaries = StudentAttendanceSummary.objects.all()
+    if academic_year is not None:
+        attendance = attendance.filter(academic_year=academic_year)
+        summaries = summaries.filter(academic_year=academic_year)
+
+    with transaction.atomic():
+        summaries.delete()
+
+        rows = attendance.values(
+            'student_id', 'academic_year_id', 'term_id', 'attendance_group_id'
+        ).annotate(count=Count('id')).order_by()
+
+        created = StudentAttendanceSummary.objects.bulk_create(
+            [StudentAttendanceSummary(**row) for row in rows], batch_size=1000
+        )
+
+    return len(created)
+
+
+def get_attendance_rates(summaries):
+    """
+    Aggregates ledger counters into one attendance rate per student
+    :param summaries: Queryset of StudentAttendanceSummary
+    :return: Queryset of dicts with the student, lessons, present and rate (%)
+    """
+    return summaries.values(
+        'student_id', 'student__student_id', 'student__first_name', 'student__last_name', 'student__grade_id'
+    ).annotate(
+        lessons=Sum('count'),
+        present=Coalesce(Sum('count', filter=Q(attendance_group__counts_as_present=True)), 0),
+    ).filter(
+        lessons__gt=0
+    ).annotate(
+        rate=ExpressionWrapper(Cast('present', FloatField()) * 100 / F('lessons'), output_field=FloatField())
+    )
+
+
+def get_chronic_absentees(institution, academic_year, term=None, threshold=CHRONIC_ABSENCE_THRESHOLD) -> list:
+    """
+    Lists the students of an institution whose attendance rate is below the threshold, lowest rate first.
+    Reads the ledger only, a few rows per student, never the attendance table.
+    :param institution: Institution
+    :param academic_year: AcademicYear
+    :param term: pk | None for the whole academic year
+    :param threshold: attendance rate (%)
+    :return: list of dicts
+    """
+    summaries = StudentAttendanceSummary.objects.filter(
+        student__institution=institution, academic_year=academic_year
+    )
+    if term is not None:
+        summaries = summaries.filter(term=term)
+
+    rates = get_attendance_rates(summaries).filter(rate__lt=threshold).order_by('rate', 'student_id')
+
+    return [{
+        'student': rate['student_id'],
+        'student_id': rate['student__student_id'],
+        'name': f"{rate['student__first_name']} {rate['student__last_name']}",
+        'grade': rate['student__grade_id'],
+        'lessons': rate['lessons'],
+        'present': rate['present'],
+        'rate': round(rate['rate'], 2),
+    } for rate in rates]
@@ -0,0 +1,247 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from academic.models.assessments import Assessment
+from academic.models.marks import Mark
+from academic.queries import filter_by_academic_year
+from institutions.models.class_subjects import ClassSubject
+
+
+def get_assessment_key(assessment_type, assessment_id) -> str:
+    return f'{assessment_type}:{assessment_id}'
+
+
+def filter_assessments_by_term(term):
+    if term is None:
+        return Q()
+    return Q(term=term)
+
+
+def get_gradebook_assessments(class_subject, academic_year, term=None) -> list:
+    """
+    Lists the assignments and exams of a class subject, oldest first, as gradebook column headers
+    :param class_subject: ClassSubject
+    :param academic_year: AcademicYear
+    :param term: pk | None
+    :return: list of dicts
+    """
+    assessments = Assessment.objects.filter(
+        Q(class_subject=class_subject)
+        & filter_by_academic_year(academic_year)
+        & filter_assessments_by_term(term)
+    ).order_by('date', 'id')
+
+    return [{
+        'key': get_assessment_key(assessment.assessment_type, assessment.source_id),
+        'type': assessment.assessment_type,
+        'id': assessment.source_id,
+        'assessment': assessment.id,
+        'title': assessment.title,
+        'max_marks': assessment.max_marks,
+        'marking_criterion': assessment.marking_criterion_id,
+        'term': assessment.term_id,
+        'date': assessment.date,
+    } for assessment in assessments]
+
+
+def get_gradebook(class_subject, academic_year, term=None) -> dict:
+    """
+    Builds the students x assessments marks matrix of a class subject with three queries.
+    `marks[i][j]` is the mark of `students[i]` in `assessments[j]`, None when there is no mark.
+    :param class_subject: ClassSubject
+    :param academic_year: AcademicYear
+    :param term: pk | None
+    :return: dict
+    """
+    assessments = get_gradebook_assessments(class_subject, academic_year, term)
+    students = list(class_subject._class.students.order_by('first_name', 'last_name', 'id').values(
+        'id', 'student_id', 'first_name', 'last_name'
+    ))
+
+    columns = {assessment['key']: index for index, assessment in enumerate(assessments)}
+    rows = {student['id']: index for index, student in enumerate(students)}
+    matrix = [[None] * len(assessments) for _ in students]
+
+    marks = Mark.objects.filter(
+        class_subject=class_subject, academic_year=academic_year
+    ).values_list('student_id', 'assessment_type', 'assessment_id', 'marks')
+
+    for student_id, assessment_type, assessment_id, value in marks:
+        column = columns.get(get_assessment_key(assessment_type, assessment_id))
+        row = rows.get(student_id)
+        if column is not None and row is not None:
+            matrix[row][column] = value
+
+    return {
+        'assessments': assessments,
+        'students': [{
+            'id': student['id'],
+            'student_id': student['student_id'],
+            'name': f"{student['first_name']} {student['last_name']}",
+        } for student in students],
+        'marks': matrix,
+    }
+
+
+def parse_gradebook(class_subject, academic_year, data) -> dict:
+    """
+    Validates a submitted gradebook matrix against the class roster and the class subject's assessments
+    :param class_subject: ClassSubject
+    :param academic_year: AcademicYear
+    :param data: validated data of GradebookWriteSerializer,
+        {'students': [pk], 'assessments': [key], 'marks': [[int | None]]}
+    :return: dict (student_id, assessment key) -> int | None, raises ValueError on invalid data
+    """
+    student_ids = data.get('students')
+    assessment_keys = data.get('assessments')
+    matrix = data.get('marks')
+
+    if not isinstance(student_ids, list) or not isinstance(assessment_keys, list) or not isinstance(matrix, list):
+        raise ValueError('students, assessments and marks must be lists')
+
+    if len(matrix) != len(student_ids) or any(
+            not isinstance(row, list) or len(row) != len(assessment_keys) for row in matrix
+    ):
+        raise ValueError('marks must have one row per student and one column per assessment')
+
+    roster = set(class_subject._class.students.values_list('id', flat=True))
+    if not set(student_ids) <= roster:
+        raise ValueError('one or more students are not in the class')
+
+    assessments = {
+        assessment['key']: assessment for assessment in get_gradebook_assessments(class_subject, academic_year)
+    }
+    if not set(assessment_keys) <= set(assessments):
+        raise ValueError('one or more assessments do not belong to the class subject')
+
+    cells = {}
+    for student_id, row in zip(student_ids, matrix):
+        for key, value in zip(assessment_keys, row):
+            if value is not None and (
+                    not isinstance(value, int) or isinstance(value, bool)
+                    or not 0 <= value <= assessments[key]['max_marks']
+            ):
+                raise ValueError(f'marks of {key} must be whole numbers between 0 and '
+                                 f'{assessments[key]["max_marks"]}')
+            cells[(student_id, key)] = value
+
+    return {'cells': cells, 'assessments': assessments}
+
+
+def save_gradebook(class_subject, academic_year, data) -> dict:
+    """
+    Applies a submitted gradebook matrix in one transaction: changed marks are updated with one bulk update,
+    new ones inserted with one bulk insert and cleared (None) cells deleted with one delete.
+    The class subject is locked first, so concurrent gradebook saves of a class subject run one after the other
+    :param class_subject: ClassSubject
+    :param academic_year: AcademicYear
+    :param data: see parse_gradebook
+    :return: dict with the number of marks created, updated and deleted
+    """
+    parsed = parse_gradebook(class_subject, academic_year, data)
+    cells = parsed['cells']
+    assessments = parsed['assessments']
+    now = timezone.now()
+
+    with transaction.atomic():
+        ClassSubject.objects.select_for_update().filter(pk=class_subject.pk).values_list('id', flat=True).first()
+
+        existing = {
+            (mark.student_id, get_assessment_key(mark.assessment_type, mark.assessment_id)): mark
+            for mark in Mark.objects.select_for_update().filter(
+                class_subject=class_subject, student__in={student_id for student_id, _ in cells}
+            )
+        }
+
+        to_create = []
+        to_update = []
+        to_delete = []
+
+        for (student_id, key), value in cells.items():
+            mark = existing.get((student_id, key))
+            assessment = assessments[key]
+
+            if value is None:
+                if mark is not None:
+                    to_delete.append(mark.id)
+                continue
+
+            if mark is None:
+                to_create.append(Mark(
+                    student_id=student_id,
+                    class_subject=class_subject,
+                    assessment_type=assessment['type'],
+                    assessment_id=assessment['id'],
+                    unified_assessment_id=assessment['assessment'],
+                    max_marks=assessment['max_marks'],
+                    marks=value,
+                    marking_criterion_id=assessment['marking_criterion'],
+                    title=assessment['title'],
+                    academic_year=academic_year,
+                    term_id=assessment['term'],
+                ))
+                continue
+
+            if mark.marks == value and mark.max_marks == assessment['max_marks']:
+                continue
+
+            mark.marks = value
+            mark.max_marks = assessment['max_marks']
+            mark.updated_at = now
+            to_update.append(mark)
+
+        Mark.objects.bulk_update(to_update, ['marks', 'max_marks', 'updated_at'], batch_size=1000)
+        Mark.objects.filter(id__in=to_delete).delete()
+        created, overwritten = insert_marks(class_subject, to_create, now)
+
+    return {
+        'created': created,
+        'updated': len(to_update) + overwritten,
+        'deleted': len(to_delete),
+    }
+
+
+def insert_marks(class_subject, marks, now) -> tuple:
+    """
+    Inserts new marks of a gradebook save. A mark entered meanwhile for the same student and assessment
+    (through the marks endpoint) fails the insert: the insert is rolled back to its savepoint, such marks take
+    the submitted value instead and the others are inserted again
+    :param class_subject: ClassSubject
+    :param marks: list of Mark
+    :param now: datetime
+    :return: tuple (number of marks inserted, number of existing marks updated)
+    """
+    overwritten = 0
+
+    while marks:
+        try:
+            with transaction.atomic():
+                Mark.objects.bulk_create(marks, batch_size=1000)
+            return len(marks), overwritten
+        except IntegrityError:
+            submitted = {(mark.student_id, mark.assessment_type, mark.assessment_id): mark for mark in marks}
+
+            conflicting = []
+            for mark in Mark.objects.select_for_update().filter(
+                    class_subject=class_subject, student__in={mark.student_id for mark in marks}
+            ):
+                submitted_mark = submitted.pop((mark.student_id, mark.assessment_type, mark.assessment_id), None)
+                if submitted_mark is None or (mark.marks, mark.max_marks) == (submitted_mark.marks,
+                                                                              submitted_mark.max_marks):
+                    continue
+
+                mark.marks = submitted_mark.marks
+                mark.max_marks = submitted_mark.max_marks
+                mark.updated_at = now
+                conflicting.append(mark)
+
+            # the insert failed for another reason than a mark entered meanwhile
+            if len(submitted) == len(marks):
+                raise
+
+            Mark.objects.bulk_update(conflicting, ['marks', 'max_marks', 'updated_at'], batch_size=1000)
+            overwritten += len(conflicting)
+            marks = list(submitted.values())
+
+    return 0, overwritten
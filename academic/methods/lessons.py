@@ -0,0 +1,77 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.utils import timezone
+
+from academic.models.lesson import Lesson
+from fundamentals.calendars import get_calendar_days
+from institutions.methods.academic_year import get_active_academic_year
+from institutions.models.institution import Institution
+from institutions.models.timetables import Period
+
+# days of lessons the scheduled job keeps materialized ahead of today
+LESSON_HORIZON_DAYS = 28
+
+
+def materialize_lessons(academic_year, start=None, end=None) -> int:
+    """
+    Creates the dated lessons of every timetabled period of an academic year's institution over a date range,
+    so attendance submissions find their lesson instead of creating it.
+    Lessons that already exist are skipped by the (period, date) unique constraint, running it again is safe.
+    :param academic_year: AcademicYear
+    :param start: date | None for the start of the academic year
+    :param end: date | None for the end of the academic year
+    :return: number of lessons considered (existing ones included)
+    """
+    start = max(start or academic_year.start_date, academic_year.start_date)
+    end = min(end or academic_year.end_date, academic_year.end_date)
+    if start > end:
+        return 0
+
+    periods_by_day = defaultdict(list)
+    for period_id, day in Period.objects.filter(
+            class_subject__institution=academic_year.institution_id
+    ).values_list('id', 'day'):
+        periods_by_day[day].append(period_id)
+
+    lessons = [
+        Lesson(period_id=period_id, date=date, academic_year=academic_year)
+        for date in get_calendar_days(start, end)
+        for period_id in periods_by_day[date.strftime('%A')]
+    ]
+
+    Lesson.objects.bulk_create(lessons, batch_size=1000, ignore_conflicts=True)
+    return len(lessons)
+
+
+def materialize_active_lessons(start=None, end=None, institution_id=None) -> dict:
+    """
+    Materializes the lessons of the active academic year of every institution
+    :param start: date | None for today
+    :param end: date | None for the end of each academic year
+    :param institution_id: pk | None, only this institution
+    :return: dict institution pk -> number of lessons considered
+    """
+    institutions = Institution.objects.all()
+    if institution_id is not None:
+        institutions = institutions.filter(pk=institution_id)
+
+    start = start or timezone.localdate()
+    counts = {}
+
+    for institution in institutions.order_by('id'):
+        academic_year = get_active_academic_year(institution)
+        if academic_year is None:
+            continue
+        counts[institution.pk] = materialize_lessons(academic_year, start, end)
+
+    return counts
+
+
+def materialize_upcoming_lessons() -> int:
+    """
+    Keeps LESSON_HORIZON_DAYS of lessons materialized ahead, run by the scheduler (see SCHEDULED_JOBS)
+    :return: number of lessons considered
+    """
+    today = timezone.localdate()
+    return sum(materialize_active_lessons(today, today + timedelta(days=LESSON_HORIZON_DAYS)).values())
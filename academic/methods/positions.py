@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models import Avg, Count, F, Sum, Window
+from django.db.models.functions import DenseRank
+
+from academic.models.term_positions import TermPosition
+from academic.models.term_results import TermResult
+from academic.signals import term_results_computed
+
+
+def rank_term_results(term, academic_year) -> int:
+    """
+    Computes the positions of a term with SQL window functions and stores them:
+    - TermResult.subject_position, the dense rank of total_marks within each class subject
+    - TermPosition, every student's average over their subjects in a class, dense ranked within the class
+      and within the grade
+    Ties share a position. The academic year scopes the ranking to one institution.
+    :param term: Terms
+    :param academic_year: AcademicYear
+    :return: number of term positions stored
+    """
+    results = TermResult.objects.filter(term=term, academic_year=academic_year)
+
+    subject_positions = results.annotate(
+        position=Window(DenseRank(), partition_by=[F('class_subject')], order_by=F('total_marks').desc())
+    ).values_list('id', 'position').order_by()
+
+    positions = results.values(
+        'student_id', 'class_subject___class_id', 'class_subject___class__grade_id'
+    ).annotate(
+        average_marks=Avg('total_marks'),
+        total=Sum('total_marks'),
+        subjects=Count('id'),
+    ).annotate(
+        class_position=Window(
+            DenseRank(), partition_by=[F('class_subject___class_id')], order_by=F('average_marks').desc()
+        ),
+        grade_position=Window(
+            DenseRank(), partition_by=[F('class_subject___class__grade_id')], order_by=F('average_marks').desc()
+        ),
+    ).order_by()
+
+    with transaction.atomic():
+        TermResult.objects.bulk_update(
+            [TermResult(id=result_id, subject_position=position) for result_id, position in subject_positions],
+            ['subject_position'],
+            batch_size=1000,
+        )
+
+        TermPosition.objects.filter(term=term, academic_year=academic_year).delete()
+        created = TermPosition.objects.bulk_create([
+            TermPosition(
+                student_id=row['student_id'],
+                term=term,
+                academic_year=academic_year,
+                _class_id=row['class_subject___class_id'],
+                grade_id=row['class_subject___class__grade_id'],
+                subjects=row['subjects'],
+                total_marks=row['total'],
+                average_marks=row['average_marks'],
+                class_position=row['class_position'],
+                grade_position=row['grade_position'],
+            ) for row in positions
+        ], batch_size=1000)
+
+        transaction.on_commit(lambda: term_results_computed.send(sender=TermResult, term=term,
+                                                                 academic_year=academic_year, class_subject_ids=None))
+
+    return len(created)
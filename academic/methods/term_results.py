@@ -0,0 +1,140 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from academic.models.marking_criteria import MarkingCriterion
+from academic.models.marks import Mark
+from academic.models.settings import Settings, default_grade_boundaries
+from academic.models.term_results import TermResult
+from academic.signals import term_results_computed
+from institutions.models.class_subjects import ClassSubject
+
+
+def get_grade_boundaries() -> list:
+    """
+    Returns the configured grade boundaries, highest first
+    :return: list of {'grade', 'min'}
+    """
+    settings = Settings.objects.first()
+    grade_boundaries = settings.grade_boundaries if settings and settings.grade_boundaries \
+        else default_grade_boundaries()
+    return sorted(grade_boundaries, key=lambda boundary: boundary['min'], reverse=True)
+
+
+def get_grade(total_marks, grade_boundaries) -> str:
+    """
+    Returns the grade of the highest boundary reached, the lowest grade when none is
+    :param total_marks: int
+    :param grade_boundaries: list of {'grade', 'min'}, highest first
+    :return: str
+    """
+    for boundary in grade_boundaries:
+        if total_marks >= boundary['min']:
+            return boundary['grade']
+    return grade_boundaries[-1]['grade']
+
+
+def compute_term_totals(class_subject_ids, term, academic_year) -> dict:
+    """
+    Computes every student's weighted total (out of 100) for each class subject of a term in one grouped query.
+    Within a marking criterion the marks are pooled and normalized by their max_marks; criteria are then
+    weighted by their percentage, relative to the sum of the class subject's criteria percentages.
+    A criterion without marks for a student counts as zero.
+    :param class_subject_ids: list of pks
+    :param term: Terms
+    :param academic_year: AcademicYear
+    :return: dict (class_subject_id, student_id) -> int
+    """
+    weights = defaultdict(dict)
+    for criterion in MarkingCriterion.objects.filter(
+            class_subject__in=class_subject_ids, academic_year=academic_year
+    ).values('id', 'class_subject_id', 'percentage'):
+        weights[criterion['class_subject_id']][criterion['id']] = criterion['percentage']
+
+    rows = Mark.objects.filter(
+        class_subject__in=class_subject_ids, term=term, academic_year=academic_year
+    ).values(
+        'class_subject_id', 'student_id', 'marking_criterion_id'
+    ).annotate(
+        marks=Sum('marks'), max_marks=Sum('max_marks')
+    ).order_by()
+
+    totals = defaultdict(float)
+    for row in rows:
+        class_subject_weights = weights[row['class_subject_id']]
+        weight = class_subject_weights.get(row['marking_criterion_id'])
+        if not weight or not row['max_marks']:
+            continue
+
+        total_weight = sum(class_subject_weights.values())
+        totals[(row['class_subject_id'], row['student_id'])] += row['marks'] / row['max_marks'] * weight / total_weight
+
+    return {key: min(round(total * 100), 100) for key, total in totals.items()}
+
+
+def compute_term_results(class_subject_ids, term, academic_year, grade_boundaries=None) -> dict:
+    """
+    Computes and stores the term results of the class subjects from their marks.
+    Existing results keep their notes and are updated with one bulk update, new ones are inserted with one
+    bulk insert, all in one transaction. The class subjects are locked first, so concurrent computations of the
+    same class subject run one after the other and never insert the same result twice, and the totals are read
+    after gradebook saves of the class subject (which take the same lock) have committed.
+    :param class_subject_ids: list of pks
+    :param term: Terms
+    :param academic_year: AcademicYear
+    :param grade_boundaries: list of {'grade', 'min'}, the configured boundaries when None
+    :return: dict with the number of results created and updated
+    """
+    grade_boundaries = sorted(grade_boundaries, key=lambda boundary: boundary['min'], reverse=True) \
+        if grade_boundaries else get_grade_boundaries()
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        list(ClassSubject.objects.select_for_update().filter(
+            id__in=class_subject_ids
+        ).order_by('id').values_list('id', flat=True))
+
+        totals = compute_term_totals(class_subject_ids, term, academic_year)
+
+        existing = {
+            (result.class_subject_id, result.student_id): result
+            for result in TermResult.objects.select_for_update().filter(
+                class_subject__in=class_subject_ids, term=term, academic_year=academic_year
+            )
+        }
+
+        to_update = []
+        to_create = []
+
+        for (class_subject_id, student_id), total_marks in totals.items():
+            grade = get_grade(total_marks, grade_boundaries)
+            result = existing.get((class_subject_id, student_id))
+
+            if result is None:
+                to_create.append(TermResult(
+                    term=term,
+                    student_id=student_id,
+                    class_subject_id=class_subject_id,
+                    academic_year=academic_year,
+                    total_marks=total_marks,
+                    grade=grade,
+                ))
+                continue
+
+            result.total_marks = total_marks
+            result.grade = grade
+            result.updated_at = now
+            to_update.append(result)
+
+        TermResult.objects.bulk_update(to_update, ['total_marks', 'grade', 'updated_at'], batch_size=1000)
+        # a result submitted by hand meanwhile is kept, as its (term, student, class subject, year) is unique
+        TermResult.objects.bulk_create(to_create, batch_size=1000, ignore_conflicts=True)
+
+        transaction.on_commit(lambda: term_results_computed.send(sender=TermResult, term=term,
+                                                                 academic_year=academic_year,
+                                                                 class_subject_ids=list(class_subject_ids)))
+
+    return {'created': len(to_create), 'updated': len(to_update)}
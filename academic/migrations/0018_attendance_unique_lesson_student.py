@@ -0,0 +1,34 @@
+# Generated by Django 4.0.2 on 2026-10-18 12:40
+
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def remove_duplicate_attendance(apps, schema_editor):
+    # keep the latest attendance of every (lesson, student) pair
+    Attendance = apps.get_model('academic', 'Attendance')
+
+    duplicates = Attendance.objects.values('lesson', 'student').annotate(
+        count=Count('id'), latest_id=Max('id')
+    ).filter(count__gt=1).order_by()
+
+    for duplicate in duplicates.iterator():
+        Attendance.objects.filter(
+            lesson=duplicate['lesson'], student=duplicate['student']
+        ).exclude(id=duplicate['latest_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0016_alter_student_user'),
+        ('academic', '0017_alter_termresult_notes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_attendance, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='attendance',
+            unique_together={('lesson', 'student')},
+        ),
+    ]
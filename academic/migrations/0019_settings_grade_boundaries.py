@@ -0,0 +1,19 @@
+# Generated by Django 4.0.2 on 2026-10-18 13:10
+
+import academic.models.settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0018_attendance_unique_lesson_student'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='settings',
+            name='grade_boundaries',
+            field=models.JSONField(default=academic.models.settings.default_grade_boundaries),
+        ),
+    ]
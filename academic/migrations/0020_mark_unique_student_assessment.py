@@ -0,0 +1,36 @@
+# Generated by Django 4.0.2 on 2026-10-18 13:45
+
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def remove_duplicate_marks(apps, schema_editor):
+    # keep the latest mark of every student and assessment
+    Mark = apps.get_model('academic', 'Mark')
+
+    duplicates = Mark.objects.values('student', 'assessment_type', 'assessment_id').annotate(
+        count=Count('id'), latest_id=Max('id')
+    ).filter(count__gt=1).order_by()
+
+    for duplicate in duplicates.iterator():
+        Mark.objects.filter(
+            student=duplicate['student'],
+            assessment_type=duplicate['assessment_type'],
+            assessment_id=duplicate['assessment_id'],
+        ).exclude(id=duplicate['latest_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0016_alter_student_user'),
+        ('academic', '0019_settings_grade_boundaries'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_marks, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='mark',
+            unique_together={('student', 'assessment_type', 'assessment_id')},
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.0.2 on 2026-10-18 14:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institutions', '0034_alter_organization_next_payment_date'),
+        ('students', '0016_alter_student_user'),
+        ('academic', '0020_mark_unique_student_assessment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='termresult',
+            name='subject_position',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='TermPosition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subjects', models.PositiveIntegerField()),
+                ('total_marks', models.PositiveIntegerField()),
+                ('average_marks', models.FloatField()),
+                ('class_position', models.PositiveIntegerField()),
+                ('grade_position', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='institutions.class')),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='institutions.academicyear')),
+                ('grade', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='institutions.grade')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_positions', to='students.student')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='institutions.terms')),
+            ],
+            options={
+                'unique_together': {('student', 'term', 'academic_year', '_class')},
+            },
+        ),
+    ]
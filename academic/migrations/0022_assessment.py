@@ -0,0 +1,80 @@
+# Generated by Django 4.0.2 on 2026-10-18 14:55
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+# assessment_type -> date field of the source model
+ASSESSMENT_SOURCES = {
+    'assignment': ('Assignment', 'due_date'),
+    'exam': ('Exam', 'date'),
+}
+
+
+def backfill_assessments(apps, schema_editor):
+    Assessment = apps.get_model('academic', 'Assessment')
+    Mark = apps.get_model('academic', 'Mark')
+
+    for assessment_type, (model_name, date_field) in ASSESSMENT_SOURCES.items():
+        model = apps.get_model('academic', model_name)
+
+        Assessment.objects.bulk_create([
+            Assessment(
+                assessment_type=assessment_type,
+                class_subject_id=source.class_subject_id,
+                title=source.title,
+                max_marks=source.max_marks,
+                marking_criterion_id=source.marking_criterion_id,
+                academic_year_id=source.academic_year_id,
+                term_id=source.term_id,
+                date=getattr(source, date_field),
+                **{f'{assessment_type}_id': source.id},
+            ) for source in model.objects.all().iterator()
+        ], batch_size=1000)
+
+        Mark.objects.filter(assessment_type=assessment_type).update(
+            unified_assessment=Subquery(
+                Assessment.objects.filter(**{f'{assessment_type}_id': OuterRef('assessment_id')}).values('id')[:1]
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institutions', '0034_alter_organization_next_payment_date'),
+        ('academic', '0021_term_positions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Assessment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assessment_type', models.CharField(choices=[('assignment', 'Assignment'), ('exam', 'Exam')], max_length=100)),
+                ('title', models.CharField(max_length=255)),
+                ('max_marks', models.PositiveIntegerField()),
+                ('date', models.DateTimeField()),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='institutions.academicyear')),
+                ('assignment', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='academic.assignment')),
+                ('class_subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='institutions.classsubject')),
+                ('exam', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='academic.exam')),
+                ('marking_criterion', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='academic.markingcriterion')),
+                ('term', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='institutions.terms')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='mark',
+            name='unified_assessment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='marks', to='academic.assessment'),
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['class_subject', 'academic_year', 'date'], name='academic_as_class_s_34482f_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='assessment',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('assessment_type', 'assignment'), ('assignment__isnull', False), ('exam__isnull', True)), models.Q(('assessment_type', 'exam'), ('assignment__isnull', True), ('exam__isnull', False)), _connector='OR'), name='assessment_has_one_source'),
+        ),
+        migrations.RunPython(backfill_assessments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.0.2 on 2026-10-18 15:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_attendance(apps, schema_editor):
+    Attendance = apps.get_model('academic', 'Attendance')
+    StudentAttendanceSummary = apps.get_model('academic', 'StudentAttendanceSummary')
+
+    rows = Attendance.objects.values(
+        'student_id', 'academic_year_id', 'term_id', 'attendance_group_id'
+    ).annotate(count=models.Count('id')).order_by()
+
+    StudentAttendanceSummary.objects.bulk_create(
+        [StudentAttendanceSummary(**row) for row in rows.iterator()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registry', '0004_attendancegroup_counts_as_present'),
+        ('students', '0016_alter_student_user'),
+        ('institutions', '0034_alter_organization_next_payment_date'),
+        ('academic', '0022_assessment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='institutions.academicyear')),
+                ('attendance_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='registry.attendancegroup')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='students.student')),
+                ('term', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='institutions.terms')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='studentattendancesummary',
+            index=models.Index(fields=['academic_year', 'term'], name='academic_st_academi_0b7fb0_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='studentattendancesummary',
+            constraint=models.UniqueConstraint(fields=('student', 'academic_year', 'term', 'attendance_group'), name='attendance_summary_unique_term'),
+        ),
+        migrations.AddConstraint(
+            model_name='studentattendancesummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('term__isnull', True)), fields=('student', 'academic_year', 'attendance_group'), name='attendance_summary_unique_no_term'),
+        ),
+        migrations.RunPython(count_attendance, migrations.RunPython.noop),
+    ]
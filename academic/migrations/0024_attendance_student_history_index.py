@@ -0,0 +1,17 @@
+# Generated by Django 4.0.2 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0023_student_attendance_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', 'academic_year', 'term'], name='academic_at_student_ab7a8e_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.0.2 on 2026-10-18 16:05
+
+from django.db import migrations
+from django.db.models import Count, Max, Min
+
+
+def merge_duplicate_lessons(apps, schema_editor):
+    # attendance split over duplicate lessons is moved onto the oldest lesson of its (period, date),
+    # keeping the latest attendance of every student
+    Lesson = apps.get_model('academic', 'Lesson')
+    Attendance = apps.get_model('academic', 'Attendance')
+    StudentAttendanceSummary = apps.get_model('academic', 'StudentAttendanceSummary')
+
+    duplicates = Lesson.objects.values('period', 'date').annotate(
+        count=Count('id'), first_id=Min('id')
+    ).filter(count__gt=1).order_by()
+
+    recount_student_ids = set()
+
+    for duplicate in duplicates.iterator():
+        lesson_ids = list(Lesson.objects.filter(
+            period=duplicate['period'], date=duplicate['date']
+        ).values_list('id', flat=True))
+
+        attendance = Attendance.objects.filter(lesson__in=lesson_ids)
+        latest_ids = [row['latest_id'] for row in attendance.values('student').annotate(latest_id=Max('id')).order_by()]
+
+        removed = attendance.exclude(id__in=latest_ids)
+        recount_student_ids.update(removed.values_list('student_id', flat=True))
+        removed.delete()
+
+        Attendance.objects.filter(id__in=latest_ids).update(lesson=duplicate['first_id'])
+        Lesson.objects.filter(id__in=lesson_ids).exclude(id=duplicate['first_id']).delete()
+
+    if recount_student_ids:
+        # the attendance ledger counted the removed rows
+        StudentAttendanceSummary.objects.filter(student__in=recount_student_ids).delete()
+        rows = Attendance.objects.filter(student__in=recount_student_ids).values(
+            'student_id', 'academic_year_id', 'term_id', 'attendance_group_id'
+        ).annotate(count=Count('id')).order_by()
+        StudentAttendanceSummary.objects.bulk_create(
+            [StudentAttendanceSummary(**row) for row in rows.iterator()], batch_size=1000
+        )
+
+    # the deleted lessons left deferred foreign key checks pending on academic_lesson, postgresql refuses to
+    # ALTER TABLE it in the same transaction until they have run
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        schema_editor.execute('SET CONSTRAINTS ALL DEFERRED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institutions', '0034_alter_organization_next_payment_date'),
+        ('academic', '0024_attendance_student_history_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_lessons, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='lesson',
+            unique_together={('period', 'date')},
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.0.2 on 2026-10-18 17:40
+
+from django.db import migrations
+from django.db.models import Count, Max, Q
+
+
+def remove_duplicate_term_results(apps, schema_editor):
+    # keep the latest result of every term, student, class subject and academic year, with the notes of
+    # a removed duplicate when it has none (null or empty)
+    TermResult = apps.get_model('academic', 'TermResult')
+
+    duplicates = TermResult.objects.values('term', 'student', 'class_subject', 'academic_year').annotate(
+        count=Count('id'), latest_id=Max('id')
+    ).filter(count__gt=1).order_by()
+
+    for duplicate in duplicates.iterator():
+        results = TermResult.objects.filter(
+            term=duplicate['term'],
+            student=duplicate['student'],
+            class_subject=duplicate['class_subject'],
+            academic_year=duplicate['academic_year'],
+        )
+        removed = results.exclude(id=duplicate['latest_id'])
+
+        notes = removed.exclude(notes__isnull=True).exclude(notes='').order_by('-id').values_list(
+            'notes', flat=True
+        ).first()
+        if notes:
+            results.filter(Q(notes__isnull=True) | Q(notes=''), id=duplicate['latest_id']).update(notes=notes)
+
+        removed.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institutions', '0034_alter_organization_next_payment_date'),
+        ('students', '0016_alter_student_user'),
+        ('academic', '0025_lesson_unique_period_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_term_results, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='termresult',
+            unique_together={('term', 'student', 'class_subject', 'academic_year')},
+        ),
+    ]
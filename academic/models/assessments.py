@@ -0,0 +1,56 @@
+from django.db import models
+from django.db.models import Q
+from rest_framework import serializers
+
+from academic.models.assignments import Assignment
+from academic.models.exams import Exam
+from academic.models.marking_criteria import MarkingCriterion
+from institutions.models.academic_years import AcademicYear
+from institutions.models.class_subjects import ClassSubject
+from institutions.models.terms import Terms
+
+
+class Assessment(models.Model):
+    """
+    One row per assignment or exam, with the metadata marks are read with.
+    Kept in sync with Assignment and Exam by `academic.signals`.
+    """
+    assessment_type_choices = (
+        ('assignment', 'Assignment'),
+        ('exam', 'Exam')
+    )
+
+    assessment_type = models.CharField(max_length=100, choices=assessment_type_choices)
+    assignment = models.OneToOneField(Assignment, on_delete=models.CASCADE, null=True, blank=True)
+    exam = models.OneToOneField(Exam, on_delete=models.CASCADE, null=True, blank=True)
+
+    class_subject = models.ForeignKey(ClassSubject, on_delete=models.CASCADE)
+    title = models.CharField(max_length=255)
+    max_marks = models.PositiveIntegerField()
+    marking_criterion = models.ForeignKey(MarkingCriterion, on_delete=models.PROTECT)
+    academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE)
+    term = models.ForeignKey(Terms, on_delete=models.CASCADE, null=True, blank=True)
+    date = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=['class_subject', 'academic_year', 'date'])]
+        constraints = [
+            models.CheckConstraint(
+                check=Q(assessment_type='assignment', assignment__isnull=False, exam__isnull=True)
+                | Q(assessment_type='exam', exam__isnull=False, assignment__isnull=True),
+                name='assessment_has_one_source',
+            ),
+        ]
+
+    @property
+    def source_id(self):
+        return self.assignment_id if self.assessment_type == 'assignment' else self.exam_id
+
+    def __str__(self):
+        return f'{self.assessment_type} - {self.title}'
+
+
+class AssessmentReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Assessment
+        fields = '__all__'
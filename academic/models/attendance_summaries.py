@@ -0,0 +1,40 @@
+from django.db import models
+from rest_framework import serializers
+
+from institutions.models.academic_years import AcademicYear
+from institutions.models.terms import Terms
+from registry.models.attendance_group import AttendanceGroup
+from students.models.students import Student
+
+
+class StudentAttendanceSummary(models.Model):
+    """
+    Number of lessons a student attended with an attendance group in a term.
+    Maintained from Attendance writes by `academic.methods.attendance_summaries`.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_summaries')
+    academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE)
+    term = models.ForeignKey(Terms, on_delete=models.CASCADE, null=True, blank=True)
+    attendance_group = models.ForeignKey(AttendanceGroup, on_delete=models.CASCADE)
+    count = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['academic_year', 'term']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'academic_year', 'term', 'attendance_group'],
+                                    name='attendance_summary_unique_term'),
+            # attendance without a term still has a single counter per group
+            models.UniqueConstraint(fields=['student', 'academic_year', 'attendance_group'],
+                                    condition=models.Q(term__isnull=True),
+                                    name='attendance_summary_unique_no_term'),
+        ]
+
+
+class StudentAttendanceSummaryReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StudentAttendanceSummary
+        fields = '__all__'
@@ -13,6 +13,9 @@ class Lesson(models.Model):
     date = models.DateField()
     academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE)
 
+    class Meta:
+        unique_together = ['period', 'date']
+
 
 class Attendance(models.Model):
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE)
@@ -24,6 +27,12 @@ class Attendance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        unique_together = ['lesson', 'student']
+        indexes = [
+            models.Index(fields=['student', 'academic_year', 'term']),
+        ]
+
 
 class AttendanceReadSerializer(serializers.ModelSerializer):
     student = StudentReadSerializer(read_only=True, many=False)
@@ -32,3 +41,55 @@ class AttendanceReadSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attendance
         fields = '__all__'
+
+
+class AttendanceHistorySerializer(serializers.ModelSerializer):
+    """
+    Compact attendance row for a student's own history, the student is the requester and is not repeated
+    """
+    date = serializers.DateField(source='lesson.date', read_only=True)
+    class_subject = serializers.IntegerField(source='lesson.period.class_subject_id', read_only=True)
+    attendance_group_name = serializers.CharField(source='attendance_group.name', read_only=True)
+
+    class Meta:
+        model = Attendance
+        fields = ['id', 'lesson', 'date', 'class_subject', 'attendance_group', 'attendance_group_name', 'term',
+                  'academic_year']
+
+
+class AttendanceRosterRecordSerializer(serializers.Serializer):
+    student = serializers.IntegerField()
+    attendance_group = serializers.IntegerField()
+
+
+class AttendanceRosterSerializer(serializers.Serializer):
+    """
+    A roster of attendance for one lesson. Pass the teacher's institution in the serializer context:
+    only its periods, and students of the period's class, are accepted.
+    """
+    period = serializers.PrimaryKeyRelatedField(queryset=Period.objects.none())
+    date = serializers.DateField()
+    term = serializers.PrimaryKeyRelatedField(queryset=Terms.objects.all(), required=False, allow_null=True)
+    attendance = AttendanceRosterRecordSerializer(many=True, allow_empty=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['period'].queryset = Period.objects.select_related('class_subject').filter(
+            class_subject__institution=self.context['institution']
+        )
+
+    def validate_attendance(self, attendance):
+        # one query per referenced table, whatever the size of the roster
+        attendance_group_ids = {record['attendance_group'] for record in attendance}
+        if AttendanceGroup.objects.filter(id__in=attendance_group_ids).count() != len(attendance_group_ids):
+            raise serializers.ValidationError('one or more attendance groups do not exist')
+
+        return attendance
+
+    def validate(self, data):
+        student_ids = {record['student'] for record in data['attendance']}
+        class_students = Student.objects.filter(id__in=student_ids, classes=data['period'].class_subject._class_id)
+        if class_students.count() != len(student_ids):
+            raise serializers.ValidationError({'attendance': 'one or more students are not in the class'})
+
+        return data
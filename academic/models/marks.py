@@ -2,6 +2,7 @@ from django.db import models
 from django.db.models import Q
 from rest_framework import serializers
 
+from academic.models.assessments import Assessment
 from academic.models.marking_criteria import MarkingCriterion
 from institutions.models.academic_years import AcademicYear
 from institutions.models.class_subjects import ClassSubject
@@ -19,6 +20,9 @@ class Mark(models.Model):
     class_subject = models.ForeignKey(ClassSubject, on_delete=models.CASCADE)
     assessment_type = models.CharField(max_length=100, choices=assessment_type_choices)
     assessment_id = models.PositiveIntegerField()
+    # set from (assessment_type, assessment_id) when the mark is saved
+    unified_assessment = models.ForeignKey(Assessment, on_delete=models.SET_NULL, null=True, blank=True,
+                                           related_name='marks')
     max_marks = models.PositiveIntegerField()
     marks = models.PositiveIntegerField()
     marking_criterion = models.ForeignKey(MarkingCriterion, on_delete=models.PROTECT)
@@ -29,11 +33,15 @@ class Mark(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        unique_together = ['student', 'assessment_type', 'assessment_id']
+
 
 class MarksWriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Mark
         fields = '__all__'
+        read_only_fields = ['unified_assessment']
 
 
 class MarksReadSerializer(serializers.ModelSerializer):
@@ -63,3 +71,10 @@ def filter_marks_by_assessment_id(assessment_id: int) -> Q:
     if assessment_id:
         return Q(assessment_id=assessment_id)
     return Q()
+
+
+class GradebookWriteSerializer(serializers.Serializer):
+    class_subject = serializers.IntegerField()
+    students = serializers.ListField(child=serializers.IntegerField())
+    assessments = serializers.ListField(child=serializers.CharField())
+    marks = serializers.ListField(child=serializers.ListField(child=serializers.IntegerField(allow_null=True)))
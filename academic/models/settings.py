@@ -3,14 +3,47 @@ from django.db import models
 from rest_framework import serializers
 
 
+def default_grade_boundaries():
+    # lowest total_marks (out of 100) of every grade
+    return [
+        {'grade': 'A', 'min': 80},
+        {'grade': 'B', 'min': 70},
+        {'grade': 'C', 'min': 60},
+        {'grade': 'D', 'min': 50},
+        {'grade': 'E', 'min': 40},
+        {'grade': 'F', 'min': 0},
+    ]
+
+
 class Settings(models.Model):
     show_academic_year = models.BooleanField(default=True)
+    grade_boundaries = models.JSONField(default=default_grade_boundaries)
 
     def __str__(self):
         return "Settings"
 
 
+def validate_grade_boundaries(grade_boundaries):
+    """
+    Validates a list of grade boundaries, e.g. [{'grade': 'A', 'min': 80}, {'grade': 'B', 'min': 70}]
+    :param grade_boundaries: list
+    :return: list
+    """
+    if not isinstance(grade_boundaries, list) or not grade_boundaries:
+        raise serializers.ValidationError('grade boundaries must be a non empty list')
+
+    for boundary in grade_boundaries:
+        if not isinstance(boundary, dict) or not isinstance(boundary.get('grade'), str) \
+                or not isinstance(boundary.get('min'), (int, float)) or not 0 <= boundary['min'] <= 100:
+            raise serializers.ValidationError('every grade boundary needs a grade and a min between 0 and 100')
+
+    return grade_boundaries
+
+
 class SettingsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Settings
         fields = "__all__"
+
+    def validate_grade_boundaries(self, grade_boundaries):
+        return validate_grade_boundaries(grade_boundaries)
@@ -0,0 +1,36 @@
+from django.db import models
+from rest_framework import serializers
+
+from institutions.models.academic_years import AcademicYear
+from institutions.models.classes import Class
+from institutions.models.grades import Grade
+from institutions.models.terms import Terms
+from students.models.students import Student
+
+
+class TermPosition(models.Model):
+    """
+    A student's overall result and positions for a term, over all their subjects in a class.
+    Derived from TermResult by `academic.methods.positions.rank_term_results`.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='term_positions')
+    term = models.ForeignKey(Terms, on_delete=models.CASCADE)
+    academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE)
+    _class = models.ForeignKey(Class, on_delete=models.CASCADE)
+    grade = models.ForeignKey(Grade, on_delete=models.CASCADE)
+    subjects = models.PositiveIntegerField()
+    total_marks = models.PositiveIntegerField()
+    average_marks = models.FloatField()
+    class_position = models.PositiveIntegerField()
+    grade_position = models.PositiveIntegerField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['student', 'term', 'academic_year', '_class']
+
+
+class TermPositionReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TermPosition
+        fields = '__all__'
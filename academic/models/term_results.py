@@ -16,10 +16,15 @@ class TermResult(models.Model):
     total_marks = models.PositiveIntegerField()
     grade = models.CharField(max_length=10)
     notes = models.CharField(max_length=3000, null=True, blank=True)
+    # dense rank of total_marks among the results of the class subject, set by rank_term_results
+    subject_position = models.PositiveIntegerField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        unique_together = ['term', 'student', 'class_subject', 'academic_year']
+
 
 class TermResultWriteSerializer(serializers.ModelSerializer):
     class Meta:
@@ -31,4 +31,15 @@ def filter_by_academic_year(academic_year):
     """
     if academic_year is not None:
         return Q(academic_year=academic_year)
-    return Q()
\ No newline at end of file
+    return Q()
+
+
+def filter_by_term(term):
+    """
+    Filter by term
+    :param term: pk
+    :return: Q()
+    """
+    if term is not None:
+        return Q(term=term)
+    return Q()
@@ -0,0 +1,61 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from academic.methods.assessments import get_assessment_id, sync_assessment
+from academic.methods.attendance_summaries import apply_attendance_deltas, get_attendance_deltas, get_summary_key
+from academic.models.assignments import Assignment
+from academic.models.exams import Exam
+from academic.models.lesson import Attendance
+from academic.models.marks import Mark
+
+# sent after a roster of attendance is committed with bulk queries, which do not send post_save.
+# kwargs: lesson, changes (list of (student_id, previous attendance_group_id or None, attendance_group_id))
+attendance_roster_saved = Signal()
+
+# sent after term results are computed with bulk queries. kwargs: term, academic_year, class_subject_ids
+term_results_computed = Signal()
+
+
+@receiver(post_save, sender=Assignment, dispatch_uid='assessment_sync_assignment')
+def sync_assignment_assessment(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_assessment(instance, 'assignment')
+
+
+@receiver(post_save, sender=Exam, dispatch_uid='assessment_sync_exam')
+def sync_exam_assessment(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_assessment(instance, 'exam')
+
+
+@receiver(pre_save, sender=Mark, dispatch_uid='mark_resolve_assessment')
+def resolve_mark_assessment(sender, instance, **kwargs):
+    # marks are still written with the (assessment_type, assessment_id) pair, link them to their Assessment
+    assessment = instance.unified_assessment
+    if assessment is None or assessment.assessment_type != instance.assessment_type \
+            or assessment.source_id != instance.assessment_id:
+        instance.unified_assessment_id = get_assessment_id(instance.assessment_type, instance.assessment_id)
+
+
+# attendance saved one row at a time (rosters are counted by submit_roster_attendance itself)
+@receiver(pre_save, sender=Attendance, dispatch_uid='attendance_summary_pre_save')
+def remember_previous_attendance(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    previous = sender.objects.filter(pk=instance.pk).first()
+    instance._previous_summary_key = get_summary_key(previous) if previous else None
+
+
+@receiver(post_save, sender=Attendance, dispatch_uid='attendance_summary_post_save')
+def count_saved_attendance(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_key = None if created else getattr(instance, '_previous_summary_key', None)
+    apply_attendance_deltas(get_attendance_deltas(previous_key, get_summary_key(instance)))
+
+
+@receiver(post_delete, sender=Attendance, dispatch_uid='attendance_summary_post_delete')
+def uncount_deleted_attendance(sender, instance, **kwargs):
+    apply_attendance_deltas(get_attendance_deltas(previous_key=get_summary_key(instance)))
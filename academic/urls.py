@@ -1,16 +1,19 @@
 from rest_framework.urls import path
 
 from .views import get_teachers_class_list, get_teachers_periods, submit_attendance, get_attendance_list, \
+    submit_roster_attendance_view, compute_class_subject_term_results, Gradebook, \
     MarkingCriterionList, MarkingCriterionDetail, AssignmentList, AssignmentDetail, ExamList, ExamDetail, \
     get_teachers_monthly_calendar, get_marking_options_for_a_class, MarkList, MarkDetail, get_students_monthly_calendar, \
     get_attendance_list_for_student, get_assignments_for_student, get_exams_for_students, \
     get_class_subject_list_for_students, get_periods_for_students, submit_term_result, get_term_result, get_settings, \
-    update_settings, get_student_marks, get_student_term_results, get_student_attendance_all_classes
+    update_settings, get_student_marks, get_student_term_results, get_student_attendance_all_classes, \
+    materialize_lessons_view
 
 urlpatterns = [
     path('teachers/class-list', get_teachers_class_list, name='get_teachers_class_list'),
     path('teachers/periods', get_teachers_periods, name='get_teachers_periods'),
     path('teachers/submit-attendance', submit_attendance, name='submit_attendance'),
+    path('teachers/submit-roster-attendance', submit_roster_attendance_view, name='submit_roster_attendance'),
     path('teachers/attendance-list', get_attendance_list, name='get_attendance_list'),
 
     path('marking-criterion', MarkingCriterionList.as_view(), name='marking_criterion_list'),
@@ -27,10 +30,13 @@ urlpatterns = [
     path('teachers/marking-options', get_marking_options_for_a_class, name='get_marking_options_for_a_class'),
 
     path('teachers/submit-term-result', submit_term_result, name='submit_term_result'),
+    path('teachers/compute-term-results', compute_class_subject_term_results,
+         name='compute_class_subject_term_results'),
     path('teachers/term-result', get_term_result, name='get_term_result'),
 
     path('teachers/marks', MarkList.as_view(), name='mark_list'),
     path('teachers/marks/<int:pk>', MarkDetail.as_view(), name='mark_detail'),
+    path('teachers/gradebook', Gradebook.as_view(), name='gradebook'),
 
     path('students/monthly-calendar', get_students_monthly_calendar, name='get_students_monthly_calendar'),
     path('students/attendance-list', get_attendance_list_for_student, name='get_attendance_list_for_student'),
@@ -45,4 +51,5 @@ urlpatterns = [
 
     path("academic/settings", get_settings, name="get_academic_settings"),
     path("academic/settings/update", update_settings, name="update_academic_settings"),
+    path("academic/materialize-lessons", materialize_lessons_view, name="materialize_lessons"),
 ]
@@ -2,37 +2,50 @@ from datetime import datetime, timedelta
 
 from django.db.models import Q
 from rest_framework.decorators import api_view, permission_classes, APIView
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.status import HTTP_404_NOT_FOUND
 
 from employees.models.employees import Employee
-from fundamentals.custom_responses import success_w_data, err_w_msg, success_w_msg
-from institutions.methods.academic_year import get_active_academic_year
+from fundamentals.calendars import get_calendar_range, get_calendar_days, bucket_weekly, bucket_dated, \
+    merge_buckets, assemble_calendar
+from fundamentals.custom_responses import success_w_data, err_w_msg, success_w_msg, err_w_serializer, \
+    get_paginated_response
+from institutions.methods.actor_context import get_actor_context
+from institutions.models.academic_years import AcademicYear
 from institutions.models.class_subjects import ClassSubject, ClassSubjectReadSerializer
 from institutions.models.timetables import Period, PeriodReadSerializer
 from institutions.models.terms import Terms
-from registry.models.attendance_group import AttendanceGroup
 from students.models.students import Student
 from users.permissions import IsTeacher, IsStudent, IsSuperUser
+from .models.assessments import Assessment
 from .models.assignments import (
     Assignment,
     AssignmentWriteSerializer,
     AssignmentReadSerializer,
 )
 from .models.exams import Exam, ExamWriteSerializer, ExamReadSerializer
-from .models.lesson import Lesson, Attendance, AttendanceReadSerializer
+from .methods.attendance import submit_roster_attendance, get_attendance_summary
+from .methods.gradebook import get_gradebook, save_gradebook
+from .methods.lessons import materialize_lessons
+from .methods.positions import rank_term_results
+from .methods.term_results import compute_term_results
+from .models.lesson import Lesson, Attendance, AttendanceReadSerializer, AttendanceRosterSerializer, \
+    AttendanceHistorySerializer
 from .models.marking_criteria import (
     MarkingCriterion,
     MarkingCriterionWriteSerializer,
     MarkingCriterionReadSerializer,
 )
 from .models.marks import (
+    GradebookWriteSerializer,
     Mark,
     MarksWriteSerializer,
     MarksReadSerializer,
     filter_marks_by_student,
     filter_marks_by_assessment_id,
 )
-from .models.settings import Settings, SettingsSerializer
+from .models.settings import Settings, SettingsSerializer, validate_grade_boundaries
 from .models.term_results import (
     TermResult,
     TermResultWriteSerializer,
@@ -42,13 +55,14 @@ from .queries import (
     filter_by_class_subject,
     filter_by_period_day,
     filter_by_academic_year,
+    filter_by_term,
 )
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsTeacher])
 def get_teachers_class_list(request):
-    employee = Employee.objects.get(user=request.user)
+    employee = get_actor_context(request, Employee)['profile']
 
     class_subjects = ClassSubject.objects.filter(teacher=employee).order_by("-id")
     class_subjects = ClassSubjectReadSerializer(class_subjects, many=True).data
@@ -74,40 +88,49 @@ def get_teachers_periods(request):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsTeacher])
 def submit_attendance(request):
-    data = request.data.copy()
-    employee = Employee.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(employee.institution)
-
-    try:
-        lesson = Lesson.objects.filter(period=data["period"], date=data["date"]).first()
-        if lesson is None:
-            lesson = Lesson.objects.create(
-                period_id=data["period"],
-                date=data["date"],
-                academic_year=active_academic_year,
-            )
-
-        attendance = Attendance.objects.filter(
-            lesson=lesson, student_id=data["student"]
-        ).first()
+    data = request.data
+    context = get_actor_context(request, Employee)
+
+    serializer = AttendanceRosterSerializer(data={
+        "period": data.get("period"),
+        "date": data.get("date"),
+        "term": data.get("term"),
+        "attendance": [{"student": data.get("student"), "attendance_group": data.get("attendance_group")}],
+    }, context={"institution": context["institution"]})
+    if not serializer.is_valid():
+        return err_w_serializer(serializer.errors)
+
+    data = serializer.validated_data
+    submit_roster_attendance(
+        period_id=data["period"].id,
+        date=data["date"],
+        term_id=data["term"].id if data.get("term") else None,
+        records=data["attendance"],
+        academic_year=context["academic_year"],
+    )
 
-        term = Terms.objects.filter(pk=data['term']).first()
+    return success_w_msg(msg="Attendance submitted successfully")
 
-        if attendance:
-            attendance.delete()
 
-        attendance_group = AttendanceGroup.objects.get(id=data["attendance_group"])
-        Attendance.objects.create(
-            lesson=lesson,
-            student_id=data["student"],
-            attendance_group=attendance_group,
-            academic_year=active_academic_year,
-            term=term
-        )
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsTeacher])
+def submit_roster_attendance_view(request):
+    context = get_actor_context(request, Employee)
+
+    serializer = AttendanceRosterSerializer(data=request.data, context={"institution": context["institution"]})
+    if not serializer.is_valid():
+        return err_w_serializer(serializer.errors)
+
+    data = serializer.validated_data
+    submit_roster_attendance(
+        period_id=data["period"].id,
+        date=data["date"],
+        term_id=data["term"].id if data.get("term") else None,
+        records=data["attendance"],
+        academic_year=context["academic_year"],
+    )
 
-        return success_w_msg(msg="Attendance submitted successfully")
-    except Exception as e:
-        return err_w_msg(msg=str(e))
+    return success_w_msg(msg=f"Attendance of {len(data['attendance'])} students submitted successfully")
 
 
 @api_view(["GET"])
@@ -115,8 +138,7 @@ def submit_attendance(request):
 def get_attendance_list(request):
     params = request.query_params
 
-    employee = Employee.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(employee.institution)
+    active_academic_year = get_actor_context(request, Employee)['academic_year']
 
     lesson = Lesson.objects.filter(
         Q(period=params.get("period"))
@@ -139,8 +161,7 @@ class MarkingCriterionList(APIView):
     @staticmethod
     def post(request):
         data = request.data.copy()
-        employee = Employee.objects.get(user=request.user)
-        active_academic_year = get_active_academic_year(employee.institution)
+        active_academic_year = get_actor_context(request, Employee)['academic_year']
         data["academic_year"] = active_academic_year.id
 
         serializer = MarkingCriterionWriteSerializer(data=data)
@@ -153,8 +174,7 @@ class MarkingCriterionList(APIView):
     def get(request):
         params = request.query_params
 
-        employee = Employee.objects.get(user=request.user)
-        active_academic_year = get_active_academic_year(employee.institution)
+        active_academic_year = get_actor_context(request, Employee)['academic_year']
 
         marking_criteria = MarkingCriterion.objects.filter(
             Q(class_subject=params.get("class_subject"))
@@ -205,8 +225,7 @@ class AssignmentList(APIView):
     @staticmethod
     def post(request):
         data = request.data.copy()
-        employee = Employee.objects.get(user=request.user)
-        active_academic_year = get_active_academic_year(employee.institution)
+        active_academic_year = get_actor_context(request, Employee)['academic_year']
         data["academic_year"] = active_academic_year.id
 
         # checking if due_date is in the past. parse the due_date first which is a YYYY-MM-DDTHH:MM:SS.sssZ string
@@ -224,8 +243,7 @@ class AssignmentList(APIView):
     def get(request):
         params = request.query_params
 
-        employee = Employee.objects.get(user=request.user)
-        active_academic_year = get_active_academic_year(employee.institution)
+        active_academic_year = get_actor_context(request, Employee)['academic_year']
 
         assignments = Assignment.objects.filter(
             Q(class_subject=params.get("class_subject"))
@@ -270,8 +288,7 @@ class ExamList(APIView):
     @staticmethod
     def post(request):
         data = request.data.copy()
-        employee = Employee.objects.get(user=request.user)
-        active_academic_year = get_active_academic_year(employee.institution)
+        active_academic_year = get_actor_context(request, Employee)['academic_year']
         data["academic_year"] = active_academic_year.id
 
         serializer = ExamWriteSerializer(data=data)
@@ -284,8 +301,7 @@ class ExamList(APIView):
     def get(request):
         params = request.query_params
 
-        employee = Employee.objects.get(user=request.user)
-        active_academic_year = get_active_academic_year(employee.institution)
+        active_academic_year = get_actor_context(request, Employee)['academic_year']
 
         exams = Exam.objects.filter(
             Q(class_subject=params.get("class_subject"))
@@ -322,100 +338,72 @@ class ExamDetail(APIView):
         return success_w_msg(msg="Exam deleted successfully")
 
 
+def serialize_calendar_period(period):
+    return {
+        "id": period.id,
+        "title": f"{period.class_subject._class.name} - ({period.start} - {period.end})",
+        "subject": period.class_subject.subject.name,
+    }
+
+
+def serialize_calendar_assignment(assignment):
+    last_time = assignment.due_date.time()
+    first_time = (datetime.combine(datetime.min, last_time) - timedelta(minutes=60)).time()
+    return {
+        "id": assignment.id,
+        "title": f"{assignment.title} - ({first_time} - {last_time})",
+        "subject": assignment.class_subject.subject.name,
+    }
+
+
+def serialize_calendar_exam(exam):
+    return {
+        "id": exam.id,
+        "title": f'{exam.title} - ({exam.start} - {exam.end})',
+        "subject": exam.class_subject.subject.name,
+    }
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsTeacher])
 def get_teachers_monthly_calendar(request):
     params = request.query_params
 
-    employee = Employee.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(employee.institution)
-
-    current_month_start_date = datetime.strptime(
-        params.get("date"), "%Y-%m-%d"
-    ).replace(day=1)
-    current_month_end_date = current_month_start_date.replace(
-        day=1, month=current_month_start_date.month + 1
-    ) - timedelta(days=1)
-
-    # loop through the days of the month
-    monthly_calendar = []
-    current_date = current_month_start_date
-    while current_date <= current_month_end_date:
-        day = {
-            "date": current_date.strftime("%Y-%m-%d"),
-            "day": current_date.strftime("%A"),
-        }
-
-        events = []
-
-        # periods
-        periods = (
-            Period.objects.select_related(
-                "class_subject___class", "class_subject__subject"
-            )
-            .filter(
-                Q(class_subject__teacher__user=request.user)
-                & filter_by_period_day(current_date.strftime("%A"))
-            )
-            .order_by("period")
-        )
-        for period in periods:
-            events.append(
-                {
-                    "type": "period",
-                    "id": period.id,
-                    "title": f"{period.class_subject._class.name} - ({period.start} - {period.end})",
-                    "subject": period.class_subject.subject.name,
-                }
-            )
-
-        # assignments
-        assignments = Assignment.objects.filter(
-            Q(class_subject__teacher__user=request.user)
-            & Q(due_date__date=current_date)
-            & filter_by_academic_year(active_academic_year)
-        ).order_by("due_date")
-
-        for assignment in assignments:
-            last_time = assignment.due_date.time()
-            first_time = (datetime.combine(datetime.min, last_time) - timedelta(minutes=60)).time()
-            events.append(
-                {
-                    "type": "assignment",
-                    "id": assignment.id,
-                    "title": f"{assignment.title} - ({first_time} - {last_time})",
-                    "subject": assignment.class_subject.subject.name,
-                }
-            )
-
-        # exams
-        exams = Exam.objects.filter(
-            Q(class_subject__teacher__user=request.user)
-            & Q(
-                date__day=current_date.day,
-                date__month=current_date.month,
-                date__year=current_date.year,
-            )
-            & filter_by_academic_year(active_academic_year)
-        ).order_by("date")
+    active_academic_year = get_actor_context(request, Employee)['academic_year']
 
-        for exam in exams:
-            events.append(
-                {
-                    "type": "exam",
-                    "id": exam.id,
-                    "title": f'{exam.title} - ({exam.start} - {exam.end})',
-                    "subject": exam.class_subject.subject.name,
-                }
-            )
+    try:
+        start, end = get_calendar_range(params)
+    except (TypeError, ValueError) as e:
+        return err_w_msg(msg=str(e))
 
-        day["events"] = events
-        monthly_calendar.append(day)
+    days = get_calendar_days(start, end)
 
-        current_date += timedelta(days=1)
+    periods = Period.objects.select_related(
+        "class_subject___class", "class_subject__subject"
+    ).filter(
+        Q(class_subject__teacher__user=request.user)
+    ).order_by("period")
+
+    assignments = Assignment.objects.select_related("class_subject__subject").filter(
+        Q(class_subject__teacher__user=request.user)
+        & filter_by_academic_year(active_academic_year)
+    ).order_by("due_date")
+
+    exams = Exam.objects.select_related("class_subject__subject").filter(
+        Q(class_subject__teacher__user=request.user)
+        & filter_by_academic_year(active_academic_year)
+    ).order_by("date")
+
+    events = merge_buckets(
+        bucket_weekly(periods, days, lambda period: {"type": "period", **serialize_calendar_period(period)}),
+        bucket_dated(assignments, start, end,
+                     lambda assignment: {"type": "assignment", **serialize_calendar_assignment(assignment)},
+                     date_field="due_date"),
+        bucket_dated(exams, start, end, lambda exam: {"type": "exam", **serialize_calendar_exam(exam)}),
+    )
 
     return success_w_data(
-        data=monthly_calendar, msg="Monthly calendar fetched successfully"
+        data=assemble_calendar(days, {"events": events}), msg="Monthly calendar fetched successfully"
     )
 
 
@@ -425,36 +413,23 @@ def get_marking_options_for_a_class(request):
     params = request.query_params
     marking_options = []
 
-    employee = Employee.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(employee.institution)
+    active_academic_year = get_actor_context(request, Employee)['academic_year']
 
-    exams = Exam.objects.filter(class_subject=params.get("class_subject")).order_by(
-        "id"
-    )
-    assignments = Assignment.objects.filter(
+    # every exam of the class subject, and its assignments of the active academic year
+    assignments_of_year = Q(assessment_type="assignment") & filter_by_academic_year(active_academic_year)
+    assessments = Assessment.objects.filter(
         Q(class_subject=params.get("class_subject"))
-        & filter_by_academic_year(active_academic_year)
-    ).order_by("id")
+        & (Q(assessment_type="exam") | assignments_of_year)
+    ).order_by("assessment_type", "assignment_id", "exam_id")
 
-    for assignment in assignments:
+    for assessment in assessments:
         marking_options.append(
             {
-                "assessment_type": "assignment",
-                "id": assignment.id,
-                "title": assignment.title,
-                "max_marks": assignment.max_marks,
-                "marking_criterion": assignment.marking_criterion.id,
-            }
-        )
-
-    for exam in exams:
-        marking_options.append(
-            {
-                "assessment_type": "exam",
-                "id": exam.id,
-                "title": exam.title,
-                "max_marks": exam.max_marks,
-                "marking_criterion": exam.marking_criterion.id,
+                "assessment_type": assessment.assessment_type,
+                "id": assessment.source_id,
+                "title": assessment.title,
+                "max_marks": assessment.max_marks,
+                "marking_criterion": assessment.marking_criterion_id,
             }
         )
 
@@ -469,8 +444,7 @@ class MarkList(APIView):
     @staticmethod
     def post(request):
         data = request.data.copy()
-        employee = Employee.objects.get(user=request.user)
-        active_academic_year = get_active_academic_year(employee.institution)
+        active_academic_year = get_actor_context(request, Employee)['academic_year']
         data["academic_year"] = active_academic_year.id
 
         serializer = MarksWriteSerializer(data=data)
@@ -483,8 +457,7 @@ class MarkList(APIView):
     def get(request):
         params = request.query_params
 
-        employee = Employee.objects.get(user=request.user)
-        active_academic_year = get_active_academic_year(employee.institution)
+        active_academic_year = get_actor_context(request, Employee)['academic_year']
 
         marks = Mark.objects.filter(
             Q(class_subject=params.get("class_subject"))
@@ -498,6 +471,52 @@ class MarkList(APIView):
         return success_w_data(data=marks, msg="Marks fetched successfully")
 
 
+class Gradebook(APIView):
+    permission_classes = [IsAuthenticated, IsTeacher]
+
+    @staticmethod
+    def get(request):
+        params = request.query_params
+
+        context = get_actor_context(request, Employee)
+        employee = context['profile']
+        active_academic_year = context['academic_year']
+
+        class_subject = ClassSubject.objects.select_related("_class").filter(
+            pk=params.get("class_subject"), teacher=employee
+        ).first()
+        if class_subject is None:
+            return err_w_msg(msg="Class subject not found")
+
+        gradebook = get_gradebook(class_subject, active_academic_year, params.get("term"))
+
+        return success_w_data(data=gradebook, msg="Gradebook fetched successfully")
+
+    @staticmethod
+    def put(request):
+        serializer = GradebookWriteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return err_w_serializer(serializer.errors)
+        data = serializer.validated_data
+
+        context = get_actor_context(request, Employee)
+        employee = context['profile']
+        active_academic_year = context['academic_year']
+
+        class_subject = ClassSubject.objects.select_related("_class").filter(
+            pk=data.get("class_subject"), teacher=employee
+        ).first()
+        if class_subject is None:
+            return err_w_msg(msg="Class subject not found")
+
+        try:
+            counts = save_gradebook(class_subject, active_academic_year, data)
+        except ValueError as e:
+            return err_w_msg(msg=str(e))
+
+        return success_w_data(data=counts, msg="Gradebook saved successfully")
+
+
 class MarkDetail(APIView):
     permission_classes = [IsAuthenticated, IsTeacher]
 
@@ -529,89 +548,39 @@ class MarkDetail(APIView):
 @permission_classes([IsAuthenticated, IsStudent])
 def get_students_monthly_calendar(request):
     params = request.query_params
-    student = Student.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(student.institution)
-
-    current_month_start_date = datetime.strptime(
-        params.get("date"), "%Y-%m-%d"
-    ).replace(day=1)
-    current_month_end_date = current_month_start_date.replace(
-        day=1, month=current_month_start_date.month + 1
-    ) - timedelta(days=1)
-
-    # loop through the days of the month
-    monthly_calendar = []
-    current_date = current_month_start_date
-    while current_date <= current_month_end_date:
-        day = {
-            "date": current_date.strftime("%Y-%m-%d"),
-            "day": current_date.strftime("%A"),
-            "periods": [],
-            "assignments_due": [],
-            "exams": [],
-        }
-
-        # periods
-        periods = (
-            Period.objects.select_related(
-                "class_subject___class", "class_subject__subject"
-            )
-            .filter(
-                Q(class_subject___class__students=student)
-                & filter_by_period_day(current_date.strftime("%A"))
-            )
-            .order_by("period")
-        )
-        for period in periods:
-            day["periods"].append(
-                {
-                    "id": period.id,
-                    "title": f"{period.class_subject._class.name} - ({period.start} - {period.end})",
-                    "subject": period.class_subject.subject.name,
-                }
-            )
-
-        # assignments
-        assignments = Assignment.objects.filter(
-            Q(class_subject___class__students=student)
-            & Q(due_date__date=current_date)
-            & filter_by_academic_year(active_academic_year)
-        ).order_by("due_date")
-
-        for assignment in assignments:
-            last_time = assignment.due_date.time()
-            first_time = (datetime.combine(datetime.min, last_time) - timedelta(minutes=60)).time()
-            day["assignments_due"].append(
-                {
-                    "id": assignment.id,
-                    "title": f"{assignment.title} - ({first_time} - {last_time})",
-                    "subject": assignment.class_subject.subject.name,
-                }
-            )
-
-        # exams
-        exams = Exam.objects.filter(
-            Q(class_subject___class__students=student)
-            & Q(
-                date__day=current_date.day,
-                date__month=current_date.month,
-                date__year=current_date.year,
-            )
-            & filter_by_academic_year(active_academic_year)
-        ).order_by("date")
+    context = get_actor_context(request, Student)
+    student = context['profile']
+    active_academic_year = context['academic_year']
 
-        for exam in exams:
-            day["exams"].append(
-                {
-                    "id": exam.id,
-                    "title": f'{exam.title} - ({exam.start} - {exam.end})',
-                    "subject": exam.class_subject.subject.name,
-                }
-            )
+    try:
+        start, end = get_calendar_range(params)
+    except (TypeError, ValueError) as e:
+        return err_w_msg(msg=str(e))
 
-        monthly_calendar.append(day)
+    days = get_calendar_days(start, end)
 
-        current_date += timedelta(days=1)
+    periods = Period.objects.select_related(
+        "class_subject___class", "class_subject__subject"
+    ).filter(
+        Q(class_subject___class__students=student)
+    ).order_by("period")
+
+    assignments = Assignment.objects.select_related("class_subject__subject").filter(
+        Q(class_subject___class__students=student)
+        & filter_by_academic_year(active_academic_year)
+    ).order_by("due_date")
+
+    exams = Exam.objects.select_related("class_subject__subject").filter(
+        Q(class_subject___class__students=student)
+        & filter_by_academic_year(active_academic_year)
+    ).order_by("date")
+
+    monthly_calendar = assemble_calendar(days, {
+        "periods": bucket_weekly(periods, days, serialize_calendar_period),
+        "assignments_due": bucket_dated(assignments, start, end, serialize_calendar_assignment,
+                                        date_field="due_date"),
+        "exams": bucket_dated(exams, start, end, serialize_calendar_exam),
+    })
 
     return success_w_data(
         data=monthly_calendar, msg="Monthly calendar fetched successfully"
@@ -622,8 +591,7 @@ def get_students_monthly_calendar(request):
 @permission_classes([IsAuthenticated, IsStudent])
 def get_attendance_list_for_student(request):
     params = request.query_params
-    student = Student.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(student.institution)
+    student = get_actor_context(request, Student)['profile']
 
     attendance = Attendance.objects.select_related(
         "student", "attendance_group"
@@ -637,23 +605,42 @@ def get_attendance_list_for_student(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsStudent])
 def get_student_attendance_all_classes(request):
-    student = Student.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(student.institution)
+    params = request.query_params
+    context = get_actor_context(request, Student)
+    student = context['profile']
+
+    # the active academic year unless another one of the student's institution is asked for
+    academic_year = context['academic_year']
+    if params.get("academic_year"):
+        academic_year = AcademicYear.objects.filter(
+            id=params.get("academic_year"), institution=student.institution_id
+        ).first()
+        if academic_year is None:
+            return err_w_msg("AcademicYear not found", status=HTTP_404_NOT_FOUND)
 
-    attendance = Attendance.objects.select_related(
-        "student", "attendance_group"
-    ).filter(Q(student=student))
-    attendance = AttendanceReadSerializer(attendance, many=True).data
-    return success_w_data(data=attendance, msg="Attendance fetched successfully")
+    attendance = Attendance.objects.filter(
+        Q(student=student)
+        & filter_by_academic_year(academic_year)
+        & filter_by_term(params.get("term"))
+    )
+
+    if params.get("summary") == "true":
+        return success_w_data(
+            data=get_attendance_summary(attendance), msg="Attendance summary fetched successfully"
+        )
+
+    attendance = attendance.select_related("lesson__period", "attendance_group").order_by("-id")
+    return get_paginated_response(request, attendance, AttendanceHistorySerializer, cursor=True)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsStudent])
 def get_assignments_for_student(request):
     params = request.query_params
-    student = Student.objects.get(user=request.user)
+    context = get_actor_context(request, Student)
+    student = context['profile']
 
-    active_academic_year = get_active_academic_year(student.institution)
+    active_academic_year = context['academic_year']
 
     assignments = Assignment.objects.filter(
         Q(class_subject=params.get("class_subject"))
@@ -670,12 +657,13 @@ def get_assignments_for_student(request):
 @permission_classes([IsAuthenticated, IsStudent])
 def get_exams_for_students(request):
     params = request.query_params
-    student = Student.objects.get(user=request.user)
+    context = get_actor_context(request, Student)
+    student = context['profile']
 
     exams = Exam.objects.filter(
         Q(class_subject=params.get("class_subject"))
         & Q(class_subject___class__students=student)
-        & filter_by_academic_year(get_active_academic_year(student.institution))
+        & filter_by_academic_year(context['academic_year'])
     ).order_by("-id")
 
     exams = ExamReadSerializer(exams, many=True).data
@@ -686,7 +674,7 @@ def get_exams_for_students(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsStudent])
 def get_class_subject_list_for_students(request):
-    student = Student.objects.get(user=request.user)
+    student = get_actor_context(request, Student)['profile']
 
     class_subjects = ClassSubject.objects.filter(Q(_class__students=student)).order_by(
         "-id"
@@ -702,8 +690,9 @@ def get_class_subject_list_for_students(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsStudent])
 def get_periods_for_students(request):
-    student = Student.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(student.institution)
+    context = get_actor_context(request, Student)
+    student = context['profile']
+    active_academic_year = context['academic_year']
 
     periods = Period.objects.filter(
         Q(class_subject___class__students=student)
@@ -719,8 +708,7 @@ def get_periods_for_students(request):
 @permission_classes([IsAuthenticated, IsTeacher])
 def submit_term_result(request):
     data = request.data.copy()
-    employee = Employee.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(employee.institution)
+    active_academic_year = get_actor_context(request, Employee)['academic_year']
     data["academic_year"] = active_academic_year.id
     # duplicate check
     term_result = TermResult.objects.filter(
@@ -749,6 +737,42 @@ def submit_term_result(request):
     return err_w_msg(msg=serializer.errors)
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsTeacher])
+def compute_class_subject_term_results(request):
+    data = request.data
+    context = get_actor_context(request, Employee)
+    employee = context['profile']
+    active_academic_year = context['academic_year']
+
+    class_subject = ClassSubject.objects.filter(pk=data.get("class_subject"), teacher=employee).first()
+    if class_subject is None:
+        return err_w_msg(msg="Class subject not found")
+
+    term = Terms.objects.filter(pk=data.get("term")).first()
+    if term is None:
+        return err_w_msg(msg="Term not found")
+
+    grade_boundaries = data.get("grade_boundaries")
+    if grade_boundaries is not None:
+        try:
+            validate_grade_boundaries(grade_boundaries)
+        except ValidationError as e:
+            return err_w_msg(msg=e.detail[0])
+
+    counts = compute_term_results([class_subject.id], term, active_academic_year, grade_boundaries)
+    rank_term_results(term, active_academic_year)
+
+    term_results = TermResult.objects.filter(
+        class_subject=class_subject, term=term, academic_year=active_academic_year
+    ).order_by("-total_marks")
+
+    return success_w_data(
+        data={**counts, "results": TermResultReadSerializer(term_results, many=True).data},
+        msg="Term results computed successfully"
+    )
+
+
 def filter_term_results_by_student(student):
     if student is None:
         return Q()
@@ -766,8 +790,7 @@ def filter_term_results_by_term(term):
 def get_term_result(request):
     params = request.query_params
 
-    employee = Employee.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(employee.institution)
+    active_academic_year = get_actor_context(request, Employee)['academic_year']
 
     term_results = TermResult.objects.filter(
         Q(class_subject=params.get("class_subject"))
@@ -802,11 +825,32 @@ def update_settings(request):
     return err_w_msg(msg=serializer.errors)
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def materialize_lessons_view(request):
+    data = request.data
+
+    academic_year = AcademicYear.objects.filter(
+        id=data.get("academic_year"), institution__organization=request.user.organization
+    ).first()
+    if academic_year is None:
+        return err_w_msg("AcademicYear not found", status=HTTP_404_NOT_FOUND)
+
+    try:
+        start = datetime.strptime(data["start"], "%Y-%m-%d").date() if data.get("start") else None
+        end = datetime.strptime(data["end"], "%Y-%m-%d").date() if data.get("end") else None
+    except (TypeError, ValueError):
+        return err_w_msg("start and end must be YYYY-MM-DD dates")
+
+    count = materialize_lessons(academic_year, start, end)
+    return success_w_data(data={"lessons": count}, msg="Lessons materialized successfully")
+
+
 # get students marks
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsStudent])
 def get_student_marks(request):
-    student = Student.objects.get(user=request.user)
+    student = get_actor_context(request, Student)['profile']
     subject = request.query_params.get('subject')
 
     filters = Q(student=student)
@@ -822,7 +866,7 @@ def get_student_marks(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsStudent])
 def get_student_term_results(request):
-    student = Student.objects.get(user=request.user)
+    student = get_actor_context(request, Student)['profile']
     term_results = TermResult.objects.filter(student=student)
     term_results = TermResultReadSerializer(term_results, many=True).data
     return success_w_data(data=term_results, msg="Term results fetched successfully")
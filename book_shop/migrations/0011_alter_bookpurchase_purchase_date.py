@@ -0,0 +1,18 @@
+# Generated by Django 4.0.2 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('book_shop', '0010_alter_publisher_email_alter_publisher_website'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bookpurchase',
+            name='purchase_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
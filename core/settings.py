@@ -11,7 +11,9 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+from datetime import datetime
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -117,6 +119,28 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+# local memory by default, set REDIS_URL to share the cache between processes.
+# a local memory cache is per process and misses the invalidations made by the others: caches whose staleness
+# matters (authenticated users) are only used when SHARED_CACHE is set, cached reports expire sooner without it
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+    SHARED_CACHE = True
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    SHARED_CACHE = False
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -169,6 +193,37 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Tokens issued before refresh token rotation carry no type and can not be revoked by a logout or password reset.
+# set LEGACY_TOKEN_CUTOVER (an ISO date or datetime, in TIME_ZONE unless it has an offset) to refuse them from then
+# on; unset, they are honored until they expire
+LEGACY_TOKEN_CUTOVER = datetime.fromisoformat(os.environ['LEGACY_TOKEN_CUTOVER']) \
+    if os.environ.get('LEGACY_TOKEN_CUTOVER') else None
+if LEGACY_TOKEN_CUTOVER is not None and LEGACY_TOKEN_CUTOVER.tzinfo is None:
+    LEGACY_TOKEN_CUTOVER = LEGACY_TOKEN_CUTOVER.replace(tzinfo=ZoneInfo(TIME_ZONE))
+
 # CORS setting
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Scheduled jobs
+# run by `manage.py run_scheduler`, cron expressions (minute hour day month weekday) in TIME_ZONE.
+# a task takes no arguments and returns a json serializable result, stored on its JobRun
+
+SCHEDULED_JOBS = {
+    'generate_invoices': {
+        'cron': '0 * * * *',
+        'task': 'institutions.methods.generate_invoices.generate_invoices',
+    },
+    'materialize_lessons': {
+        'cron': '30 1 * * *',
+        'task': 'academic.methods.lessons.materialize_upcoming_lessons',
+    },
+    'purge_expired_tokens': {
+        'cron': '0 3 * * *',
+        'task': 'users.auth_utils.purge_expired_tokens',
+    },
+    'purge_job_runs': {
+        'cron': '30 3 * * 0',
+        'task': 'fundamentals.scheduler.purge_job_runs',
+    },
+}
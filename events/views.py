@@ -5,10 +5,11 @@ from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.status import HTTP_404_NOT_FOUND, HTTP_400_BAD_REQUEST
 from rest_framework.permissions import IsAuthenticated
-from datetime import datetime, timedelta
 
 from fundamentals.custom_responses import success_w_msg, success_w_data, err_w_serializer, get_paginated_response, \
     err_w_msg
+from fundamentals.calendars import get_calendar_range, get_calendar_days, bucket_weekly, bucket_dated, \
+    merge_buckets, assemble_calendar
 from fundamentals.common_queries import search_by_name, filter_by_institution
 from fundamentals.common_queries import search_by_name
 from .models.activity import Activity, ActivityReadSerializer, ActivityWriteSerializer
@@ -17,7 +18,7 @@ from employees.models.employees import Employee
 from students.models.students import Student, StudentReadSerializer
 from .models.age_group_activity import AgeGroupActivity, AgeGroupActivityReadSerializer, AgeGroupActivityWriteSerializer
 from events.models.activity_timetables import ActivityPeriod, ActivityPeriodReadSerializer, ActivityPeriodWriteSerializer
-from institutions.methods.academic_year import get_active_academic_year
+from institutions.methods.actor_context import get_actor_context
 from .models.event import Event, EventReadSerializer, EventWriteSerializer
 from users.permissions import IsTeacher
 
@@ -380,77 +381,42 @@ def delete_activity_period(request, pk):
 def get_monthly_events_calendar(request):
     params = request.query_params
 
-    # employee = Employee.objects.get(user=request.user)
-    # active_academic_year = get_active_academic_year(employee.institution)
-
-    current_month_start_date = datetime.strptime(
-        params.get("date"), "%Y-%m-%d"
-    ).replace(day=1)
-    current_month_end_date = current_month_start_date.replace(
-        day=1, month=current_month_start_date.month + 1
-    ) - timedelta(days=1)
-
-    # loop through the days of the month
-    monthly_calendar = []
-    current_date = current_month_start_date
-    while current_date <= current_month_end_date:
-        day = {
-            "date": current_date.strftime("%Y-%m-%d"),
-            "day": current_date.strftime("%A"),
-        }
-
-        events = []
-
-        # periods
-        periods = (
-            ActivityPeriod.objects.select_related(
-                "age_group_activity__age_group", "age_group_activity__activity", 
-            )
-            .filter(
-                # Q(class_subject__teacher__user=request.user)& 
-                Q(institution__organization=request.user.organization) &
-                filter_by_period_day(current_date.strftime("%A"))
-            )
-            .order_by("period")
-        )
-        for period in periods:
-            events.append(
-                {
-                    "type": "activity",
-                    "id": period.id,
-                    "title": f"{period.age_group_activity.age_group.name} - ({period.start} - {period.end})",
-                    "subject": period.age_group_activity.activity.name,
-                }
-            )
-
-        # events
-        events_list = Event.objects.filter(
-            # Q(class_subject__teacher__user=request.user)
-            Q(organization=request.user.organization)
-            & Q(
-                date__day=current_date.day,
-                date__month=current_date.month,
-                date__year=current_date.year,
-            )
-        ).order_by("date")
-
-        for event in events_list:
-            events.append(
-                {
-                    "type": event.type,
-                    "id": event.id,
-                    "title": f'{event.title} - ({event.start} - {event.end})',
-                    "activity": ''
-                }
-            )
-
-        day["events"] = events
-        monthly_calendar.append(day)
-
-        current_date += timedelta(days=1)
+    try:
+        start, end = get_calendar_range(params)
+    except (TypeError, ValueError) as e:
+        return err_w_msg(msg=str(e))
+
+    days = get_calendar_days(start, end)
+
+    # periods
+    periods = ActivityPeriod.objects.select_related(
+        "age_group_activity__age_group", "age_group_activity__activity",
+    ).filter(
+        Q(institution__organization=request.user.organization)
+    ).order_by("period")
+
+    # events
+    events_list = Event.objects.filter(
+        Q(organization=request.user.organization)
+    ).order_by("date")
+
+    events = merge_buckets(
+        bucket_weekly(periods, days, lambda period: {
+            "type": "activity",
+            "id": period.id,
+            "title": f"{period.age_group_activity.age_group.name} - ({period.start} - {period.end})",
+            "subject": period.age_group_activity.activity.name,
+        }),
+        bucket_dated(events_list, start, end, lambda event: {
+            "type": event.type,
+            "id": event.id,
+            "title": f'{event.title} - ({event.start} - {event.end})',
+            "activity": ''
+        }),
+    )
 
     return success_w_data(
-        data=monthly_calendar, msg="Monthly calendar fetched successfully"
+        data=assemble_calendar(days, {"events": events}), msg="Monthly calendar fetched successfully"
     )
 
 
@@ -534,7 +500,7 @@ def filter_by_academic_year(academic_year):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsTeacher])
 def get_teachers_age_group_list(request):
-    employee = Employee.objects.get(user=request.user)
+    employee = get_actor_context(request, Employee)['profile']
 
     age_group_activities = AgeGroupActivity.objects.filter(teacher=employee).order_by("-id")
     age_group_activities = AgeGroupActivityReadSerializer(age_group_activities, many=True).data
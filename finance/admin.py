@@ -2,8 +2,10 @@ from django.contrib import admin
 
 from .models.charge_types import ChargeType
 from .models.invoices import Invoice
+from .models.payment_daily_summaries import PaymentDailySummary
 from .models.payments import Payment
 
 admin.site.register(ChargeType)
 admin.site.register(Invoice)
-admin.site.register(Payment)
\ No newline at end of file
+admin.site.register(Payment)
+admin.site.register(PaymentDailySummary)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from finance.methods.payment_daily_summaries import rebuild_payment_daily_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the payment daily summaries from the payments table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--institution', type=int, help='only rebuild the summaries of this institution')
+
+    def handle(self, *args, **options):
+        count = rebuild_payment_daily_summaries(options.get('institution'))
+        self.stdout.write(self.style.SUCCESS(f'{count} payment daily summaries rebuilt'))
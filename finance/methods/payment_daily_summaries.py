@@ -0,0 +1,101 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from finance.models.payment_daily_summaries import PaymentDailySummary
+from finance.models.payments import Payment
+
+# payment fields the rollup depends on
+SUMMARY_FIELDS = ('institution_id', 'date', 'status', 'amount')
+
+
+def apply_payment_delta(institution_id, date, status, count, amount):
+    """
+    Adds `count` and `amount` (both may be negative) to the rollup row of an institution, date and status
+    :param institution_id: pk
+    :param date: date
+    :param status: Payment status
+    :param count: int
+    :param amount: int
+    :return: None
+    """
+    row = PaymentDailySummary.objects.filter(institution_id=institution_id, date=date, status=status)
+
+    if row.update(count=F('count') + count, amount=F('amount') + amount):
+        return
+
+    try:
+        with transaction.atomic():
+            PaymentDailySummary.objects.create(
+                institution_id=institution_id, date=date, status=status, count=count, amount=amount
+            )
+    except IntegrityError:
+        # created by a concurrent payment in the meantime
+        row.update(count=F('count') + count, amount=F('amount') + amount)
+
+
+def get_payment_summary_key(payment):
+    """
+    Returns the rollup key and amount of a payment
+    :param payment: Payment | dict of its values
+    :return: tuple (institution_id, date, status, amount)
+    """
+    if not isinstance(payment, dict):
+        payment = {field: getattr(payment, field) for field in SUMMARY_FIELDS}
+
+    # values assigned on an unsaved instance may still be strings
+    return (
+        payment['institution_id'],
+        Payment._meta.get_field('date').to_python(payment['date']),
+        payment['status'],
+        Payment._meta.get_field('amount').to_python(payment['amount']),
+    )
+
+
+def move_payment(previous, current):
+    """
+    Moves a payment between rollup rows, `previous` is None for new payments and `current` is None for deleted ones
+    :param previous: Payment | dict | None
+    :param current: Payment | dict | None
+    :return: None
+    """
+    previous_key = get_payment_summary_key(previous) if previous is not None else None
+    current_key = get_payment_summary_key(current) if current is not None else None
+
+    if previous_key == current_key:
+        return
+
+    if previous_key is not None:
+        institution_id, date, status, amount = previous_key
+        apply_payment_delta(institution_id, date, status, -1, -amount)
+
+    if current_key is not None:
+        institution_id, date, status, amount = current_key
+        apply_payment_delta(institution_id, date, status, 1, amount)
+
+
+def rebuild_payment_daily_summaries(institution=None) -> int:
+    """
+    Recomputes the rollup from the payments table
+    :param institution: pk | None for every institution
+    :return: number of rollup rows written
+    """
+    institution_filter = Q() if institution is None else Q(institution=institution)
+
+    rows = Payment.objects.filter(institution_filter).values('institution', 'date', 'status').annotate(
+        count=Count('id'),
+        amount=Sum('amount'),
+    ).order_by()
+
+    with transaction.atomic():
+        PaymentDailySummary.objects.filter(institution_filter).delete()
+        summaries = PaymentDailySummary.objects.bulk_create([
+            PaymentDailySummary(
+                institution_id=row['institution'],
+                date=row['date'],
+                status=row['status'],
+                count=row['count'],
+                amount=row['amount'] or 0,
+            ) for row in rows.iterator()
+        ], batch_size=1000)
+
+    return len(summaries)
@@ -0,0 +1,51 @@
+# Generated by Django 4.0.2 on 2026-10-18 09:20
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def backfill_payment_daily_summaries(apps, schema_editor):
+    Payment = apps.get_model('finance', 'Payment')
+    PaymentDailySummary = apps.get_model('finance', 'PaymentDailySummary')
+
+    rows = Payment.objects.values('institution', 'date', 'status').annotate(
+        count=Count('id'),
+        amount=Sum('amount'),
+    ).order_by()
+
+    PaymentDailySummary.objects.bulk_create([
+        PaymentDailySummary(
+            institution_id=row['institution'],
+            date=row['date'],
+            status=row['status'],
+            count=row['count'],
+            amount=row['amount'] or 0,
+        ) for row in rows.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institutions', '0034_alter_organization_next_payment_date'),
+        ('finance', '0011_invoice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('paid', 'Paid'), ('due', 'Due'), ('void', 'Void')], max_length=10)),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.BigIntegerField(default=0)),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='institutions.institution')),
+            ],
+            options={
+                'unique_together': {('institution', 'date', 'status')},
+            },
+        ),
+        migrations.RunPython(backfill_payment_daily_summaries, migrations.RunPython.noop),
+    ]
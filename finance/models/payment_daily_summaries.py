@@ -0,0 +1,29 @@
+from django.db import models
+from rest_framework import serializers
+
+from finance.models.payments import Payment
+from institutions.models.institution import Institution
+
+
+class PaymentDailySummary(models.Model):
+    """
+    Daily rollup of payments per institution and status.
+    Kept up to date by `finance.signals`, rebuilt with `manage.py rebuild_payment_daily_summaries`.
+    """
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE)
+    date = models.DateField()
+    status = models.CharField(max_length=10, choices=Payment.status_choices)
+    count = models.IntegerField(default=0)
+    amount = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['institution', 'date', 'status']
+
+    def __str__(self):
+        return f'{self.institution_id} - {self.date} - {self.status}'
+
+
+class PaymentDailySummaryReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PaymentDailySummary
+        fields = '__all__'
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from finance.methods.payment_daily_summaries import SUMMARY_FIELDS, move_payment
+from finance.models.payments import Payment
+
+
+@receiver(pre_save, sender=Payment, dispatch_uid='payment_summary_pre_save')
+def remember_previous_payment(sender, instance, **kwargs):
+    instance._previous_summary_values = None
+    if instance.pk is not None:
+        instance._previous_summary_values = Payment.objects.filter(pk=instance.pk).values(*SUMMARY_FIELDS).first()
+
+
+@receiver(post_save, sender=Payment, dispatch_uid='payment_summary_post_save')
+def update_summary_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    move_payment(getattr(instance, '_previous_summary_values', None), instance)
+
+
+@receiver(post_delete, sender=Payment, dispatch_uid='payment_summary_post_delete')
+def update_summary_on_delete(sender, instance, **kwargs):
+    move_payment(instance, None)
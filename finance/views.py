@@ -1,9 +1,9 @@
 import requests
 import calendar
 import os
-from datetime import timedelta
 
-from django.db.models import Q
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
 from rest_framework.decorators import APIView, permission_classes, api_view
 from rest_framework.permissions import IsAuthenticated
@@ -17,6 +17,7 @@ from users.permissions import IsBursar, IsSuperUser
 from .models.charge_types import ChargeType, ChargeTypeWriteSerializer, ChargeTypeReadSerializer
 from .models.charges import Charge, ChargeWriteSerializer, ChargeReadSerializer
 from .models.invoices import Invoice, InvoicesReadSerializer
+from .models.payment_daily_summaries import PaymentDailySummary
 from .models.payment_types import PaymentType, PaymentTypeWriteSerializer, PaymentTypeReadSerializer
 from .models.payments import (Payment, PaymentWriteSerializer, PaymentReadSerializer, filter_by_institution,
                               filter_by_student, filter_by_date_range)
@@ -264,19 +265,16 @@ def get_monthly_revenue(request):
     organization = request.user.organization
     today = timezone.now()
     current_year = today.year
-    monthly_revenue = {}
+    monthly_revenue = {calendar.month_name[month]: 0 for month in range(1, 13)}
 
-    for month in range(1, 13):
-        start_of_month = timezone.datetime(current_year, month, 1)
-        end_of_month = (start_of_month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    # read from the daily rollup, one grouped query for the whole year
+    totals = PaymentDailySummary.objects.filter(
+        Q(institution__organization=organization)
+        & Q(date__year=current_year)
+    ).annotate(month=TruncMonth('date')).values('month').annotate(total=Sum('amount')).order_by()
 
-        payments = Payment.objects.filter(
-            Q(organization=organization)
-            & filter_by_date_range(start_of_month.strftime('%Y-%m-%d'), end_of_month.strftime('%Y-%m-%d'))
-        )
-        total = sum([payment.amount for payment in payments])
-        month_name = calendar.month_name[month]
-        monthly_revenue[month_name] = total
+    for row in totals:
+        monthly_revenue[calendar.month_name[row['month'].month]] = row['total']
 
     return success_w_data(monthly_revenue)
 
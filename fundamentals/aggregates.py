@@ -0,0 +1,36 @@
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import Aggregate, FloatField, IntegerField, Subquery
+
+
+class PercentileCont(Aggregate):
+    """
+    PostgreSQL continuous percentiles of an expression, computed in the same scan as other aggregates.
+    Returns one value per requested fraction, e.g. PercentileCont('total_marks', [0.25, 0.5, 0.75])
+    """
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(fractions)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fractions, **extra):
+        fractions = [float(fraction) for fraction in fractions]
+        if not fractions or any(fraction < 0 or fraction > 1 for fraction in fractions):
+            raise ValueError('Percentile fractions must be between 0 and 1')
+
+        super().__init__(
+            expression,
+            fractions='ARRAY[%s]::double precision[]' % ', '.join(repr(fraction) for fraction in fractions),
+            output_field=ArrayField(FloatField()),
+            **extra
+        )
+
+
+class SubqueryCount(Subquery):
+    """
+    Number of rows of a (usually OuterRef-correlated) queryset, 0 when it is empty.
+    Lets several counts over different tables be annotated on one row in a single query.
+    """
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = IntegerField()
+
+    def __init__(self, queryset, **extra):
+        super().__init__(queryset.order_by().values('pk'), **extra)
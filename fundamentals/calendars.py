@@ -0,0 +1,124 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+CALENDAR_RANGES = ('month', 'week')
+
+# longest range served in one request, enough for a term
+MAX_CALENDAR_DAYS = 200
+
+
+def get_datetime_range(start, end) -> tuple:
+    """
+    Converts an inclusive date range into a half-open range of aware datetimes in the current time zone,
+    so a DateTimeField can be filtered with `__gte`/`__lt` and still use its index
+    :param start: date, inclusive
+    :param end: date, inclusive
+    :return: tuple (start datetime, datetime after the end date)
+    """
+    return (
+        timezone.make_aware(datetime.combine(start, datetime.min.time())),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), datetime.min.time())),
+    )
+
+
+def get_calendar_range(params) -> tuple:
+    """
+    Resolves the dates a calendar request covers.
+    `start` and `end` (YYYY-MM-DD) give an explicit range, e.g. a term, since terms carry no dates;
+    otherwise `range` (month | week, default month) around `date`.
+    :param params: request.query_params
+    :return: tuple (start date, end date), raises ValueError on invalid params
+    """
+    if params.get('start') or params.get('end'):
+        start = datetime.strptime(params.get('start'), '%Y-%m-%d').date()
+        end = datetime.strptime(params.get('end'), '%Y-%m-%d').date()
+
+        if start > end:
+            raise ValueError('start must be before end')
+        if (end - start).days >= MAX_CALENDAR_DAYS:
+            raise ValueError(f'a calendar can cover at most {MAX_CALENDAR_DAYS} days')
+        return start, end
+
+    range_type = params.get('range', 'month')
+    if range_type not in CALENDAR_RANGES:
+        raise ValueError(f'range must be one of {", ".join(CALENDAR_RANGES)}')
+
+    date = datetime.strptime(params.get('date'), '%Y-%m-%d').date()
+
+    if range_type == 'week':
+        start = date - timedelta(days=date.weekday())
+        return start, start + timedelta(days=6)
+
+    start = date.replace(day=1)
+    next_month_start = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start, next_month_start - timedelta(days=1)
+
+
+def get_calendar_days(start, end) -> list:
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def bucket_weekly(queryset, days, serialize, day_field='day') -> dict:
+    """
+    Expands weekly rows (e.g. timetable periods) onto every date of the range with their weekday.
+    The queryset is read once.
+    :param queryset: Queryset of rows with a weekday name field
+    :param days: list of dates
+    :param serialize: function row -> dict
+    :param day_field: weekday field name
+    :return: dict date -> list of dicts
+    """
+    by_weekday = defaultdict(list)
+    for row in queryset:
+        by_weekday[getattr(row, day_field)].append(serialize(row))
+
+    return {day: by_weekday[day.strftime('%A')] for day in days}
+
+
+def bucket_dated(queryset, start, end, serialize, date_field='date') -> dict:
+    """
+    Groups dated rows (e.g. exams, events) by their local date.
+    The queryset is read once, filtered on a half-open datetime range.
+    :param queryset: Queryset, ordered as the entries of a day should be
+    :param start: date, inclusive
+    :param end: date, inclusive
+    :param serialize: function row -> dict
+    :param date_field: DateTimeField name
+    :return: dict date -> list of dicts
+    """
+    range_start, range_end = get_datetime_range(start, end)
+
+    buckets = defaultdict(list)
+    for row in queryset.filter(**{f'{date_field}__gte': range_start, f'{date_field}__lt': range_end}):
+        buckets[timezone.localtime(getattr(row, date_field)).date()].append(serialize(row))
+
+    return buckets
+
+
+def merge_buckets(*buckets) -> dict:
+    """
+    Concatenates the entries of several bucketed sources per date, in the order of the sources
+    :param buckets: dicts date -> list
+    :return: dict date -> list
+    """
+    merged = defaultdict(list)
+    for source in buckets:
+        for day, entries in source.items():
+            merged[day].extend(entries)
+    return merged
+
+
+def assemble_calendar(days, sources) -> list:
+    """
+    Builds the calendar response, one entry per date with the entries of every source under its key
+    :param days: list of dates
+    :param sources: dict key -> dict date -> list
+    :return: list of dicts
+    """
+    return [{
+        'date': day.strftime('%Y-%m-%d'),
+        'day': day.strftime('%A'),
+        **{key: list(buckets.get(day, [])) for key, buckets in sources.items()},
+    } for day in days]
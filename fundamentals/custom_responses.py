@@ -1,6 +1,10 @@
+import csv
 import json
 
-from rest_framework.pagination import PageNumberPagination
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.http import StreamingHttpResponse
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.response import Response
 from rest_framework.status import HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED, HTTP_200_OK, HTTP_403_FORBIDDEN
 
@@ -15,6 +19,17 @@ def err_w_msg(msg: object, status: object = HTTP_400_BAD_REQUEST) -> object:
     return Response({'err': True, 'msg': msg}, status=status if status is not None else HTTP_400_BAD_REQUEST)
 
 
+def err_w_data(data, msg, status=HTTP_400_BAD_REQUEST):
+    """
+    returns an error api response with given message, data describing the error and status code
+    :param data:
+    :param msg: String
+    :param status: Int
+    :return: Response
+    """
+    return Response({'err': True, 'msg': msg, 'data': data}, status=status)
+
+
 def err_no_auth():
     """
     return an unauthorized api response with 401 status code
@@ -78,16 +93,80 @@ def success_w_data(data, msg='Success', status=HTTP_200_OK):
     return Response({'msg': msg, 'err': False, 'results': data}, status=status)
 
 
-def get_paginated_response(request, queryset, serializer):
+class KeysetPagination(CursorPagination):
+    """
+    cursor pagination keyed on the queryset's own ordering (or `-id`), pages are fetched with an indexed
+    `WHERE key < cursor` instead of an OFFSET scan and no COUNT(*) is run unless asked for
+    """
+    page_size = 10
+    page_size_query_param = 'limit'
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+    def get_paginated_response_with_count(self, data, count):
+        response = self.get_paginated_response(data)
+        if count is not None:
+            response.data['count'] = count
+            response.data.move_to_end('count', last=False)
+        return response
+
+
+def get_keyset_ordering(queryset):
+    """
+    returns the ordering used as pagination key, cursors can only be built on the model's own fields
+    :param queryset: Queryset
+    :return: tuple
+    """
+    ordering = tuple(field for field in queryset.query.order_by if isinstance(field, str))
+    if not ordering or any('__' in field for field in ordering):
+        return '-id',
+    return ordering
+
+
+def get_estimated_count(queryset):
+    """
+    returns the planner's row estimate of a queryset (PostgreSQL EXPLAIN), far cheaper than COUNT(*) on large tables
+    :param queryset: Queryset
+    :return: int
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def get_paginated_response(request, queryset, serializer, cursor=False):
     """
-    returns a paginated response
+    returns a paginated response.
+    page number pagination by default, `pagination=cursor` (or a `cursor` param) switches to keyset pagination
+    with opaque next/previous cursors, `count=exact|estimate` adds a total to cursor pages
     :param request: request.query_params
     :param queryset: Queryset
     :param serializer: Serializer
+    :param cursor: always use keyset pagination, for endpoints over large, growing tables
     :return: Response
     """
     params = request.query_params
 
+    if cursor or params.get('pagination') == 'cursor' or params.get('cursor'):
+        paginator = KeysetPagination(ordering=get_keyset_ordering(queryset))
+
+        count = None
+        if params.get('count') == 'exact':
+            count = queryset.count()
+        elif params.get('count') == 'estimate':
+            count = get_estimated_count(queryset)
+
+        raw_data = paginator.paginate_queryset(queryset, request)
+        data = serializer(raw_data, many=True, context={'request': request}).data
+
+        return paginator.get_paginated_response_with_count(data, count)
+
     # paginator settings
     paginator = PageNumberPagination()
     paginator.page_size = params.get('limit') if params.get('limit') else 10
@@ -96,3 +175,59 @@ def get_paginated_response(request, queryset, serializer):
     data = serializer(raw_data, many=True, context={'request': request}).data
 
     return paginator.get_paginated_response(data)
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class _EchoBuffer:
+    """
+    file-like object handing every line written by csv.writer straight back to the caller
+    """
+
+    @staticmethod
+    def write(value):
+        return value
+
+
+def iter_export_lines(queryset, columns, export_format, chunk_size=2000):
+    """
+    yields the rows of a queryset as csv or ndjson lines, reading them through a server-side cursor
+    :param queryset: Queryset
+    :param columns: list of (header, lookup) tuples
+    :param export_format: csv | ndjson
+    :param chunk_size: rows fetched per round trip
+    :return: generator of str
+    """
+    headers = [header for header, _ in columns]
+    rows = queryset.values_list(*[lookup for _, lookup in columns]).iterator(chunk_size=chunk_size)
+
+    if export_format == 'csv':
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow(row)
+        return
+
+    for row in rows:
+        yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def streaming_export_response(queryset, columns, export_format, file_name):
+    """
+    returns a streaming csv or ndjson download of a queryset, memory use does not grow with the number of rows
+    :param queryset: Queryset
+    :param columns: list of (header, lookup) tuples
+    :param export_format: csv | ndjson
+    :param file_name: download name without extension
+    :return: StreamingHttpResponse
+    """
+    response = StreamingHttpResponse(
+        iter_export_lines(queryset, columns, export_format),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{file_name}.{export_format}"'
+    return response
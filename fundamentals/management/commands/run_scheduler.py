@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from fundamentals.scheduler import get_scheduled_jobs, run_scheduled_job
+
+# longest sleep between two checks of the schedule
+MAX_SLEEP = 60
+
+
+class Command(BaseCommand):
+    help = 'Runs the jobs of SCHEDULED_JOBS on their cron schedules, once per scheduled time across all nodes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--run', metavar='JOB', help='run this job now and exit')
+
+    def handle(self, *args, **options):
+        schedules = get_scheduled_jobs()
+
+        if options.get('run'):
+            if options['run'] not in schedules:
+                raise CommandError(f'{options["run"]} is not a scheduled job, choose from {", ".join(schedules)}')
+            self.report(options['run'], run_scheduled_job(options['run'], timezone.now()))
+            return
+
+        now = timezone.now()
+        next_runs = {name: schedule.next_after(now) for name, schedule in schedules.items()}
+        for name, next_run in next_runs.items():
+            self.stdout.write(f'{name} ({schedules[name].expression}) next at {timezone.localtime(next_run)}')
+
+        while True:
+            now = timezone.now()
+
+            for name in sorted(next_runs, key=next_runs.get):
+                if next_runs[name] > now:
+                    continue
+
+                close_old_connections()
+                self.report(name, run_scheduled_job(name, next_runs[name]))
+                # runs missed while a job was running are skipped, not caught up
+                next_runs[name] = schedules[name].next_after(max(timezone.now(), next_runs[name]))
+
+            close_old_connections()
+            sleep = (min(next_runs.values()) - timezone.now()).total_seconds()
+            time.sleep(min(max(sleep, 0), MAX_SLEEP))
+
+    def report(self, name, run):
+        if run is None:
+            self.stdout.write(f'{name} skipped, run by another node')
+        else:
+            self.stdout.write(f'{name} {run.status} in {run.duration.total_seconds():.1f}s')
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class ZarRate(models.Model):
@@ -7,3 +8,34 @@ class ZarRate(models.Model):
 
     def __str__(self):
         return f'{self.date} - {self.rate}'
+
+
+class JobRun(models.Model):
+    """
+    One run of a scheduled job of `manage.py run_scheduler` (see SCHEDULED_JOBS).
+    A job runs once per scheduled time however many schedulers are running: (job, scheduled_for) is unique.
+    """
+    status_choices = (
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+
+    job = models.CharField(max_length=100)
+    scheduled_for = models.DateTimeField()
+    status = models.CharField(max_length=10, choices=status_choices, default='running')
+
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    hostname = models.CharField(max_length=255, blank=True)
+
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration = models.DurationField(null=True, blank=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['job', 'scheduled_for'], name='unique_job_run')]
+        indexes = [models.Index(fields=['job', '-started_at'])]
+
+    def __str__(self):
+        return f'{self.job} - {self.scheduled_for} - {self.status}'
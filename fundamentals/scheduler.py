@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import socket
+import time
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from fundamentals.models import JobRun
+
+logger = logging.getLogger(__name__)
+
+# runs older than this are deleted by the purge_job_runs job
+JOB_RUN_RETENTION = timedelta(days=90)
+
+# cron field -> (minimum, maximum); weekday 0 and 7 are both Sunday
+CRON_FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day', 1, 31),
+    ('month', 1, 12),
+    ('weekday', 0, 7),
+)
+
+# a date matching the day and month fields exists within this many days, leap days included
+CRON_SEARCH_DAYS = 366 * 8
+
+
+def parse_cron_field(value, minimum, maximum) -> set:
+    """
+    Parses one field of a cron expression: *, n, a-b, with an optional /step, separated by commas
+    :return: set of int
+    """
+    values = set()
+
+    for part in value.split(','):
+        step = 1
+        if '/' in part:
+            part, step = part.split('/', 1)
+            step = int(step)
+
+        if part == '*':
+            start, end = minimum, maximum
+        elif '-' in part:
+            start, end = (int(bound) for bound in part.split('-', 1))
+        else:
+            start = int(part)
+            end = maximum if step > 1 else start
+
+        if start < minimum or end > maximum or start > end or step < 1:
+            raise ValueError(f'{value} is out of range {minimum}-{maximum}')
+        values.update(range(start, end + 1, step))
+
+    return values
+
+
+class CronSchedule:
+    """
+    A cron expression (minute hour day month weekday) evaluated in the current time zone.
+    As in cron, a date matches when both its day and weekday match, or either one when both are restricted.
+    """
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != len(CRON_FIELDS):
+            raise ValueError(f'{expression} is not a cron expression of {len(CRON_FIELDS)} fields')
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            parse_cron_field(field, minimum, maximum)
+            for field, (_, minimum, maximum) in zip(fields, CRON_FIELDS)
+        )
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.day_restricted = not fields[2].startswith('*')
+        self.weekday_restricted = not fields[4].startswith('*')
+
+    def matches_date(self, date) -> bool:
+        if date.month not in self.months:
+            return False
+
+        day_matches = date.day in self.days
+        # cron counts weekdays from sunday, python from monday
+        weekday_matches = (date.weekday() + 1) % 7 in self.weekdays
+
+        if self.day_restricted and self.weekday_restricted:
+            return day_matches or weekday_matches
+        return day_matches and weekday_matches
+
+    def next_after(self, moment):
+        """
+        Returns the first time matching the schedule strictly after a moment
+        :param moment: aware datetime
+        :return: aware datetime, raises ValueError when the schedule never matches (e.g. 31 February)
+        """
+        start = timezone.localtime(moment).replace(second=0, microsecond=0, tzinfo=None) + timedelta(minutes=1)
+
+        for offset in range(CRON_SEARCH_DAYS):
+            date = start.date() + timedelta(days=offset)
+            if not self.matches_date(date):
+                continue
+
+            for hour in sorted(self.hours):
+                for minute in sorted(self.minutes):
+                    candidate = datetime.combine(date, dt_time(hour, minute))
+                    if candidate >= start:
+                        return timezone.make_aware(candidate)
+
+        raise ValueError(f'{self.expression} never matches')
+
+
+def get_scheduled_jobs() -> dict:
+    """
+    Parses the SCHEDULED_JOBS setting
+    :return: dict job name -> CronSchedule
+    """
+    return {name: CronSchedule(job['cron']) for name, job in settings.SCHEDULED_JOBS.items()}
+
+
+def get_lock_key(name) -> int:
+    # a stable signed 64 bit key, python's hash() differs between processes
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+@contextmanager
+def advisory_lock(name):
+    """
+    Holds a PostgreSQL session advisory lock while the block runs, so a job runs on one node at a time.
+    The lock is released with the session if the process dies. Yields whether the lock was acquired;
+    other databases have no advisory locks and always acquire it (one scheduler only).
+    :param name: str
+    """
+    if connection.vendor != 'postgresql':
+        yield True
+        return
+
+    key = get_lock_key(name)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [key])
+        acquired = cursor.fetchone()[0]
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [key])
+
+
+def run_scheduled_job(name, scheduled_for):
+    """
+    Runs a scheduled job under its advisory lock and records the run. Skipped when another node holds the lock
+    or has already run the job for this scheduled time.
+    :param name: key of SCHEDULED_JOBS
+    :param scheduled_for: aware datetime the run is due at
+    :return: JobRun | None when skipped
+    """
+    task = import_string(settings.SCHEDULED_JOBS[name]['task'])
+
+    with advisory_lock(f'scheduler:{name}') as acquired:
+        if not acquired or JobRun.objects.filter(job=name, scheduled_for=scheduled_for).exists():
+            return None
+
+        run = JobRun.objects.create(job=name, scheduled_for=scheduled_for, hostname=socket.gethostname())
+        started = time.monotonic()
+
+        try:
+            run.result = task()
+            run.status = 'completed'
+        except Exception as e:
+            logger.exception('scheduled job %s failed', name)
+            run.error = str(e)
+            run.status = 'failed'
+
+        run.duration = timedelta(seconds=time.monotonic() - started)
+        run.finished_at = timezone.now()
+        run.save(update_fields=['result', 'error', 'status', 'duration', 'finished_at'])
+
+    return run
+
+
+def purge_job_runs() -> int:
+    """
+    Deletes the job runs older than JOB_RUN_RETENTION, run by the scheduler (see SCHEDULED_JOBS)
+    :return: number of runs deleted
+    """
+    deleted, _ = JobRun.objects.filter(started_at__lt=timezone.now() - JOB_RUN_RETENTION).delete()
+    return deleted
@@ -0,0 +1,71 @@
+import io
+import os
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+
+S3_ENDPOINT_URL = 'https://school-management-sytem-ljas123d.s3.eu-west-2.amazonaws.com/'
+
+# download links of stored files expire after this many seconds
+FILE_URL_EXPIRY = 60 * 60
+
+# uploads are sent part by part from one thread, so at most one part is held in memory
+UPLOAD_CONFIG = TransferConfig(use_threads=False)
+
+
+def get_s3_client():
+    return boto3.client('s3',
+                        aws_access_key_id=os.environ.get('AWS_KEY'),
+                        aws_secret_access_key=os.environ.get('AWS_SECRET'),
+                        endpoint_url=S3_ENDPOINT_URL)
+
+
+class _LineStream(io.RawIOBase):
+    """
+    read-only file-like object over a generator of str, encoding the lines as they are read
+    """
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            line = next(self.lines, None)
+            if line is None:
+                return 0
+            self.pending = line.encode()
+
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+def upload_lines(lines, key, content_type):
+    """
+    uploads a generator of lines as one file, in multipart chunks, memory use does not grow with the file
+    :param lines: generator of str, e.g. iter_export_lines
+    :param key: object key in the S3_BUCKET bucket
+    :param content_type: str
+    :return: None
+    """
+    get_s3_client().upload_fileobj(io.BufferedReader(_LineStream(lines)), os.environ.get('S3_BUCKET'), key,
+                                   ExtraArgs={'ContentType': content_type}, Config=UPLOAD_CONFIG)
+
+
+def get_file_url(key, file_name):
+    """
+    returns a temporary download link of a stored file
+    :param key: object key in the S3_BUCKET bucket
+    :param file_name: download name
+    :return: str
+    """
+    return get_s3_client().generate_presigned_url('get_object', Params={
+        'Bucket': os.environ.get('S3_BUCKET'),
+        'Key': key,
+        'ResponseContentDisposition': f'attachment; filename="{file_name}"',
+    }, ExpiresIn=FILE_URL_EXPIRY)
@@ -1,3 +1,85 @@
-from django.test import TestCase
+from datetime import date, datetime
 
-# Create your tests here.
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from fundamentals.scheduler import CronSchedule, get_lock_key, parse_cron_field
+
+
+def local(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class ParseCronFieldTests(SimpleTestCase):
+    def test_forms(self):
+        self.assertEqual(parse_cron_field('*', 0, 5), {0, 1, 2, 3, 4, 5})
+        self.assertEqual(parse_cron_field('3', 0, 59), {3})
+        self.assertEqual(parse_cron_field('1-3', 0, 59), {1, 2, 3})
+        self.assertEqual(parse_cron_field('*/20', 0, 59), {0, 20, 40})
+        self.assertEqual(parse_cron_field('10-30/10', 0, 59), {10, 20, 30})
+        self.assertEqual(parse_cron_field('5/20', 0, 59), {5, 25, 45})
+        self.assertEqual(parse_cron_field('1,5,1-2', 0, 59), {1, 2, 5})
+
+    def test_out_of_range(self):
+        for value in ('60', '5-1', '*/0', '0', '-1'):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_cron_field(value, 1, 59)
+
+
+class CronScheduleTests(SimpleTestCase):
+    def test_needs_five_fields(self):
+        with self.assertRaises(ValueError):
+            CronSchedule('* * * *')
+
+    def test_next_minute_is_strictly_after(self):
+        schedule = CronSchedule('* * * * *')
+        self.assertEqual(schedule.next_after(local(2026, 10, 18, 10, 0)), local(2026, 10, 18, 10, 1))
+        self.assertEqual(schedule.next_after(local(2026, 10, 18, 10, 0, 59)), local(2026, 10, 18, 10, 1))
+
+    def test_rolls_over_hour_day_month_and_year(self):
+        self.assertEqual(CronSchedule('0 * * * *').next_after(local(2026, 10, 18, 10, 30)),
+                         local(2026, 10, 18, 11, 0))
+        self.assertEqual(CronSchedule('30 1 * * *').next_after(local(2026, 10, 18, 1, 30)),
+                         local(2026, 10, 19, 1, 30))
+        self.assertEqual(CronSchedule('0 0 1 * *').next_after(local(2026, 10, 18, 0, 0)),
+                         local(2026, 11, 1, 0, 0))
+        self.assertEqual(CronSchedule('0 0 1 1 *').next_after(local(2026, 12, 31, 23, 59)),
+                         local(2027, 1, 1, 0, 0))
+
+    def test_leap_day(self):
+        self.assertEqual(CronSchedule('0 0 29 2 *').next_after(local(2026, 10, 18, 0, 0)),
+                         local(2028, 2, 29, 0, 0))
+
+    def test_never_matching_schedule(self):
+        with self.assertRaises(ValueError):
+            CronSchedule('0 0 31 2 *').next_after(local(2026, 10, 18, 0, 0))
+
+    def test_weekdays_count_from_sunday(self):
+        # 2026-10-18 is a Sunday
+        self.assertTrue(CronSchedule('* * * * 0').matches_date(date(2026, 10, 18)))
+        self.assertTrue(CronSchedule('* * * * 7').matches_date(date(2026, 10, 18)))
+        self.assertFalse(CronSchedule('* * * * 1-5').matches_date(date(2026, 10, 18)))
+        self.assertEqual(CronSchedule('0 9 * * 1-5').next_after(local(2026, 10, 17, 9, 0)),
+                         local(2026, 10, 19, 9, 0))
+
+    def test_day_or_weekday_when_both_are_restricted(self):
+        schedule = CronSchedule('0 0 13 * 5')
+        # friday the 23rd matches by weekday, sunday the 13th of december by day
+        self.assertEqual(schedule.next_after(local(2026, 10, 18, 0, 0)), local(2026, 10, 23, 0, 0))
+        self.assertTrue(schedule.matches_date(date(2026, 12, 13)))
+        self.assertFalse(schedule.matches_date(date(2026, 12, 14)))
+
+    def test_day_and_weekday_when_one_starts_with_a_wildcard(self):
+        schedule = CronSchedule('0 0 */2 * 5')
+        # odd days that are fridays only
+        self.assertTrue(schedule.matches_date(date(2026, 10, 23)))
+        self.assertFalse(schedule.matches_date(date(2026, 10, 30)))
+        self.assertFalse(schedule.matches_date(date(2026, 10, 21)))
+
+
+class LockKeyTests(SimpleTestCase):
+    def test_stable_signed_64_bit(self):
+        key = get_lock_key('scheduler:generate_invoices')
+        self.assertEqual(key, get_lock_key('scheduler:generate_invoices'))
+        self.assertNotEqual(key, get_lock_key('scheduler:materialize_lessons'))
+        self.assertTrue(-2 ** 63 <= key < 2 ** 63)
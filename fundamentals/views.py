@@ -8,11 +8,11 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from PIL import Image
 from nanoid import generate
-import boto3
 from urllib.parse import quote
 
 from fundamentals.custom_responses import success_w_data
 from fundamentals.models import ZarRate
+from fundamentals.storage import S3_ENDPOINT_URL, get_s3_client
 
 
 # image upload endpoint
@@ -56,18 +56,14 @@ def upload_image(request):
     bucket = os.environ.get('S3_BUCKET')
     content_type = request.FILES['image'].content_type
     key = 'sys/' + final_file_name
-    s3 = boto3.client('s3',
-                      aws_access_key_id=os.environ.get('AWS_KEY'),
-                      aws_secret_access_key=os.environ.get('AWS_SECRET'),
-                      endpoint_url='https://school-management-sytem-ljas123d.s3.eu-west-2.amazonaws.com/')
+    s3 = get_s3_client()
 
     s3.upload_fileobj(file, bucket, key, ExtraArgs={'ContentType': content_type})
 
     # s3.put_object_acl(ACL='public-read', Bucket=bucket, Key=key)  # set permissions to public
 
     # creating new File object
-    base_url = 'https://school-management-sytem-ljas123d.s3.eu-west-2.amazonaws.com/'
-    file_url = base_url + bucket + '/' + key
+    file_url = S3_ENDPOINT_URL + bucket + '/' + key
 
     # encode the file url, remove special characters, spaces etc
     file_url = quote(file_url, safe=':/')
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class InstitutionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'institutions'
+
+    def ready(self):
+        # invalidating the cached actor contexts
+        from institutions import signals  # noqa: F401
@@ -0,0 +1,101 @@
+from django.core.cache import cache
+
+from institutions.methods.academic_year import get_active_academic_year
+from institutions.models.institution import Institution
+
+# the default cache is per process: a profile or institution changed in another process is seen at most this late.
+# the active academic year is never cached across requests, a change of academic year applies at once
+ACTOR_CONTEXT_TIMEOUT = 60
+
+# request attribute holding the contexts already resolved during the request
+REQUEST_CONTEXTS_ATTRIBUTE = '_actor_contexts'
+
+
+def get_actor_cache_key(model, user_id) -> str:
+    return f'actor-context:{model._meta.model_name}:{user_id}'
+
+
+def get_institution_context_cache_key(institution_id) -> str:
+    return f'actor-context:institution:{institution_id}'
+
+
+def invalidate_actor_context(model, user_id):
+    """
+    Drops the cached profile of a user, e.g. after the profile is saved or deleted
+    :param model: Employee | Student
+    :param user_id: pk | None
+    :return: None
+    """
+    if user_id is None:
+        return
+    cache.delete(get_actor_cache_key(model, user_id))
+
+
+def invalidate_institution_context(institution_id):
+    """
+    Drops the cached institution shared by every user of an institution
+    :param institution_id: pk | None
+    :return: None
+    """
+    if institution_id is None:
+        return
+    cache.delete(get_institution_context_cache_key(institution_id))
+
+
+def get_cached_institution(institution_id):
+    """
+    Returns the cached institution with its organization, loading it on a cache miss
+    :param institution_id: pk
+    :return: Institution
+    """
+    key = get_institution_context_cache_key(institution_id)
+    institution = cache.get(key)
+
+    if institution is None:
+        institution = Institution.objects.select_related('organization').get(pk=institution_id)
+        cache.set(key, institution, ACTOR_CONTEXT_TIMEOUT)
+
+    return institution
+
+
+def get_actor_profile(model, user):
+    key = get_actor_cache_key(model, user.pk)
+    profile = cache.get(key)
+
+    if profile is None:
+        profile = model.objects.get(user=user)
+        cache.set(key, profile, ACTOR_CONTEXT_TIMEOUT)
+
+    return profile
+
+
+def get_actor_context(request, model) -> dict:
+    """
+    Resolves the profile of the requesting user with its institution, organization and active academic year.
+    The context is resolved once per request; across requests the profile is cached per user and the
+    institution per institution, so a warm request costs one query, for the active academic year.
+    :param request: Request
+    :param model: Employee | Student
+    :return: dict with profile, institution, organization and academic_year,
+        raises model.DoesNotExist when the user has no such profile
+    """
+    contexts = getattr(request, REQUEST_CONTEXTS_ATTRIBUTE, None)
+    if contexts is None:
+        contexts = {}
+        setattr(request, REQUEST_CONTEXTS_ATTRIBUTE, contexts)
+
+    if model not in contexts:
+        profile = get_actor_profile(model, request.user)
+        institution = get_cached_institution(profile.institution_id)
+
+        # the profile is cached without its institution, which is shared by every user of the institution
+        profile.institution = institution
+
+        contexts[model] = {
+            'profile': profile,
+            'institution': institution,
+            'organization': institution.organization,
+            'academic_year': get_active_academic_year(institution),
+        }
+
+    return contexts[model]
@@ -1,29 +1,42 @@
+import logging
+
 from dateutil.relativedelta import relativedelta
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 
 from finance.models.invoices import Invoice
 from institutions.models.organization import Organization
 
+logger = logging.getLogger(__name__)
 
-def generate_invoices():
-    current_date = timezone.now().date()
 
-    print('inside generate_invoices: ', current_date)
+def generate_invoices() -> int:
+    """
+    Invoices the organizations whose payment is due, run by the scheduler (see SCHEDULED_JOBS).
+    Payments that fell due while the scheduler was down are invoiced on its next run.
+    :return: number of invoices created
+    """
+    current_date = timezone.localdate()
 
-    organization_with_next_payment_date_as_today = Organization.objects.filter(
-        Q(next_payment_date=current_date)
+    organizations_with_payment_due = Organization.objects.filter(
+        Q(next_payment_date__lte=current_date)
         & ~Q(last_invoice_generated=current_date)
     )
 
-    for organization in organization_with_next_payment_date_as_today:
-        print('Creating invoice for ', organization.name)
-        Invoice.objects.create(
-            organization=organization,
-            amount=organization.payment_amount,
-            date=current_date
-        )
-
-        organization.last_invoice_generated = current_date
-        organization.next_payment_date = current_date + relativedelta(months=organization.payment_frequency)
-        organization.save()
+    count = 0
+    for organization in organizations_with_payment_due:
+        logger.info('creating invoice for %s', organization.name)
+        with transaction.atomic():
+            Invoice.objects.create(
+                organization=organization,
+                amount=organization.payment_amount,
+                date=current_date
+            )
+
+            organization.last_invoice_generated = current_date
+            organization.next_payment_date = current_date + relativedelta(months=organization.payment_frequency)
+            organization.save()
+        count += 1
+
+    return count
@@ -0,0 +1,248 @@
+import heapq
+from collections import defaultdict
+from itertools import count
+
+from django.db.models import Q
+
+from employees.models.employees import Employee
+from institutions.models.class_subjects import ClassSubject
+from institutions.models.classes import Class
+from institutions.models.timetables import Period
+
+# overlap conflict type -> entry field the interval index is keyed on
+OVERLAP_INDEXES = {
+    'teacher_overlap': 'teacher',
+    'class_overlap': 'class',
+}
+
+
+def get_class_subjects(class_subject_ids, organization=None) -> dict:
+    """
+    Loads the class and teacher of class subjects with one query
+    :param class_subject_ids: iterable of pks
+    :param organization: Organization | None, only class subjects of this organization are returned
+    :return: dict pk -> {'institution', 'class', 'teacher', 'max_period_per_day'}
+    """
+    class_subjects = ClassSubject.objects.filter(id__in=set(class_subject_ids))
+    if organization is not None:
+        class_subjects = class_subjects.filter(institution__organization=organization)
+
+    return {
+        class_subject['id']: {
+            'institution': class_subject['institution_id'],
+            'class': class_subject['_class_id'],
+            'teacher': class_subject['teacher_id'],
+            'max_period_per_day': class_subject['_class__max_period_per_day'],
+        } for class_subject in class_subjects.values(
+            'id', 'institution_id', '_class_id', 'teacher_id', '_class__max_period_per_day'
+        )
+    }
+
+
+def get_period_values(data, period=None) -> dict:
+    """
+    Returns the values a period will have once validated data is saved, for the conflict checks
+    :param data: validated data of PeriodWriteSerializer (possibly partial) or PeriodUploadSerializer
+    :param period: Period being updated | None
+    :return: dict with id, class_subject (pk), day, period, start and end
+    """
+    values = {field: data.get(field, getattr(period, field, None)) for field in ('day', 'period', 'start', 'end')}
+
+    class_subject = data.get('class_subject', period.class_subject_id if period else None)
+    values['class_subject'] = getattr(class_subject, 'pk', class_subject)
+    values['id'] = period.pk if period else None
+    return values
+
+
+def build_candidate_entries(periods, class_subjects) -> list:
+    """
+    Turns submitted periods into timetable entries
+    :param periods: list of dicts with class_subject (pk), day, period, start, end and an optional id
+    :param class_subjects: see get_class_subjects
+    :return: list of entries
+    """
+    entries = []
+    for index, period in enumerate(periods):
+        class_subject = class_subjects[period['class_subject']]
+        entries.append({
+            'ref': {'index': index, 'period': period.get('id')},
+            'class_subject': period['class_subject'],
+            'class': class_subject['class'],
+            'teacher': class_subject['teacher'],
+            'day': period['day'],
+            'start': period['start'],
+            'end': period['end'],
+            'candidate': True,
+        })
+    return entries
+
+
+def load_existing_entries(institution_ids, class_ids=None, teacher_ids=None, days=None, exclude_ids=()) -> list:
+    """
+    Loads the stored periods an edit can conflict with in one query: those of the same classes or teachers
+    on the same days, or every period of the institutions when no classes and teachers are given
+    :return: list of entries
+    """
+    periods = Period.objects.filter(class_subject__institution__in=institution_ids).exclude(id__in=exclude_ids)
+
+    if class_ids is not None or teacher_ids is not None:
+        periods = periods.filter(
+            Q(class_subject___class__in=class_ids or [])
+            | Q(class_subject__teacher__in=[teacher for teacher in teacher_ids or [] if teacher is not None])
+        )
+    if days is not None:
+        periods = periods.filter(day__in=days)
+
+    return [{
+        'ref': {'period': period['id']},
+        'class_subject': period['class_subject_id'],
+        'class': period['class_subject___class_id'],
+        'teacher': period['class_subject__teacher_id'],
+        'day': period['day'],
+        'start': period['start'],
+        'end': period['end'],
+        'candidate': False,
+    } for period in periods.values(
+        'id', 'class_subject_id', 'class_subject___class_id', 'class_subject__teacher_id', 'day', 'start', 'end'
+    )]
+
+
+def build_interval_index(entries, field) -> dict:
+    """
+    Groups entries by owner (teacher or class) and day, each group sorted by start time
+    :param entries: list of entries
+    :param field: 'teacher' | 'class'
+    :return: dict (owner, day) -> list of entries
+    """
+    index = defaultdict(list)
+    for entry in entries:
+        if entry[field] is not None:
+            index[(entry[field], entry['day'])].append(entry)
+
+    for intervals in index.values():
+        intervals.sort(key=lambda entry: (entry['start'], entry['end']))
+    return index
+
+
+def sweep_overlaps(intervals):
+    """
+    Yields every overlapping pair of start-sorted intervals with a sweep line: the intervals still running
+    are kept in a heap by end time, so the cost is O(n log n) plus one step per overlap found
+    :param intervals: list of entries sorted by start
+    :return: generator of (entry, entry)
+    """
+    running = []
+    tiebreak = count()
+
+    for entry in intervals:
+        while running and running[0][0] <= entry['start']:
+            heapq.heappop(running)
+
+        for _, _, other in running:
+            yield other, entry
+
+        heapq.heappush(running, (entry['end'], next(tiebreak), entry))
+
+
+def find_conflicts(entries, max_periods=None) -> list:
+    """
+    Finds every conflict among timetable entries that involves at least one candidate entry
+    :param entries: list of entries, existing and candidate
+    :param max_periods: dict class pk -> max periods per day | None
+    :return: list of conflicts
+    """
+    conflicts = []
+
+    for entry in entries:
+        if entry['candidate'] and entry['start'] >= entry['end']:
+            conflicts.append({
+                'type': 'invalid_interval',
+                'day': entry['day'],
+                'periods': [entry['ref']],
+            })
+
+    valid_entries = [entry for entry in entries if entry['start'] < entry['end']]
+
+    for conflict_type, field in OVERLAP_INDEXES.items():
+        for (owner, day), intervals in build_interval_index(valid_entries, field).items():
+            for first, second in sweep_overlaps(intervals):
+                if not first['candidate'] and not second['candidate']:
+                    continue
+                conflicts.append({
+                    'type': conflict_type,
+                    field: owner,
+                    'day': day,
+                    'periods': [first['ref'], second['ref']],
+                })
+
+    for (class_id, day), intervals in build_interval_index(valid_entries, 'class').items():
+        maximum = (max_periods or {}).get(class_id)
+        if maximum is None or len(intervals) <= maximum:
+            continue
+        if not any(entry['candidate'] for entry in intervals):
+            continue
+        conflicts.append({
+            'type': 'max_periods_per_day',
+            'class': class_id,
+            'day': day,
+            'count': len(intervals),
+            'max': maximum,
+            'periods': [entry['ref'] for entry in intervals],
+        })
+
+    return conflicts
+
+
+def check_timetable(periods, class_subjects) -> list:
+    """
+    Validates submitted periods, new ones or edits of stored ones (with an id), against each other and against
+    the stored timetable of their classes and teachers, with one query for the stored periods
+    :param periods: list of dicts with class_subject (pk), day, period, start, end and an optional id
+    :param class_subjects: see get_class_subjects, must hold every submitted class subject
+    :return: list of conflicts, empty when the periods fit
+    """
+    if not periods:
+        return []
+
+    candidates = build_candidate_entries(periods, class_subjects)
+
+    existing = load_existing_entries(
+        institution_ids={class_subject['institution'] for class_subject in class_subjects.values()},
+        class_ids={entry['class'] for entry in candidates},
+        teacher_ids={entry['teacher'] for entry in candidates},
+        days={entry['day'] for entry in candidates},
+        exclude_ids={period['id'] for period in periods if period.get('id')},
+    )
+
+    max_periods = {
+        class_subject['class']: class_subject['max_period_per_day'] for class_subject in class_subjects.values()
+    }
+    return find_conflicts(existing + candidates, max_periods)
+
+
+def find_institution_conflicts(institution) -> list:
+    """
+    Reports every conflict of an institution's stored timetable
+    :param institution: Institution
+    :return: list of conflicts
+    """
+    entries = load_existing_entries([institution.pk])
+    for entry in entries:
+        entry['candidate'] = True
+
+    max_periods = dict(Class.objects.filter(institution=institution).values_list('id', 'max_period_per_day'))
+    return find_conflicts(entries, max_periods)
+
+
+def lock_timetable_owners(class_subjects):
+    """
+    Locks the classes and teachers of the class subjects, in id order, so concurrent timetable edits for
+    the same class or teacher are checked one after the other. Call inside a transaction.
+    :param class_subjects: see get_class_subjects
+    :return: None
+    """
+    class_ids = {class_subject['class'] for class_subject in class_subjects.values()}
+    teacher_ids = {class_subject['teacher'] for class_subject in class_subjects.values()} - {None}
+
+    list(Class.objects.select_for_update().filter(id__in=class_ids).order_by('id').values_list('id', flat=True))
+    list(Employee.objects.select_for_update().filter(id__in=teacher_ids).order_by('id').values_list('id', flat=True))
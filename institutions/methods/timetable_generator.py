@@ -0,0 +1,326 @@
+import random
+import time
+from collections import defaultdict
+
+from institutions.models.class_subjects import ClassSubject
+from institutions.models.classes import Class
+from institutions.models.institution import Institution
+from institutions.models.timetables import Period
+
+# seconds spent searching for a better timetable once a first one is found
+GENERATION_TIME_LIMIT = 5
+
+MAX_ATTEMPTS = 50
+
+
+def get_period_target(class_subject) -> int:
+    """
+    Returns the number of weekly periods to timetable for a class subject
+    :param class_subject: dict of ClassSubject values
+    :return: int
+    """
+    return class_subject['period_per_week_timetable'] or class_subject['period_per_week_official'] or 0
+
+
+def slot_overlaps(slot, start, end) -> bool:
+    return slot['start'] < end and start < slot['end']
+
+
+class TimetableState:
+    """
+    Occupancy of the weekly slots by class and teacher while a timetable is being built
+    """
+
+    def __init__(self, days, slots, max_periods):
+        self.days = days
+        self.slots = slots
+        self.max_periods = max_periods
+        self.class_busy = set()
+        self.teacher_busy = set()
+        self.class_day_count = defaultdict(int)
+        self.subject_day_count = defaultdict(int)
+
+    def is_free(self, class_subject, day, slot_index) -> bool:
+        class_id = class_subject['_class_id']
+        teacher_id = class_subject['teacher_id']
+
+        if (class_id, day, slot_index) in self.class_busy:
+            return False
+        if teacher_id is not None and (teacher_id, day, slot_index) in self.teacher_busy:
+            return False
+
+        maximum = self.max_periods.get(class_id)
+        return maximum is None or self.class_day_count[(class_id, day)] < maximum
+
+    def occupy(self, class_subject, day, slot_index, counted=True):
+        self.class_busy.add((class_subject['_class_id'], day, slot_index))
+        if class_subject['teacher_id'] is not None:
+            self.teacher_busy.add((class_subject['teacher_id'], day, slot_index))
+        if counted:
+            self.class_day_count[(class_subject['_class_id'], day)] += 1
+            self.subject_day_count[(class_subject['id'], day)] += 1
+
+    def release(self, class_subject, day, slot_index):
+        self.class_busy.discard((class_subject['_class_id'], day, slot_index))
+        if class_subject['teacher_id'] is not None:
+            self.teacher_busy.discard((class_subject['teacher_id'], day, slot_index))
+        self.class_day_count[(class_subject['_class_id'], day)] -= 1
+        self.subject_day_count[(class_subject['id'], day)] -= 1
+
+    def get_free_slots(self, class_subject) -> list:
+        return [
+            (day, slot_index)
+            for day in self.days
+            for slot_index in range(len(self.slots))
+            if self.is_free(class_subject, day, slot_index)
+        ]
+
+
+class Placements:
+    """
+    Periods placed by the generator, indexed by the class and teacher slots they hold so a blocking period
+    can be found and moved
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.by_class_slot = {}
+        self.by_teacher_slot = {}
+
+    def get_keys(self, class_subject, day, slot_index) -> list:
+        keys = [(self.by_class_slot, (class_subject['_class_id'], day, slot_index))]
+        if class_subject['teacher_id'] is not None:
+            keys.append((self.by_teacher_slot, (class_subject['teacher_id'], day, slot_index)))
+        return keys
+
+    def add(self, class_subject, day, slot_index):
+        self.state.occupy(class_subject, day, slot_index)
+        for index, key in self.get_keys(class_subject, day, slot_index):
+            index[key] = (class_subject, day, slot_index)
+
+    def remove(self, class_subject, day, slot_index):
+        self.state.release(class_subject, day, slot_index)
+        for index, key in self.get_keys(class_subject, day, slot_index):
+            del index[key]
+
+    def get_blockers(self, class_subject, day, slot_index):
+        """
+        Returns the placed periods holding a slot a class subject needs, None when the slot is held by
+        something that cannot move (a stored period or an unavailable teacher)
+        """
+        blockers = []
+        class_key = (class_subject['_class_id'], day, slot_index)
+        teacher_key = (class_subject['teacher_id'], day, slot_index)
+
+        if class_key in self.state.class_busy:
+            if class_key not in self.by_class_slot:
+                return None
+            blockers.append(self.by_class_slot[class_key])
+        if class_subject['teacher_id'] is not None and teacher_key in self.state.teacher_busy:
+            if teacher_key not in self.by_teacher_slot:
+                return None
+            if not blockers or self.by_teacher_slot[teacher_key] is not blockers[0]:
+                blockers.append(self.by_teacher_slot[teacher_key])
+
+        return blockers
+
+    def repair(self, class_subject) -> bool:
+        """
+        Places a period that found no free slot by moving the one placed period blocking a slot elsewhere
+        :param class_subject: dict of ClassSubject values
+        :return: bool, whether the period was placed
+        """
+        for day in self.state.days:
+            for slot_index in range(len(self.state.slots)):
+                blockers = self.get_blockers(class_subject, day, slot_index)
+                if not blockers or len(blockers) > 1:
+                    continue
+
+                blocker = blockers[0]
+                self.remove(*blocker)
+
+                if self.state.is_free(class_subject, day, slot_index):
+                    self.add(class_subject, day, slot_index)
+                    moves = [slot for slot in self.state.get_free_slots(blocker[0]) if slot != blocker[1:]]
+                    if moves:
+                        self.add(blocker[0], *moves[0])
+                        return True
+                    self.remove(class_subject, day, slot_index)
+
+                self.add(*blocker)
+
+        return False
+
+
+def get_slot_score(state, class_subject, day, slot_index, per_day, rng) -> tuple:
+    """
+    Ranks a free slot for a class subject, lower is better: spread a subject over the week first,
+    then balance the class's days, then keep days compact; ties are broken randomly
+    """
+    subject_count = state.subject_day_count[(class_subject['id'], day)]
+    return (
+        subject_count >= per_day,
+        subject_count,
+        state.class_day_count[(class_subject['_class_id'], day)],
+        slot_index,
+        rng.random(),
+    )
+
+
+def place_class_subjects(class_subjects, demand, state, rng) -> tuple:
+    """
+    Greedily places the periods of every class subject, most constrained first: class subjects of the busiest
+    teachers and with the most periods go before the others, so the scarce slots are not taken by flexible ones.
+    A period finding no free slot moves one blocking period elsewhere when it can.
+    :param class_subjects: list of dicts of ClassSubject values
+    :param demand: dict class subject pk -> number of periods to place
+    :param state: TimetableState, already holding the periods kept from the stored timetable
+    :param rng: Random
+    :return: tuple (list of (class subject, day, slot index), dict class subject pk -> periods not placed)
+    """
+    teacher_load = defaultdict(int)
+    for class_subject in class_subjects:
+        teacher_load[class_subject['teacher_id']] += demand[class_subject['id']]
+
+    order = sorted(class_subjects, key=lambda class_subject: (
+        -(teacher_load[class_subject['teacher_id']] if class_subject['teacher_id'] is not None else 0),
+        -demand[class_subject['id']],
+        rng.random(),
+    ))
+
+    placements = Placements(state)
+    unplaced = {}
+
+    for class_subject in order:
+        needed = demand[class_subject['id']]
+        per_day = -(-needed // len(state.days))
+
+        for _ in range(needed):
+            candidates = state.get_free_slots(class_subject)
+            if candidates:
+                placements.add(class_subject, *min(candidates, key=lambda candidate: get_slot_score(
+                    state, class_subject, candidate[0], candidate[1], per_day, rng
+                )))
+            elif not placements.repair(class_subject):
+                unplaced[class_subject['id']] = unplaced.get(class_subject['id'], 0) + 1
+
+    return list(placements.by_class_slot.values()), unplaced
+
+
+def get_taught_periods(institution: Institution):
+    """
+    Returns the periods of an institution with attendance taken in one of their lessons. They survive a timetable
+    replace: deleting a period deletes its lessons and, with them, their attendance.
+    :param institution: Institution
+    :return: Period queryset
+    """
+    return Period.objects.filter(
+        class_subject__institution=institution, lesson__attendance__isnull=False
+    ).distinct()
+
+
+def generate_timetable(institution: Institution, days, slots, unavailable=(), replace=False, seed=None) -> dict:
+    """
+    Builds a weekly timetable for the class subjects of an institution from their period targets
+    (period_per_week_timetable, or period_per_week_official), respecting teacher clashes, teacher unavailability
+    and Class.max_period_per_day. Stored periods are kept, occupy their slots and count towards their class
+    subject's target; with `replace`, only the periods with attendance taken are kept (see get_taught_periods).
+    The greedy placement is restarted with random tie-breaking until every period is placed, or the time limit
+    is reached, and the attempt with the fewest missing periods is kept.
+    :param institution: Institution
+    :param days: list of weekday names
+    :param slots: list of {'period', 'start', 'end'}, the daily slot structure
+    :param unavailable: list of {'teacher', 'day', 'period'}, slots a teacher cannot teach
+    :param replace: bool, generate the timetable again instead of completing it
+    :param seed: int | None, for reproducible timetables
+    :return: dict with the periods (unsaved Period objects) and the periods that could not be placed
+    """
+    slots = sorted(slots, key=lambda slot: slot['start'])
+    slot_indexes = {slot['period']: index for index, slot in enumerate(slots)}
+
+    class_subjects = list(ClassSubject.objects.filter(institution=institution).values(
+        'id', '_class_id', 'teacher_id', 'period_per_week_timetable', 'period_per_week_official',
+        '_class__max_period_per_day',
+    ))
+    max_periods = {
+        class_subject['_class_id']: class_subject['_class__max_period_per_day'] for class_subject in class_subjects
+    }
+    by_id = {class_subject['id']: class_subject for class_subject in class_subjects}
+
+    existing = get_taught_periods(institution) if replace \
+        else Period.objects.filter(class_subject__institution=institution)
+    existing = list(existing.values('class_subject_id', 'day', 'start', 'end'))
+
+    demand = {class_subject['id']: get_period_target(class_subject) for class_subject in class_subjects}
+    for period in existing:
+        demand[period['class_subject_id']] = max(demand[period['class_subject_id']] - 1, 0)
+
+    def build_initial_state():
+        state = TimetableState(days, slots, max_periods)
+        for period in existing:
+            class_subject = by_id[period['class_subject_id']]
+            # a stored period counts once for its day, but blocks every slot it overlaps
+            overlapping = [index for index, slot in enumerate(slots)
+                           if slot_overlaps(slot, period['start'], period['end'])]
+            for position, slot_index in enumerate(overlapping):
+                state.occupy(class_subject, period['day'], slot_index, counted=position == 0)
+            if not overlapping:
+                state.class_day_count[(class_subject['_class_id'], period['day'])] += 1
+                state.subject_day_count[(class_subject['id'], period['day'])] += 1
+        for entry in unavailable:
+            if entry['period'] in slot_indexes:
+                state.teacher_busy.add((entry['teacher'], entry['day'], slot_indexes[entry['period']]))
+        return state
+
+    rng = random.Random(seed)
+    deadline = time.monotonic() + GENERATION_TIME_LIMIT
+    best = None
+
+    for _ in range(MAX_ATTEMPTS):
+        placements, unplaced = place_class_subjects(class_subjects, demand, build_initial_state(), rng)
+        if best is None or sum(unplaced.values()) < sum(best[1].values()):
+            best = (placements, unplaced)
+        if not unplaced or time.monotonic() > deadline:
+            break
+
+    placements, unplaced = best
+    return {
+        'periods': [Period(
+            class_subject_id=class_subject['id'],
+            day=day,
+            period=slots[slot_index]['period'],
+            start=slots[slot_index]['start'],
+            end=slots[slot_index]['end'],
+        ) for class_subject, day, slot_index in placements],
+        'unplaced': [
+            {'class_subject': class_subject_id, 'periods': count} for class_subject_id, count in unplaced.items()
+        ],
+    }
+
+
+def lock_institution_timetable(institution: Institution):
+    """
+    Locks the classes of an institution in id order, so period edits wait for a timetable generation to finish.
+    Call inside a transaction.
+    :param institution: Institution
+    :return: None
+    """
+    list(Class.objects.select_for_update().filter(institution=institution).order_by('id').values_list('id', flat=True))
+
+
+def save_generated_timetable(institution: Institution, periods, replace=False) -> list:
+    """
+    Stores a generated timetable with one bulk insert, replacing the institution's stored periods if asked to.
+    A replace keeps the periods with attendance taken, so no attendance is deleted; the lessons materialized
+    ahead for the deleted periods go with them. Call inside the transaction the timetable was generated in.
+    :param institution: Institution
+    :param periods: list of unsaved Period
+    :param replace: bool
+    :return: list of Period
+    """
+    if replace:
+        Period.objects.filter(class_subject__institution=institution).exclude(
+            id__in=get_taught_periods(institution).values('id')
+        ).delete()
+
+    return Period.objects.bulk_create(periods, batch_size=1000)
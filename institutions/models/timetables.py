@@ -44,3 +44,54 @@ class PeriodReadSerializer(serializers.ModelSerializer):
     class Meta:
         model = Period
         fields = '__all__'
+
+
+class PeriodUploadSerializer(serializers.Serializer):
+    """
+    A period of a bulk timetable upload, class subjects are resolved in one query by the view
+    """
+    class_subject = serializers.IntegerField()
+    day = serializers.ChoiceField(choices=Period.day_choices)
+    period = serializers.IntegerField(min_value=0)
+    start = serializers.TimeField()
+    end = serializers.TimeField()
+
+
+WORKING_DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')
+
+
+class TimetableSlotSerializer(serializers.Serializer):
+    period = serializers.IntegerField(min_value=0)
+    start = serializers.TimeField()
+    end = serializers.TimeField()
+
+
+class TeacherUnavailabilitySerializer(serializers.Serializer):
+    teacher = serializers.IntegerField()
+    day = serializers.ChoiceField(choices=Period.day_choices)
+    period = serializers.IntegerField(min_value=0)
+
+
+class TimetableGenerationSerializer(serializers.Serializer):
+    institution = serializers.IntegerField()
+    days = serializers.ListField(child=serializers.ChoiceField(choices=Period.day_choices), allow_empty=False,
+                                 default=WORKING_DAYS)
+    slots = TimetableSlotSerializer(many=True, allow_empty=False)
+    unavailable = TeacherUnavailabilitySerializer(many=True, required=False, default=list)
+    replace = serializers.BooleanField(default=False)
+    allow_partial = serializers.BooleanField(default=False)
+    dry_run = serializers.BooleanField(default=False)
+    seed = serializers.IntegerField(required=False, allow_null=True, default=None)
+
+    def validate_slots(self, slots):
+        if len({slot['period'] for slot in slots}) != len(slots):
+            raise serializers.ValidationError('slot periods must be unique')
+
+        slots = sorted(slots, key=lambda slot: slot['start'])
+        for index, slot in enumerate(slots):
+            if slot['start'] >= slot['end']:
+                raise serializers.ValidationError('slots must end after they start')
+            if index and slots[index - 1]['end'] > slot['start']:
+                raise serializers.ValidationError('slots must not overlap')
+
+        return slots
@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from employees.models.employees import Employee
+from institutions.methods.actor_context import invalidate_actor_context, invalidate_institution_context
+from institutions.models.institution import Institution
+from institutions.models.organization import Organization
+from students.models.students import Student
+
+# profiles resolved by the actor context
+ACTOR_PROFILES = (Employee, Student)
+
+
+def remember_previous_user(sender, instance, **kwargs):
+    # a profile linked to another user stops being the context of the previous one
+    if instance.pk is None:
+        return
+    instance._previous_user_id = sender.objects.filter(pk=instance.pk).values_list('user_id', flat=True).first()
+
+
+def invalidate_actor_context_on_save(sender, instance, **kwargs):
+    invalidate_actor_context(sender, instance.user_id)
+
+    previous_user_id = getattr(instance, '_previous_user_id', None)
+    if previous_user_id != instance.user_id:
+        invalidate_actor_context(sender, previous_user_id)
+
+
+def invalidate_actor_context_on_delete(sender, instance, **kwargs):
+    invalidate_actor_context(sender, instance.user_id)
+
+
+def invalidate_institution_context_of_institution(sender, instance, **kwargs):
+    invalidate_institution_context(instance.pk)
+
+
+def invalidate_institution_contexts_of_organization(sender, instance, **kwargs):
+    for institution_id in Institution.objects.filter(organization=instance).values_list('id', flat=True):
+        invalidate_institution_context(institution_id)
+
+
+for model in ACTOR_PROFILES:
+    pre_save.connect(remember_previous_user, sender=model, dispatch_uid=f'actor_context_pre_save_{model.__name__}')
+    post_save.connect(invalidate_actor_context_on_save, sender=model,
+                      dispatch_uid=f'actor_context_post_save_{model.__name__}')
+    post_delete.connect(invalidate_actor_context_on_delete, sender=model,
+                        dispatch_uid=f'actor_context_post_delete_{model.__name__}')
+
+post_save.connect(invalidate_institution_context_of_institution, sender=Institution,
+                  dispatch_uid='actor_context_post_save_institution')
+post_delete.connect(invalidate_institution_context_of_institution, sender=Institution,
+                    dispatch_uid='actor_context_post_delete_institution')
+post_save.connect(invalidate_institution_contexts_of_organization, sender=Organization,
+                  dispatch_uid='actor_context_post_save_organization')
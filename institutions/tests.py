@@ -1,3 +1,271 @@
-from django.test import TestCase
+import random
+from datetime import date, time
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+
+from academic.models.lesson import Attendance, Lesson
+from institutions.methods.timetable_conflicts import build_interval_index, find_conflicts, sweep_overlaps
+from institutions.methods.timetable_generator import (
+    Placements, TimetableState, generate_timetable, place_class_subjects, save_generated_timetable
+)
+from institutions.models.academic_years import AcademicYear
+from institutions.models.class_subjects import ClassSubject
+from institutions.models.classes import Class
+from institutions.models.grades import Grade
+from institutions.models.institution import Institution
+from institutions.models.levels import Level
+from institutions.models.organization import Organization
+from institutions.models.subjects import Subject
+from institutions.models.timetables import Period
+from registry.models.attendance_group import AttendanceGroup
+from students.models.students import Student
+
+SLOTS = [
+    {'period': 1, 'start': time(8, 0), 'end': time(8, 40)},
+    {'period': 2, 'start': time(8, 40), 'end': time(9, 20)},
+]
+
+
+def make_entry(ref, start, end, teacher=1, _class=1, day='Monday', candidate=True):
+    return {
+        'ref': ref,
+        'class_subject': 1,
+        'class': _class,
+        'teacher': teacher,
+        'day': day,
+        'start': time(*start),
+        'end': time(*end),
+        'candidate': candidate,
+    }
+
+
+def get_pairs(conflicts, conflict_type):
+    return sorted(sorted(conflict['periods']) for conflict in conflicts if conflict['type'] == conflict_type)
+
+
+class SweepOverlapsTests(SimpleTestCase):
+    def sweep(self, *entries):
+        intervals = sorted(entries, key=lambda entry: (entry['start'], entry['end']))
+        return sorted(sorted((first['ref'], second['ref'])) for first, second in sweep_overlaps(intervals))
+
+    def test_touching_intervals_do_not_overlap(self):
+        self.assertEqual(self.sweep(make_entry(1, (8, 0), (9, 0)), make_entry(2, (9, 0), (10, 0))), [])
+
+    def test_nested_intervals(self):
+        outer = make_entry(1, (8, 0), (12, 0))
+        first = make_entry(2, (9, 0), (10, 0))
+        second = make_entry(3, (10, 0), (11, 0))
+        self.assertEqual(self.sweep(outer, first, second), [[1, 2], [1, 3]])
+
+    def test_every_pair_of_a_cluster(self):
+        entries = [make_entry(ref, (8, ref), (9, 0)) for ref in range(4)]
+        self.assertEqual(len(self.sweep(*entries)), 6)
+
+    def test_finished_intervals_leave_the_sweep(self):
+        entries = [make_entry(1, (8, 0), (8, 30)), make_entry(2, (8, 15), (9, 0)), make_entry(3, (8, 45), (9, 30))]
+        self.assertEqual(self.sweep(*entries), [[1, 2], [2, 3]])
+
+
+class FindConflictsTests(SimpleTestCase):
+    def test_overlaps_between_stored_periods_are_not_reported(self):
+        conflicts = find_conflicts([
+            make_entry(1, (8, 0), (9, 0), candidate=False),
+            make_entry(2, (8, 30), (9, 30), candidate=False),
+        ])
+        self.assertEqual(conflicts, [])
+
+    def test_candidate_overlapping_a_stored_period(self):
+        conflicts = find_conflicts([
+            make_entry(1, (8, 0), (9, 0), candidate=False),
+            make_entry(2, (8, 30), (9, 30)),
+        ])
+        self.assertEqual(get_pairs(conflicts, 'teacher_overlap'), [[1, 2]])
+        self.assertEqual(get_pairs(conflicts, 'class_overlap'), [[1, 2]])
+
+    def test_teacher_and_class_overlaps_are_told_apart(self):
+        conflicts = find_conflicts([
+            make_entry(1, (8, 0), (9, 0), teacher=1, _class=1),
+            make_entry(2, (8, 0), (9, 0), teacher=1, _class=2),
+            make_entry(3, (8, 0), (9, 0), teacher=2, _class=1),
+        ])
+        self.assertEqual(get_pairs(conflicts, 'teacher_overlap'), [[1, 2]])
+        self.assertEqual(get_pairs(conflicts, 'class_overlap'), [[1, 3]])
+
+    def test_other_days_do_not_overlap(self):
+        conflicts = find_conflicts([
+            make_entry(1, (8, 0), (9, 0), day='Monday'),
+            make_entry(2, (8, 0), (9, 0), day='Tuesday'),
+        ])
+        self.assertEqual(conflicts, [])
+
+    def test_periods_without_teacher_never_clash_on_teacher(self):
+        conflicts = find_conflicts([
+            make_entry(1, (8, 0), (9, 0), teacher=None, _class=1),
+            make_entry(2, (8, 0), (9, 0), teacher=None, _class=2),
+        ])
+        self.assertEqual(conflicts, [])
+
+    def test_invalid_interval_is_reported_and_left_out_of_overlaps(self):
+        conflicts = find_conflicts([
+            make_entry(1, (9, 0), (8, 0)),
+            make_entry(2, (8, 0), (9, 0)),
+        ])
+        self.assertEqual([conflict['type'] for conflict in conflicts], ['invalid_interval'])
+        self.assertEqual(conflicts[0]['periods'], [1])
+
+    def test_max_periods_per_day(self):
+        entries = [make_entry(ref, (8 + ref, 0), (9 + ref, 0), teacher=ref) for ref in range(3)]
+        conflicts = find_conflicts(entries, {1: 2})
+        self.assertEqual([conflict['type'] for conflict in conflicts], ['max_periods_per_day'])
+        self.assertEqual((conflicts[0]['count'], conflicts[0]['max']), (3, 2))
+
+        for entry in entries:
+            entry['candidate'] = False
+        self.assertEqual(find_conflicts(entries, {1: 2}), [])
+
+    def test_interval_index_is_sorted_by_start(self):
+        index = build_interval_index([
+            make_entry(1, (10, 0), (11, 0)),
+            make_entry(2, (8, 0), (9, 0)),
+            make_entry(3, (8, 0), (9, 0), teacher=None),
+        ], 'teacher')
+        self.assertEqual([entry['ref'] for entry in index[(1, 'Monday')]], [2, 1])
+        self.assertNotIn((None, 'Monday'), index)
+
+
+def make_class_subject(pk, _class=1, teacher=1):
+    return {'id': pk, '_class_id': _class, 'teacher_id': teacher}
+
+
+class TimetableStateTests(SimpleTestCase):
+    def test_max_periods_per_day(self):
+        state = TimetableState(['Monday'], SLOTS, {1: 1})
+        class_subject = make_class_subject(1)
+
+        state.occupy(class_subject, 'Monday', 0)
+        self.assertFalse(state.is_free(make_class_subject(2, teacher=2), 'Monday', 1))
+
+        state.release(class_subject, 'Monday', 0)
+        self.assertTrue(state.is_free(make_class_subject(2, teacher=2), 'Monday', 1))
+        self.assertEqual(state.class_day_count[(1, 'Monday')], 0)
+
+    def test_uncounted_slot_blocks_without_counting(self):
+        state = TimetableState(['Monday'], SLOTS, {1: 1})
+        state.occupy(make_class_subject(1), 'Monday', 0, counted=False)
+
+        self.assertFalse(state.is_free(make_class_subject(2, teacher=2), 'Monday', 0))
+        self.assertTrue(state.is_free(make_class_subject(2, teacher=2), 'Monday', 1))
+
+    def test_teacher_clash_across_classes(self):
+        state = TimetableState(['Monday'], SLOTS, {})
+        state.occupy(make_class_subject(1, _class=1, teacher=1), 'Monday', 0)
+
+        self.assertFalse(state.is_free(make_class_subject(2, _class=2, teacher=1), 'Monday', 0))
+        self.assertTrue(state.is_free(make_class_subject(3, _class=2, teacher=None), 'Monday', 0))
+
+
+class PlacementsRepairTests(SimpleTestCase):
+    def test_moves_the_blocking_period(self):
+        state = TimetableState(['Monday'], SLOTS, {})
+        placements = Placements(state)
+        moved = make_class_subject(1, teacher=1)
+        placed = make_class_subject(2, teacher=2)
+
+        placements.add(moved, 'Monday', 0)
+        # teacher 2 cannot teach the free slot, only the one held by class subject 1
+        state.teacher_busy.add((2, 'Monday', 1))
+
+        self.assertEqual(state.get_free_slots(placed), [])
+        self.assertTrue(placements.repair(placed))
+        self.assertEqual(placements.by_class_slot[(1, 'Monday', 0)][0], placed)
+        self.assertEqual(placements.by_class_slot[(1, 'Monday', 1)][0], moved)
+
+    def test_stored_periods_are_not_moved(self):
+        state = TimetableState(['Monday'], SLOTS, {})
+        placements = Placements(state)
+        state.occupy(make_class_subject(1, teacher=1), 'Monday', 0)
+        state.teacher_busy.add((2, 'Monday', 1))
+
+        self.assertFalse(placements.repair(make_class_subject(2, teacher=2)))
+        self.assertEqual(placements.by_class_slot, {})
+
+    def test_failed_repair_restores_the_blocker(self):
+        state = TimetableState(['Monday'], SLOTS, {})
+        placements = Placements(state)
+        blocker = make_class_subject(1, teacher=1)
+        placements.add(blocker, 'Monday', 0)
+        # the blocker has nowhere else to go
+        state.teacher_busy.add((1, 'Monday', 1))
+        state.teacher_busy.add((2, 'Monday', 1))
+
+        self.assertFalse(placements.repair(make_class_subject(2, teacher=2)))
+        self.assertEqual(placements.by_class_slot[(1, 'Monday', 0)][0], blocker)
+        self.assertEqual(state.class_day_count[(1, 'Monday')], 1)
+
+
+class PlaceClassSubjectsTests(SimpleTestCase):
+    def test_spreads_a_subject_over_the_week(self):
+        state = TimetableState(['Monday', 'Tuesday'], SLOTS, {})
+        placements, unplaced = place_class_subjects([make_class_subject(1)], {1: 2}, state, random.Random(1))
+
+        self.assertEqual(unplaced, {})
+        self.assertEqual(sorted(day for _, day, _ in placements), ['Monday', 'Tuesday'])
+
+    def test_reports_periods_over_the_daily_maximum(self):
+        state = TimetableState(['Monday'], SLOTS, {1: 1})
+        placements, unplaced = place_class_subjects([make_class_subject(1)], {1: 2}, state, random.Random(1))
+
+        self.assertEqual(len(placements), 1)
+        self.assertEqual(unplaced, {1: 1})
+
+    def test_shared_teacher_is_never_double_booked(self):
+        state = TimetableState(['Monday'], SLOTS, {})
+        class_subjects = [make_class_subject(1, _class=1, teacher=1), make_class_subject(2, _class=2, teacher=1)]
+        placements, unplaced = place_class_subjects(class_subjects, {1: 1, 2: 1}, state, random.Random(1))
+
+        self.assertEqual(unplaced, {})
+        self.assertEqual(sorted(slot_index for _, _, slot_index in placements), [0, 1])
+
+
+class TimetableReplaceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organization = Organization.objects.create(name='Organization')
+        cls.institution = Institution.objects.create(name='School', short_name='S', type='school',
+                                                     organization=organization)
+        grade = Grade.objects.create(name='Grade 1', short_name='G1', color='red',
+                                     level=Level.objects.create(name='Primary'))
+        _class = Class.objects.create(name='1A', short_name='1A', grade=grade, color='red',
+                                      institution=cls.institution)
+        cls.class_subject = ClassSubject.objects.create(
+            _class=_class, subject=Subject.objects.create(name='Maths', short_name='M', color='red'),
+            institution=cls.institution, period_per_week_timetable=2,
+        )
+        academic_year = AcademicYear.objects.create(name='2026', start_date=date(2026, 1, 1),
+                                                    end_date=date(2026, 12, 31), is_active=True,
+                                                    institution=cls.institution)
+        student = Student.objects.create(first_name='Ann', last_name='Moyo', gender='female',
+                                         institution=cls.institution, academic_year='2026', grade=grade,
+                                         language='English')
+
+        cls.taught = Period.objects.create(class_subject=cls.class_subject, day='Monday', **SLOTS[0])
+        cls.untaught = Period.objects.create(class_subject=cls.class_subject, day='Tuesday', **SLOTS[0])
+
+        lesson = Lesson.objects.create(period=cls.taught, date=date(2026, 3, 2), academic_year=academic_year)
+        Lesson.objects.create(period=cls.untaught, date=date(2026, 3, 3), academic_year=academic_year)
+        cls.attendance = Attendance.objects.create(
+            lesson=lesson, student=student, academic_year=academic_year,
+            attendance_group=AttendanceGroup.objects.create(name='Present', color='green'),
+        )
+
+    def test_replace_keeps_attendance(self):
+        timetable = generate_timetable(self.institution, ['Monday', 'Tuesday'], SLOTS, replace=True, seed=1)
+        save_generated_timetable(self.institution, timetable['periods'], replace=True)
+
+        self.assertTrue(Attendance.objects.filter(id=self.attendance.id).exists())
+        self.assertTrue(Period.objects.filter(id=self.taught.id).exists())
+        self.assertFalse(Period.objects.filter(id=self.untaught.id).exists())
+        self.assertFalse(Lesson.objects.filter(period=self.untaught.id).exists())
+
+        # the kept period counts towards the target of 2 periods
+        self.assertEqual(Period.objects.filter(class_subject=self.class_subject).count(), 2)
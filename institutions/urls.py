@@ -4,6 +4,7 @@ from .views import create_institution, get_institutions, GradeList, GradeView, S
     ClassDetails, ClassSubjectList, ClassSubjectDetails, add_students_to_class, get_students_in_class, \
     remove_student_from_class, AcademicYearList, AcademicYearDetails, TermsList, TermsDetails, RoomList, RoomDetails, \
     add_period, get_periods_of_a_class, update_period, delete_period, LevelList, LevelDetails, change_academic_year, \
+    add_periods, check_periods, get_timetable_conflicts, generate_periods, \
     get_organizations, create_organization, update_organization, get_invoices, edit_institution, create_organization_admin
 
 urlpatterns = [
@@ -46,6 +47,10 @@ urlpatterns = [
     path('rooms/<int:pk>', RoomDetails.as_view(), name='room'),
 
     path('add-period', add_period, name='add-period'),
+    path('add-periods', add_periods, name='add-periods'),
+    path('check-periods', check_periods, name='check-periods'),
+    path('generate-periods', generate_periods, name='generate-periods'),
+    path('get-timetable-conflicts', get_timetable_conflicts, name='get-timetable-conflicts'),
     path('update-period/<int:pk>', update_period, name='update-period'),
     path('get-periods', get_periods_of_a_class, name='get-periods'),
     path('delete-period/<int:pk>', delete_period, name='delete-period'),
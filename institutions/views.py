@@ -1,21 +1,26 @@
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.status import HTTP_404_NOT_FOUND, HTTP_400_BAD_REQUEST
+from rest_framework.status import HTTP_404_NOT_FOUND, HTTP_400_BAD_REQUEST, HTTP_409_CONFLICT
 from rest_framework.views import APIView
 
 from employees.models.employees import Employee
 from finance.models.invoices import Invoice, InvoicesReadSerializer
 from fundamentals.common_queries import search_by_name, filter_by_institution
 from fundamentals.custom_responses import success_w_msg, success_w_data, err_w_serializer, get_paginated_response, \
-    err_w_msg
+    err_w_msg, err_w_data
 from students.models.students import Student, StudentReadSerializer
 from users.permissions import IsSuperUser
 from users.serializers import UserRegistrationSerializer
+from .methods.timetable_conflicts import get_class_subjects, get_period_values, check_timetable, \
+    find_institution_conflicts, lock_timetable_owners
+from .methods.timetable_generator import generate_timetable, lock_institution_timetable, save_generated_timetable
 from .models.institution import Institution
 from .models.organization import Organization, OrganizationReadSerializer, OrganizationWriteSerializer
-from .models.timetables import PeriodWriteSerializer, Period, PeriodReadSerializer
+from .models.timetables import PeriodWriteSerializer, Period, PeriodReadSerializer, PeriodUploadSerializer, \
+    TimetableGenerationSerializer
 from .serializers import InstitutionWriteSerializer, InstitutionReadSerializer
 from .models.grades import Grade, GradeWriteSerializer, GradeReadSerializer
 from .models.levels import Level, LevelWriteSerializer, LevelReadSerializer
@@ -785,10 +790,20 @@ def add_period(request):
         return success_w_msg('ClassSubject not found.', status=HTTP_404_NOT_FOUND)
 
     serializer = PeriodWriteSerializer(data=data)
-    if serializer.is_valid():
+    if not serializer.is_valid():
+        return err_w_serializer(serializer.errors)
+
+    with transaction.atomic():
+        class_subjects = get_class_subjects([class_subject.pk])
+        lock_timetable_owners(class_subjects)
+
+        conflicts = check_timetable([get_period_values(serializer.validated_data)], class_subjects)
+        if conflicts:
+            return err_w_data(conflicts, 'The period conflicts with the timetable.', status=HTTP_409_CONFLICT)
+
         serializer.save()
-        return success_w_data(serializer.data, status=201)
-    return err_w_serializer(serializer.errors)
+
+    return success_w_data(serializer.data, status=201)
 
 
 @api_view(['PATCH'])
@@ -802,10 +817,125 @@ def update_period(request, pk):
     data = request.data.copy()
 
     serializer = PeriodWriteSerializer(period, data=data, partial=True)
-    if serializer.is_valid():
+    if not serializer.is_valid():
+        return err_w_serializer(serializer.errors)
+
+    with transaction.atomic():
+        values = get_period_values(serializer.validated_data, period)
+        class_subjects = get_class_subjects({values['class_subject'], period.class_subject_id})
+        lock_timetable_owners(class_subjects)
+
+        conflicts = check_timetable([values], class_subjects)
+        if conflicts:
+            return err_w_data(conflicts, 'The period conflicts with the timetable.', status=HTTP_409_CONFLICT)
+
         serializer.save()
-        return success_w_data(serializer.data)
-    return err_w_serializer(serializer.errors)
+
+    return success_w_data(serializer.data)
+
+
+def get_uploaded_periods(request):
+    """
+    Validates a bulk timetable upload and resolves its class subjects with one query
+    :param request: request with {'periods': [...]}
+    :return: tuple (periods, class subjects, error response | None)
+    """
+    serializer = PeriodUploadSerializer(data=request.data.get('periods'), many=True, allow_empty=False)
+    if not serializer.is_valid():
+        return None, None, err_w_msg('periods must be a list of valid periods.')
+
+    periods = [get_period_values(period) for period in serializer.validated_data]
+
+    class_subjects = get_class_subjects(
+        [period['class_subject'] for period in periods], organization=request.user.organization
+    )
+    if any(period['class_subject'] not in class_subjects for period in periods):
+        return None, None, success_w_msg('ClassSubject not found.', status=HTTP_404_NOT_FOUND)
+
+    return periods, class_subjects, None
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def add_periods(request):
+    periods, class_subjects, error = get_uploaded_periods(request)
+    if error is not None:
+        return error
+
+    with transaction.atomic():
+        lock_timetable_owners(class_subjects)
+
+        conflicts = check_timetable(periods, class_subjects)
+        if conflicts:
+            return err_w_data(conflicts, f'{len(conflicts)} timetable conflicts found.', status=HTTP_409_CONFLICT)
+
+        created = Period.objects.bulk_create([Period(
+            class_subject_id=period['class_subject'],
+            day=period['day'],
+            period=period['period'],
+            start=period['start'],
+            end=period['end'],
+        ) for period in periods])
+
+    return success_w_data(PeriodWriteSerializer(created, many=True).data, status=201)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def check_periods(request):
+    periods, class_subjects, error = get_uploaded_periods(request)
+    if error is not None:
+        return error
+
+    return success_w_data(check_timetable(periods, class_subjects))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_timetable_conflicts(request):
+    institution = Institution.objects.filter(id=request.query_params.get('institution'),
+                                             organization=request.user.organization).first()
+    if institution is None:
+        return success_w_msg('Institution not found.', status=HTTP_404_NOT_FOUND)
+
+    return success_w_data(find_institution_conflicts(institution))
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def generate_periods(request):
+    serializer = TimetableGenerationSerializer(data=request.data)
+    if not serializer.is_valid():
+        return err_w_serializer(serializer.errors)
+
+    data = serializer.validated_data
+
+    institution = Institution.objects.filter(id=data['institution'], organization=request.user.organization).first()
+    if institution is None:
+        return success_w_msg('Institution not found.', status=HTTP_404_NOT_FOUND)
+
+    with transaction.atomic():
+        lock_institution_timetable(institution)
+
+        timetable = generate_timetable(institution, data['days'], data['slots'], unavailable=data['unavailable'],
+                                       replace=data['replace'], seed=data['seed'])
+        complete = not timetable['unplaced']
+
+        saved = not data['dry_run'] and (complete or data['allow_partial'])
+        periods = save_generated_timetable(institution, timetable['periods'], replace=data['replace']) \
+            if saved else timetable['periods']
+
+    result = {
+        'saved': saved,
+        'periods': PeriodWriteSerializer(periods, many=True).data,
+        'unplaced': timetable['unplaced'],
+    }
+
+    if not complete and not saved and not data['dry_run']:
+        missing = sum(entry['periods'] for entry in timetable['unplaced'])
+        return err_w_data(result, f'{missing} periods could not be placed.', status=HTTP_409_CONFLICT)
+
+    return success_w_data(result, status=201 if saved else 200)
 
 
 @api_view(['GET'])
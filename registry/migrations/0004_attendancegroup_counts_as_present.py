@@ -0,0 +1,25 @@
+# Generated by Django 4.0.2 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+def mark_absent_groups(apps, schema_editor):
+    # existing groups all counted as present, absences are the groups named so
+    AttendanceGroup = apps.get_model('registry', 'AttendanceGroup')
+    AttendanceGroup.objects.filter(name__icontains='absent').update(counts_as_present=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registry', '0003_announcement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancegroup',
+            name='counts_as_present',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(mark_absent_groups, migrations.RunPython.noop),
+    ]
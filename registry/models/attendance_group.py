@@ -12,6 +12,8 @@ class AttendanceGroup(models.Model):
 
     name = models.CharField(max_length=100)
     record_late_time = models.BooleanField(default=False)
+    # whether lessons attended with this group count towards a student's attendance rate
+    counts_as_present = models.BooleanField(default=True)
     color = models.CharField(max_length=10)
     status = models.CharField(max_length=10, choices=status_choices, default='active')
 
@@ -1,3 +1,5 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models.report_jobs import ReportJob
+
+admin.site.register(ReportJob)
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from reports.methods.report_jobs import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Computes queued report jobs, polling the report job table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sleep', type=float, default=2, help='seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='exit when the queue is empty')
+
+    def handle(self, *args, **options):
+        self.stdout.write('report worker started')
+
+        while True:
+            close_old_connections()
+            requeue_stale_jobs()
+
+            job = claim_next_job()
+
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['sleep'])
+                continue
+
+            run_job(job)
+            self.stdout.write(f'report job {job.id} {job.status}')
@@ -0,0 +1,72 @@
+from django.db.models import Count, Q
+
+from reports.methods.time_buckets import get_bucket_starts, truncate_to_bucket
+
+# attendance counted on the dashboards, groups that record a late time are left out
+COUNTED_ATTENDANCE = Q(attendance_group__record_late_time=False)
+
+# group_by option -> (id field, name field)
+ATTENDANCE_GROUPINGS = {
+    'class': ('lesson__period__class_subject___class', 'lesson__period__class_subject___class__name'),
+    'attendance_group': ('attendance_group', 'attendance_group__name'),
+}
+
+
+def get_percentage(count, total):
+    if not total:
+        return 0
+    return (count / total) * 100
+
+
+def get_attendance_series(queryset, start, end, bucket='day', group_by=None) -> list:
+    """
+    Aggregates attendance per day, week or month of `Lesson.date` with a single GROUP BY query.
+    Every bucket of the range is returned, empty buckets have zero counts.
+
+    Each point holds `count` (counted attendance), `total` (all attendance records) and `percentage`.
+    With `group_by` the point also lists its `groups`; for `attendance_group` a group's count is every
+    record of that group and its percentage is its share of the bucket.
+    :param queryset: Attendance queryset, already filtered by tenant
+    :param start: date, inclusive
+    :param end: date, inclusive
+    :param bucket: day | week | month
+    :param group_by: None | class | attendance_group
+    :return: list of dicts
+    """
+    group_fields = ATTENDANCE_GROUPINGS[group_by] if group_by else ()
+
+    rows = queryset.filter(
+        lesson__date__range=[start, end]
+    ).annotate(
+        bucket=truncate_to_bucket('lesson__date', bucket)
+    ).values('bucket', *group_fields).annotate(
+        count=Count('id', filter=COUNTED_ATTENDANCE),
+        total=Count('id'),
+    ).order_by('bucket', *group_fields)
+
+    series = {}
+    for bucket_start in get_bucket_starts(start, end, bucket):
+        series[bucket_start] = {'date': bucket_start, 'count': 0, 'total': 0}
+        if group_by:
+            series[bucket_start]['groups'] = []
+
+    for row in rows:
+        point = series[row['bucket']]
+        point['count'] += row['count']
+        point['total'] += row['total']
+
+        if group_by:
+            point['groups'].append({
+                'id': row[group_fields[0]],
+                'name': row[group_fields[1]],
+                'count': row['total'] if group_by == 'attendance_group' else row['count'],
+                'total': row['total'],
+            })
+
+    for point in series.values():
+        point['percentage'] = get_percentage(point['count'], point['total'])
+        for group in point.get('groups', []):
+            base = point['total'] if group_by == 'attendance_group' else group['total']
+            group['percentage'] = get_percentage(group['count'], base)
+
+    return list(series.values())
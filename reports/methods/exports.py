@@ -0,0 +1,46 @@
+# (header, lookup) pairs of the flat rows streamed by the final report exports
+
+STUDENT_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('student_id', 'student_id'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+    ('gender', 'gender'),
+    ('email', 'email'),
+    ('status', 'status'),
+    ('institution', 'institution__name'),
+    ('grade', 'grade__name'),
+    ('level', 'grade__level__name'),
+    ('student_type', 'student_type__name'),
+    ('academic_year', 'academic_year'),
+    ('birth_date', 'birth_date'),
+    ('registration_date', 'registration_date'),
+]
+
+TEACHER_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('employee_id', 'employee_id'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+    ('gender', 'gender'),
+    ('email', 'email'),
+    ('institution', 'institution__name'),
+    ('employment_position', 'employment_position__title'),
+    ('employment_type', 'employment_type__title'),
+    ('employment_start_date', 'employment_start_date'),
+    ('archived', 'archived'),
+]
+
+ATTENDANCE_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('date', 'lesson__date'),
+    ('period', 'lesson__period__period'),
+    ('class', 'lesson__period__class_subject___class__name'),
+    ('subject', 'lesson__period__class_subject__subject__name'),
+    ('student', 'student_id'),
+    ('student_id', 'student__student_id'),
+    ('first_name', 'student__first_name'),
+    ('last_name', 'student__last_name'),
+    ('attendance_group', 'attendance_group__name'),
+    ('term', 'term__name'),
+]
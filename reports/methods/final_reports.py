@@ -0,0 +1,277 @@
+import math
+
+from django.db.models import Q
+
+from academic.models.lesson import Attendance, AttendanceReadSerializer
+from academic.models.term_positions import TermPosition, TermPositionReadSerializer
+from academic.models.term_results import TermResult, TermResultReadSerializer
+from employees.models.employees import Employee, EmployeeReadSerializer
+from reports.methods.exports import STUDENT_EXPORT_COLUMNS, TEACHER_EXPORT_COLUMNS, ATTENDANCE_EXPORT_COLUMNS
+from reports.methods.result_analytics import get_result_analytics
+from students.models.students import Student, StudentReadSerializer
+
+REPORTS = (
+    'students_report',
+    'teachers_report',
+    'attendance_report',
+    'result_summary',
+    'result_analytics',
+    'result_reports',
+    'result_positions',
+)
+
+
+def filter_by_organization(organization):
+    if organization is None:
+        return Q()
+    return Q(institution__organization=organization)
+
+
+def filter_by_institution(institution):
+    if institution is None:
+        return Q()
+    return Q(institution=institution)
+
+
+def filter_students_by_grade_level(level):
+    if level is None:
+        return Q()
+    return Q(grade__level=level)
+
+
+def filter_students_by_class(_class):
+    if _class is None:
+        return Q()
+    return Q(classes=_class)
+
+
+def filter_students_by_subject(subject):
+    if subject is None:
+        return Q()
+    return Q(classes__class_subjects__subject=subject)
+
+
+def filter_by_gender(gender):
+    if gender is None:
+        return Q()
+    return Q(gender=gender)
+
+
+def filter_students_by_student_type(student_type):
+    if student_type is None:
+        return Q()
+    return Q(student_type=student_type)
+
+
+def filter_students_by_payments(term, status):
+    if term is None:
+        return Q()
+    status = status or 'paid'
+    return Q(Q(payments__term=term) & Q(payments__status=status))
+
+
+def filter_teachers_by_subject(subject):
+    if subject is None:
+        return Q()
+    return Q(subject_classes__subject=subject)
+
+
+def filter_attendance_or_result_by_organization(organization):
+    if organization is None:
+        return Q()
+    return Q(student__institution__organization=organization)
+
+
+def filter_attendance_or_result_by_institution(institution):
+    if institution is None:
+        return Q()
+    return Q(student__institution=institution)
+
+
+def filter_attendance_by_subject(subject):
+    if subject is None:
+        return Q()
+    return Q(lesson__period__class_subject__subject=subject)
+
+
+def filter_attendance_or_result_by_level(level):
+    if level is None:
+        return Q()
+    return Q(student__grade__level=level)
+
+
+def filter_attendance_or_result_by_grade(grade):
+    if grade is None:
+        return Q()
+    return Q(student__grade__level=grade)
+
+
+def filter_by_term(term):
+    if term is None:
+        return Q()
+    return Q(term=term)
+
+
+def filter_attendance_by_date_range(start, end):
+    if start and end is not None:
+        return Q(lesson__date__range=[start, end])
+    return Q()
+
+
+def filter_attendance_by_class(_class):
+    if _class is None:
+        return Q()
+    return Q(lesson__period__class_subject___class=_class)
+
+
+def filter_results_by_subject(subject):
+    if subject is None:
+        return Q()
+    return Q(class_subject__subject=subject)
+
+
+def filter_results_by_class(_class):
+    if _class is None:
+        return Q()
+    return Q(class_subject___class=_class)
+
+
+def filter_results_by_student(student):
+    if student is None:
+        return Q()
+    return Q(student=student)
+
+
+def filter_positions_by_class(_class):
+    if _class is None:
+        return Q()
+    return Q(_class=_class)
+
+
+def filter_positions_by_grade(grade):
+    if grade is None:
+        return Q()
+    return Q(grade=grade)
+
+
+def parse_percentiles(percentiles):
+    """
+    Parses a comma separated list of percentiles, e.g. `10,50,90`
+    :param percentiles: str | None
+    :return: list of floats | None, raises ValueError when a percentile is not a number between 0 and 100
+    """
+    if not percentiles:
+        return None
+
+    percentiles = [float(percentile) for percentile in str(percentiles).split(',')]
+    # nan passes the range check and inf is not valid sql either
+    if any(not math.isfinite(percentile) or percentile < 0 or percentile > 100 for percentile in percentiles):
+        raise ValueError('percentiles must be between 0 and 100')
+    return percentiles
+
+
+def get_students_report_queryset(params):
+    return Student.objects.filter(
+        filter_by_gender(params.get('gender'))
+        & filter_by_organization(params.get('organization'))
+        & filter_by_institution(params.get('institution'))
+        & filter_students_by_grade_level(params.get('level'))
+        & filter_students_by_class(params.get('_class'))
+        & filter_students_by_subject(params.get('subject'))
+        & filter_students_by_student_type(params.get('student_type'))
+        & filter_students_by_payments(params.get('payment_term'), params.get('payment_status'))
+    )
+
+
+def get_teachers_report_queryset(params):
+    return Employee.objects.filter(
+        Q(is_teacher=True)
+        & filter_by_organization(params.get('organization'))
+        & filter_by_institution(params.get('institution'))
+        & filter_teachers_by_subject(params.get('subject'))
+    )
+
+
+def get_attendance_report_queryset(params):
+    return Attendance.objects.filter(
+        filter_attendance_or_result_by_organization(params.get('organization'))
+        & filter_attendance_or_result_by_institution(params.get('institution'))
+        & filter_attendance_by_subject(params.get('subject'))
+        & filter_attendance_or_result_by_level(params.get('level'))
+        & filter_attendance_or_result_by_grade(params.get('grade'))
+        & filter_by_term(params.get('term'))
+        & filter_attendance_by_date_range(params.get('start'), params.get('end'))
+        & filter_attendance_by_class(params.get('_class'))
+    )
+
+
+def get_term_results_queryset(params):
+    return TermResult.objects.filter(
+        filter_attendance_or_result_by_organization(params.get('organization'))
+        & filter_attendance_or_result_by_institution(params.get('institution'))
+        & filter_by_term(params.get('term'))
+        & filter_attendance_or_result_by_level(params.get('level'))
+        & filter_results_by_subject(params.get('subject'))
+        & filter_results_by_class(params.get('_class'))
+    )
+
+
+# report -> (queryset builder, export columns, export file name)
+REPORT_EXPORTS = {
+    'students_report': (get_students_report_queryset, STUDENT_EXPORT_COLUMNS, 'students-report'),
+    'teachers_report': (get_teachers_report_queryset, TEACHER_EXPORT_COLUMNS, 'teachers-report'),
+    'attendance_report': (get_attendance_report_queryset, ATTENDANCE_EXPORT_COLUMNS, 'attendance-report'),
+}
+
+
+def get_counted_report(queryset, params, key, serializer_class) -> dict:
+    data = {'count': queryset.count()}
+    if params.get('data'):
+        data[key] = serializer_class(queryset, many=True).data
+    return data
+
+
+def compute_report(report, params):
+    """
+    Computes the data of a final report, shared by the report endpoints and the report job worker
+    :param report: one of REPORTS
+    :param params: QueryDict or dict of report filters
+    :return: report data, raises ValueError on invalid params
+    """
+    if report == 'students_report':
+        return get_counted_report(get_students_report_queryset(params), params, 'students', StudentReadSerializer)
+
+    if report == 'teachers_report':
+        return get_counted_report(get_teachers_report_queryset(params), params, 'teachers', EmployeeReadSerializer)
+
+    if report == 'attendance_report':
+        return get_counted_report(
+            get_attendance_report_queryset(params), params, 'attendance', AttendanceReadSerializer
+        )
+
+    if report == 'result_summary':
+        return get_result_analytics(get_term_results_queryset(params))['grades']
+
+    if report == 'result_analytics':
+        percentiles = parse_percentiles(params.get('percentiles'))
+        return get_result_analytics(get_term_results_queryset(params), percentiles=percentiles)
+
+    if report == 'result_reports':
+        queryset = get_term_results_queryset(params).filter(
+            filter_results_by_student(params.get('student'))
+        ).order_by('-total_marks')
+        return TermResultReadSerializer(queryset, many=True).data
+
+    if report == 'result_positions':
+        queryset = TermPosition.objects.filter(
+            filter_attendance_or_result_by_organization(params.get('organization'))
+            & filter_attendance_or_result_by_institution(params.get('institution'))
+            & filter_by_term(params.get('term'))
+            & filter_attendance_or_result_by_level(params.get('level'))
+            & filter_positions_by_grade(params.get('grade'))
+            & filter_positions_by_class(params.get('_class'))
+            & filter_results_by_student(params.get('student'))
+        ).order_by('_class', 'class_position', 'student')
+        return TermPositionReadSerializer(queryset, many=True).data
+
+    raise ValueError(f'report must be one of {", ".join(REPORTS)}')
@@ -0,0 +1,47 @@
+from django.db.models import Q, Sum
+
+from finance.models.payment_daily_summaries import PaymentDailySummary
+from reports.methods.time_buckets import get_bucket_starts, truncate_to_bucket
+
+
+def get_finance_summary(queryset_filter: Q, start, end, bucket='day') -> list:
+    """
+    Reads invoice counts and amounts per day, week or month from the payment daily summaries
+    :param queryset_filter: Q applied to PaymentDailySummary (institution or organization scope)
+    :param start: date, inclusive
+    :param end: date, inclusive
+    :param bucket: day | week | month
+    :return: list of dicts, one per bucket of the range
+    """
+    rows = PaymentDailySummary.objects.filter(
+        queryset_filter
+        & Q(date__range=[start, end])
+    ).annotate(
+        bucket=truncate_to_bucket('date', bucket)
+    ).values('bucket', 'status').annotate(
+        count=Sum('count'),
+        amount=Sum('amount'),
+    ).order_by('bucket')
+
+    series = {}
+    for bucket_start in get_bucket_starts(start, end, bucket):
+        series[bucket_start] = {
+            'date': bucket_start,
+            'number_of_invoice': 0,
+            'number_of_paid_invoice': 0,
+            'number_of_due_invoice': 0,
+            'total_amount': 0,
+            'total_paid_amount': 0,
+            'total_due_amount': 0
+        }
+
+    for row in rows:
+        point = series[row['bucket']]
+        point['number_of_invoice'] += row['count']
+        point['total_amount'] += row['amount']
+
+        if row['status'] in ('paid', 'due'):
+            point[f'number_of_{row["status"]}_invoice'] += row['count']
+            point[f'total_{row["status"]}_amount'] += row['amount']
+
+    return list(series.values())
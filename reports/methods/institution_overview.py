@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef
+
+from employees.models.employees import Employee
+from fundamentals.aggregates import SubqueryCount
+from institutions.methods.academic_year import get_active_academic_year
+from institutions.models.classes import Class
+from institutions.models.institution import Institution
+from institutions.models.room import Room
+from students.models.students import Student
+
+# writes drop the snapshot of their institution, in every process only with a shared cache (settings.SHARED_CACHE);
+# a per process cache, or a row moved out of an institution, is caught up by the timeout
+OVERVIEW_CACHE_TIMEOUT = 5 * 60 if settings.SHARED_CACHE else 60
+
+OVERVIEW_COUNTS = (
+    'number_of_employees',
+    'number_of_male_employees',
+    'number_of_female_employees',
+    'number_of_students',
+    'number_of_male_students',
+    'number_of_female_students',
+    'number_of_classes',
+    'number_of_rooms',
+)
+
+
+def get_overview_cache_key(institution_id) -> str:
+    """
+    Returns the cache key of an institution's overview snapshot
+    :param institution_id: pk
+    :return: str
+    """
+    return f'reports:institution-overview:{institution_id}'
+
+
+def invalidate_institution_overview(institution_id):
+    """
+    Drops the cached overview snapshot of an institution
+    :param institution_id: pk
+    :return: None
+    """
+    if institution_id is None:
+        return
+    cache.delete(get_overview_cache_key(institution_id))
+
+
+def _count_subquery(model, **filters):
+    """
+    Counts the `model` rows belonging to the outer institution
+    :param model: Model class with an `institution` foreign key
+    :param filters: extra lookups applied to the counted rows
+    :return: SubqueryCount
+    """
+    return SubqueryCount(model.objects.filter(institution=OuterRef('pk'), **filters))
+
+
+def compute_institution_overview(institution: Institution) -> dict:
+    """
+    Computes every headcount of the institution overview in a single query
+    :param institution: Institution
+    :return: dict
+    """
+    counts = Institution.objects.filter(pk=institution.pk).annotate(
+        number_of_employees=_count_subquery(Employee),
+        number_of_male_employees=_count_subquery(Employee, gender='male'),
+        number_of_female_employees=_count_subquery(Employee, gender='female'),
+        number_of_students=_count_subquery(Student),
+        number_of_male_students=_count_subquery(Student, gender='male'),
+        number_of_female_students=_count_subquery(Student, gender='female'),
+        number_of_classes=_count_subquery(Class),
+        number_of_rooms=_count_subquery(Room),
+    ).values(*OVERVIEW_COUNTS).first()
+
+    current_academic_year = get_active_academic_year(institution)
+    if current_academic_year is None:
+        current_academic_year = 'Academic year not set'
+    else:
+        current_academic_year = f'{current_academic_year.start_date} - {current_academic_year.end_date}'
+
+    return {
+        **counts,
+        # 'number_of_subjects': number_of_subjects, // TODO: fix by shamimferdous
+        'current_academic_year': current_academic_year,
+    }
+
+
+def get_institution_overview_snapshot(institution: Institution) -> dict:
+    """
+    Returns the cached overview snapshot of an institution, computing it on a cache miss.
+    The snapshot is dropped by `reports.signals` whenever the counted rows change.
+    :param institution: Institution
+    :return: dict
+    """
+    key = get_overview_cache_key(institution.pk)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = compute_institution_overview(institution)
+        cache.set(key, snapshot, OVERVIEW_CACHE_TIMEOUT)
+    return snapshot
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK
+
+from academic.models.lesson import Attendance, Lesson
+from academic.models.term_positions import TermPosition
+from academic.models.term_results import TermResult
+from employees.models.employees import Employee
+from finance.models.payments import Payment
+from institutions.models.academic_years import AcademicYear
+from institutions.models.class_subjects import ClassSubject
+from institutions.models.classes import Class
+from institutions.models.institution import Institution
+from students.models.students import Student
+
+# invalidation bumps a version counter in the cache, which only reaches every process with a shared cache
+# (settings.SHARED_CACHE); a per process cache misses the bumps of the others and falls back to a short timeout
+REPORT_CACHE_TIMEOUT = 60 * 15 if settings.SHARED_CACHE else 60
+
+# institution and academic year pk -> organization pk, neither moves between organizations
+ORGANIZATION_MAP_TIMEOUT = 24 * 60 * 60
+
+# query params that never change the cached result
+IGNORED_PARAMS = ('export',)
+
+# endpoint -> tables its result is read from, a write to any of them invalidates the endpoint
+REPORT_SOURCES = {
+    'students_report': (Student, Class, ClassSubject, Payment, Institution),
+    'teachers_report': (Employee, ClassSubject, Institution),
+    'attendance_report': (Attendance, Lesson, Student, Institution),
+    'result_summary': (TermResult, Student, Institution),
+    'result_analytics': (TermResult, Student, Institution),
+    'result_reports': (TermResult, Student, Institution),
+    'result_positions': (TermPosition, TermResult, Student, Institution),
+}
+
+STATS_KEY = 'reports:cache-stats:{}'
+
+
+def get_version_key(model, organization_id) -> str:
+    # organization None is the counter of writes whose organization is unknown, read by every organization
+    return f'reports:cache-version:{model._meta.label_lower}:{organization_id or "all"}'
+
+
+def get_source_versions(models, organization_id) -> list:
+    """
+    Reads the version counters of every source table for an organization, starting missing counters from
+    the current time so that an evicted counter never comes back with a value used by older entries
+    :param models: model classes
+    :param organization_id: pk | None
+    :return: list of versions, the organization's then the shared counter of each model, in the order of `models`
+    """
+    keys = [get_version_key(model, scope) for model in models for scope in (organization_id, None)]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def get_institution_organization_id(institution_id):
+    key = f'reports:institution-organization:{institution_id}'
+    organization_id = cache.get(key)
+    if organization_id is None:
+        organization_id = Institution.objects.filter(pk=institution_id).values_list(
+            'organization_id', flat=True
+        ).first()
+        if organization_id is not None:
+            cache.set(key, organization_id, ORGANIZATION_MAP_TIMEOUT)
+    return organization_id
+
+
+def get_academic_year_organization_id(academic_year_id):
+    key = f'reports:academic-year-organization:{academic_year_id}'
+    organization_id = cache.get(key)
+    if organization_id is None:
+        organization_id = AcademicYear.objects.filter(pk=academic_year_id).values_list(
+            'institution__organization_id', flat=True
+        ).first()
+        if organization_id is not None:
+            cache.set(key, organization_id, ORGANIZATION_MAP_TIMEOUT)
+    return organization_id
+
+
+def get_source_organization_id(instance):
+    """
+    Returns the organization a row of a source table belongs to, from its organization, institution or
+    academic year, with the mappings cached
+    :param instance: row of a REPORT_SOURCES model
+    :return: pk | None when it cannot be told
+    """
+    if isinstance(instance, Institution):
+        return instance.organization_id
+    if getattr(instance, 'organization_id', None):
+        return instance.organization_id
+    if getattr(instance, 'institution_id', None):
+        return get_institution_organization_id(instance.institution_id)
+    if getattr(instance, 'academic_year_id', None):
+        return get_academic_year_organization_id(instance.academic_year_id)
+    return None
+
+
+def get_params_organization_id(query_params):
+    """
+    Returns the organization a report request is scoped to by its institution or organization params, which is
+    the organization whose writes invalidate the result. The requester's own organization does not scope the
+    querysets and is not used.
+    :param query_params: QueryDict
+    :return: pk | None when the request spans organizations (or names an unknown institution)
+    """
+    institution = query_params.get('institution')
+    if institution:
+        return get_institution_organization_id(institution) if institution.isdigit() else None
+
+    organization = query_params.get('organization')
+    if organization and organization.isdigit():
+        return int(organization)
+    return None
+
+
+def bump_source_version(model, organization_id):
+    """
+    Invalidates the cached reports of an organization reading from the model's table
+    :param model: model class
+    :param organization_id: pk | None to invalidate them for every organization
+    :return: None
+    """
+    key = get_version_key(model, organization_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def normalize_params(query_params) -> list:
+    """
+    Normalizes query params so equivalent requests share a key: keys are sorted, values are sorted,
+    empty values and params that do not affect the result are dropped
+    :param query_params: QueryDict
+    :return: list of (key, values) pairs
+    """
+    params = []
+    for key in sorted(query_params.keys()):
+        if key in IGNORED_PARAMS:
+            continue
+        values = sorted(value.strip() for value in query_params.getlist(key) if value.strip())
+        if values:
+            params.append((key, values))
+    return params
+
+
+def get_report_cache_key(endpoint, organization_id, query_params) -> str:
+    """
+    Builds the cache key of a report result from the endpoint, tenant, normalized params and source versions
+    :param endpoint: key of REPORT_SOURCES
+    :param organization_id: pk of the organization the params scope the report to
+    :param query_params: QueryDict
+    :return: str
+    """
+    fingerprint = json.dumps([
+        normalize_params(query_params),
+        get_source_versions(REPORT_SOURCES[endpoint], organization_id),
+    ], separators=(',', ':'))
+
+    digest = hashlib.sha1(fingerprint.encode()).hexdigest()
+    return f'reports:result:{endpoint}:{organization_id}:{digest}'
+
+
+def record_cache_event(event):
+    key = STATS_KEY.format(event)
+    if cache.add(key, 1, timeout=None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_report_cache_stats() -> dict:
+    """
+    Returns the hit/miss counters of the report cache
+    :return: dict
+    """
+    stats = cache.get_many([STATS_KEY.format('hits'), STATS_KEY.format('misses')])
+    hits = stats.get(STATS_KEY.format('hits'), 0)
+    misses = stats.get(STATS_KEY.format('misses'), 0)
+    requests = hits + misses
+
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': (hits / requests) if requests else 0,
+    }
+
+
+def cached_report(endpoint):
+    """
+    Caches the successful results of a report view per endpoint, organization and normalized query params.
+    The organization is the one the params scope the report to (see get_params_organization_id), requests
+    spanning organizations are not cached since no single organization's writes would invalidate them.
+    Exports are streamed and never cached.
+    Apply it below `@api_view` so the view receives a DRF request.
+    :param endpoint: key of REPORT_SOURCES
+    :return: decorator
+    """
+    if endpoint not in REPORT_SOURCES:
+        raise ValueError(f'{endpoint} has no entry in REPORT_SOURCES')
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.query_params.get('export'):
+                return view(request, *args, **kwargs)
+
+            organization_id = get_params_organization_id(request.query_params)
+            if organization_id is None:
+                return view(request, *args, **kwargs)
+
+            key = get_report_cache_key(endpoint, organization_id, request.query_params)
+            data = cache.get(key)
+
+            if data is not None:
+                record_cache_event('hits')
+                return Response(data, status=HTTP_200_OK)
+
+            record_cache_event('misses')
+            response = view(request, *args, **kwargs)
+
+            if response.status_code == HTTP_200_OK:
+                cache.set(key, response.data, timeout=REPORT_CACHE_TIMEOUT)
+
+            return response
+
+        return wrapper
+
+    return decorator
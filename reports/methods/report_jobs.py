@@ -0,0 +1,126 @@
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from fundamentals.custom_responses import EXPORT_FORMATS, iter_export_lines
+from fundamentals.storage import upload_lines
+from reports.methods.final_reports import REPORT_EXPORTS, compute_report
+from reports.models.report_jobs import ReportJob
+
+logger = logging.getLogger(__name__)
+
+# a worker refreshes the heartbeat of its running job this often,
+# a running job without a heartbeat for STALE_JOB_TIMEOUT is assumed to belong to a dead worker
+HEARTBEAT_INTERVAL = timedelta(seconds=60)
+STALE_JOB_TIMEOUT = timedelta(minutes=5)
+MAX_ATTEMPTS = 3
+
+
+def claim_next_job():
+    """
+    Marks the oldest queued job as running and returns it.
+    Rows locked by other workers are skipped, so any number of workers can poll the queue.
+    :return: ReportJob | None
+    """
+    with transaction.atomic():
+        job = ReportJob.objects.select_for_update(skip_locked=True).filter(
+            status='queued'
+        ).order_by('created_at', 'id').first()
+
+        if job is None:
+            return None
+
+        job.status = 'running'
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at', 'attempts'])
+
+    return job
+
+
+@contextmanager
+def job_heartbeat(job: ReportJob):
+    """
+    Refreshes the heartbeat of a running job from a background thread while the block runs
+    :param job: ReportJob
+    """
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(HEARTBEAT_INTERVAL.total_seconds()):
+                ReportJob.objects.filter(id=job.id, status='running', attempts=job.attempts).update(
+                    heartbeat_at=timezone.now()
+                )
+        finally:
+            # the thread has its own database connection
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f'report-job-{job.id}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def run_job(job: ReportJob):
+    """
+    Computes the report of a claimed job and stores its result, uploaded export file or error.
+    Nothing is stored when the job was requeued meanwhile, the attempt that claimed it last owns the row.
+    :param job: ReportJob
+    :return: None
+    """
+    with job_heartbeat(job):
+        compute_job(job)
+
+    job.finished_at = timezone.now()
+    ReportJob.objects.filter(id=job.id, status='running', attempts=job.attempts).update(
+        result=job.result, file_key=job.file_key, error=job.error, status=job.status, finished_at=job.finished_at
+    )
+
+
+def compute_job(job: ReportJob):
+    """
+    Computes the report of a job into its result, file_key or error fields, without saving them
+    :param job: ReportJob
+    :return: None
+    """
+    try:
+        if job.export_format:
+            get_queryset, columns, _ = REPORT_EXPORTS[job.report]
+            file_key = f'reports/{job.report}-{job.id}.{job.export_format}'
+            upload_lines(
+                iter_export_lines(get_queryset(job.params).order_by('id'), columns, job.export_format),
+                file_key, EXPORT_FORMATS[job.export_format]
+            )
+            job.file_key = file_key
+        else:
+            # round trip through json so dates, decimals and uuids are stored as the api would render them
+            job.result = json.loads(json.dumps(compute_report(job.report, job.params), cls=DjangoJSONEncoder))
+        job.status = 'completed'
+    except Exception as e:
+        logger.exception('report job %s failed', job.id)
+        job.error = str(e)
+        job.status = 'failed'
+
+
+def requeue_stale_jobs():
+    """
+    Puts jobs left running by a dead worker (no heartbeat for STALE_JOB_TIMEOUT) back in the queue,
+    failing the ones out of attempts
+    :return: number of jobs requeued
+    """
+    stale_jobs = ReportJob.objects.filter(status='running', heartbeat_at__lt=timezone.now() - STALE_JOB_TIMEOUT)
+
+    stale_jobs.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status='failed', error='worker stopped before finishing the report', finished_at=timezone.now()
+    )
+    return stale_jobs.filter(attempts__lt=MAX_ATTEMPTS).update(status='queued')
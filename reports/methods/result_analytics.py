@@ -0,0 +1,43 @@
+from django.db.models import Avg, Count, Max, Min, Q, StdDev
+
+from fundamentals.aggregates import PercentileCont
+
+GRADE_LIST = ['A', 'B', 'C', 'D', 'E', 'F']
+
+DEFAULT_PERCENTILES = [10, 25, 50, 75, 90]
+
+
+def get_result_analytics(queryset, percentiles=None) -> dict:
+    """
+    Computes the grade histogram and the statistics of `total_marks` in a single aggregate query
+    :param queryset: TermResult queryset
+    :param percentiles: list of percentiles (0 - 100) to compute, the median is always included
+    :return: dict
+    """
+    percentiles = sorted(set(percentiles or DEFAULT_PERCENTILES) | {50})
+
+    grade_counts = {
+        f'grade_{grade}': Count('id', filter=Q(grade__iexact=grade)) for grade in GRADE_LIST
+    }
+
+    stats = queryset.order_by().aggregate(
+        count=Count('id'),
+        mean=Avg('total_marks'),
+        standard_deviation=StdDev('total_marks'),
+        min=Min('total_marks'),
+        max=Max('total_marks'),
+        percentile_values=PercentileCont('total_marks', [percentile / 100 for percentile in percentiles]),
+        **grade_counts
+    )
+
+    percentile_values = stats.pop('percentile_values') or [None] * len(percentiles)
+    stats['percentiles'] = {
+        f'p{percentile:g}': value for percentile, value in zip(percentiles, percentile_values)
+    }
+    stats['median'] = stats['percentiles']['p50']
+
+    stats['grades'] = [
+        {'grade': grade, 'count': stats.pop(f'grade_{grade}')} for grade in GRADE_LIST
+    ]
+
+    return stats
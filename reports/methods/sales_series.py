@@ -0,0 +1,38 @@
+from django.db.models import Count, Sum
+
+from fundamentals.calendars import get_datetime_range
+from reports.methods.time_buckets import get_bucket_starts, truncate_to_bucket
+
+
+def get_sales_series(queryset, start, end, bucket='day') -> list:
+    """
+    Aggregates book purchases per day, week or month of `purchase_date` with a single GROUP BY query.
+    The range is filtered as half-open datetimes so the purchase date index is used, and buckets follow
+    the configured time zone. Every bucket of the range is returned, empty buckets have zero sales.
+    :param queryset: BookPurchase queryset, already filtered by publisher
+    :param start: date, inclusive
+    :param end: date, inclusive
+    :param bucket: day | week | month
+    :return: list of dicts
+    """
+    range_start, range_end = get_datetime_range(start, end)
+
+    rows = queryset.filter(
+        purchase_date__gte=range_start,
+        purchase_date__lt=range_end
+    ).annotate(
+        bucket=truncate_to_bucket('purchase_date', bucket)
+    ).values('bucket').annotate(
+        total_sales=Sum('total_price'),
+        unit_sold=Count('id'),
+    ).order_by('bucket')
+
+    series = {
+        bucket_start: {'date': bucket_start, 'total_sales': 0, 'unit_sold': 0}
+        for bucket_start in get_bucket_starts(start, end, bucket)
+    }
+
+    for row in rows:
+        series[row['bucket']].update(total_sales=row['total_sales'] or 0, unit_sold=row['unit_sold'])
+
+    return list(series.values())
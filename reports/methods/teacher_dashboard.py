@@ -0,0 +1,149 @@
+from django.db.models import Count, OuterRef, Prefetch, Q
+
+from academic.models.assignments import Assignment
+from academic.models.exams import Exam
+from academic.models.lesson import Attendance
+from academic.queries import filter_by_academic_year, filter_by_period_day
+from employees.models.employees import Employee
+from fundamentals.aggregates import SubqueryCount
+from institutions.models.class_subjects import ClassSubject
+from institutions.models.classes import Class
+from institutions.models.timetables import Period
+from students.models.students import Student
+
+
+def get_teacher_class_ids(employee):
+    """
+    Subquery of the ids of the classes the teacher has a class subject in
+    :param employee: Employee
+    :return: ValuesQuerySet
+    """
+    return ClassSubject.objects.filter(teacher=employee).values('_class_id')
+
+
+def get_teacher_overview(employee, academic_year) -> dict:
+    """
+    Computes the teacher's overview figures in a single query
+    :param employee: Employee
+    :param academic_year: AcademicYear | None
+    :return: dict
+    """
+    teacher = OuterRef('pk')
+
+    return Employee.objects.filter(pk=employee.pk).annotate(
+        number_of_classes=SubqueryCount(ClassSubject.objects.filter(teacher=teacher)),
+        number_of_periods=SubqueryCount(Period.objects.filter(class_subject__teacher=teacher)),
+        number_of_exams_taken=SubqueryCount(Exam.objects.filter(
+            Q(class_subject__teacher=teacher) & filter_by_academic_year(academic_year)
+        )),
+        number_of_assignments_taken=SubqueryCount(Assignment.objects.filter(
+            Q(class_subject__teacher=teacher) & filter_by_academic_year(academic_year)
+        )),
+        total_students=SubqueryCount(Student.objects.filter(
+            classes__class_subjects__teacher=teacher,
+            academic_year=academic_year
+        ).distinct()),
+    ).values(
+        'number_of_classes',
+        'number_of_periods',
+        'number_of_exams_taken',
+        'number_of_assignments_taken',
+        'total_students',
+    ).first()
+
+
+def get_teacher_class_student_counts(employee, academic_year) -> list:
+    """
+    Counts the students of every class the teacher teaches with one grouped query
+    :param employee: Employee
+    :param academic_year: AcademicYear | None
+    :return: list of dicts
+    """
+    classes = Class.objects.filter(
+        id__in=get_teacher_class_ids(employee)
+    ).annotate(
+        student_count=Count('students', filter=Q(students__academic_year=academic_year), distinct=True)
+    ).values('id', 'name', 'student_count').order_by('id')
+
+    return [{
+        'class_id': _class['id'],
+        'class_name': _class['name'],
+        'student_count': _class['student_count']
+    } for _class in classes]
+
+
+def get_teacher_students_list(employee, academic_year, class_id=None, gender=None, subject_id=None) -> list:
+    """
+    Lists the teacher's students, each with the name of a class they share with the teacher.
+    The shared classes are prefetched, so the list costs two queries whatever its length.
+    :param employee: Employee
+    :param academic_year: AcademicYear | None
+    :param class_id: pk | None
+    :param gender: str | None
+    :param subject_id: pk | None
+    :return: list of dicts
+    """
+    classes = get_teacher_class_ids(employee)
+
+    students = Student.objects.filter(
+        classes__id__in=classes,
+        academic_year=academic_year
+    )
+
+    if class_id:
+        students = students.filter(classes__id=class_id)
+    if gender:
+        students = students.filter(gender=gender)
+    if subject_id:
+        # the classes associated with the subject_id
+        class_subjects = ClassSubject.objects.filter(subject_id=subject_id).values('_class_id')
+        students = students.filter(classes__id__in=class_subjects)
+
+    students = students.distinct().only('id', 'student_id', 'first_name', 'last_name', 'email').prefetch_related(
+        Prefetch('classes', queryset=Class.objects.filter(id__in=classes).order_by('id').only('id', 'name'),
+                 to_attr='teacher_classes')
+    )
+
+    return [{
+        'id': student.student_id,
+        'name': f'{student.first_name} {student.last_name}',
+        'email': student.email,
+        '_class': student.teacher_classes[0].name  # a student can share several classes with the teacher
+    } for student in students]
+
+
+def get_teacher_class_attendance(employee, academic_year, day) -> list:
+    """
+    Counts attendance per attendance group over the teacher's periods of a day with one grouped query
+    :param employee: Employee
+    :param academic_year: AcademicYear | None
+    :param day: weekday name | None
+    :return: list of dicts
+    """
+    periods = Period.objects.filter(
+        Q(class_subject__teacher=employee)
+        & filter_by_period_day(day)
+    )
+
+    attendance = Attendance.objects.filter(
+        lesson__period__in=periods,
+        academic_year=academic_year
+    ).values('attendance_group__name').annotate(count=Count('id')).order_by('attendance_group__name')
+
+    return [{'name': row['attendance_group__name'], 'count': row['count']} for row in attendance]
+
+
+def get_teacher_dashboard(employee, academic_year, day=None) -> dict:
+    """
+    Builds every figure of the teacher dashboard
+    :param employee: Employee
+    :param academic_year: AcademicYear | None
+    :param day: weekday name for the class attendance figures | None
+    :return: dict
+    """
+    return {
+        'overview': get_teacher_overview(employee, academic_year),
+        'class_students': get_teacher_class_student_counts(employee, academic_year),
+        'students': get_teacher_students_list(employee, academic_year),
+        'class_attendance': get_teacher_class_attendance(employee, academic_year, day),
+    }
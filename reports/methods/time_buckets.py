@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta
+
+from django.db.models import DateField
+from django.db.models.functions import Trunc
+
+BUCKETS = ('day', 'week', 'month')
+
+
+def parse_date(value, default=None):
+    """
+    Parses a YYYY-MM-DD string into a date
+    :param value: str | None
+    :param default: returned when value is empty
+    :return: date
+    """
+    if not value:
+        return default
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def truncate_to_bucket(field: str, bucket: str) -> Trunc:
+    """
+    Truncates a DateField or DateTimeField to the start date of its bucket.
+    Datetimes are converted to the current time zone (settings.TIME_ZONE) before truncation.
+    :param field: field name or lookup path
+    :param bucket: day | week | month
+    :return: Trunc expression with a DateField output
+    """
+    return Trunc(field, bucket, output_field=DateField())
+
+
+def get_bucket_start(value: date, bucket: str) -> date:
+    """
+    Returns the first day of the bucket containing `value`, matching PostgreSQL date_trunc (weeks start on Monday)
+    :param value: date
+    :param bucket: day | week | month
+    :return: date
+    """
+    if bucket == 'week':
+        return value - timedelta(days=value.weekday())
+    if bucket == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def get_next_bucket_start(value: date, bucket: str) -> date:
+    """
+    Returns the first day of the bucket following the one starting at `value`
+    :param value: bucket start date
+    :param bucket: day | week | month
+    :return: date
+    """
+    if bucket == 'week':
+        return value + timedelta(days=7)
+    if bucket == 'month':
+        return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return value + timedelta(days=1)
+
+
+def get_bucket_starts(start: date, end: date, bucket: str) -> list:
+    """
+    Lists the start dates of every bucket overlapping the inclusive range [start, end]
+    :param start: date
+    :param end: date
+    :param bucket: day | week | month
+    :return: list of dates
+    """
+    bucket_starts = []
+    current = get_bucket_start(start, bucket)
+    while current <= end:
+        bucket_starts.append(current)
+        current = get_next_bucket_start(current, bucket)
+    return bucket_starts
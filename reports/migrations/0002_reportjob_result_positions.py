@@ -0,0 +1,18 @@
+# Generated by Django 4.0.2 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='report',
+            field=models.CharField(choices=[('students_report', 'students_report'), ('teachers_report', 'teachers_report'), ('attendance_report', 'attendance_report'), ('result_summary', 'result_summary'), ('result_analytics', 'result_analytics'), ('result_reports', 'result_reports'), ('result_positions', 'result_positions')], max_length=50),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.0.2 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+def fail_stored_exports(apps, schema_editor):
+    # exports stored in the table are dropped with file_content, their jobs have to be queued again
+    ReportJob = apps.get_model('reports', 'ReportJob')
+    ReportJob.objects.filter(status='completed', export_format__isnull=False).exclude(export_format='').update(
+        status='failed', error='the export was removed when exports moved to file storage, queue the report again'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_reportjob_result_positions'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_stored_exports, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='reportjob',
+            name='file_content',
+        ),
+        migrations.AddField(
+            model_name='reportjob',
+            name='file_key',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.0.2 on 2026-10-18 18:10
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_heartbeats(apps, schema_editor):
+    # jobs running now are requeued if their worker does not beat within STALE_JOB_TIMEOUT of their start
+    ReportJob = apps.get_model('reports', 'ReportJob')
+    ReportJob.objects.filter(status='running').update(heartbeat_at=F('started_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_reportjob_file_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(set_heartbeats, migrations.RunPython.noop),
+    ]
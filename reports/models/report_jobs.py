@@ -0,0 +1,78 @@
+from django.db import models
+from django.utils import timezone
+from rest_framework import serializers
+
+from fundamentals.custom_responses import EXPORT_FORMATS
+from institutions.models.organization import Organization
+from reports.methods.final_reports import REPORTS, REPORT_EXPORTS, parse_percentiles
+from users.models import User
+
+
+class ReportJob(models.Model):
+    """
+    A report computed in the background by `manage.py run_report_worker`.
+    The table is the queue: workers claim queued jobs with SELECT ... FOR UPDATE SKIP LOCKED.
+    Exports are uploaded to the S3 bucket under file_key, other reports are stored in result.
+    """
+    status_choices = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+
+    report = models.CharField(max_length=50, choices=[(report, report) for report in REPORTS])
+    params = models.JSONField(default=dict, blank=True)
+    export_format = models.CharField(max_length=10, null=True, blank=True,
+                                     choices=[(export_format, export_format) for export_format in EXPORT_FORMATS])
+    status = models.CharField(max_length=10, choices=status_choices, default='queued')
+
+    result = models.JSONField(null=True, blank=True)
+    file_key = models.CharField(max_length=255, null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_jobs')
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f'{self.report} - {self.status}'
+
+
+class ReportJobWriteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReportJob
+        fields = ['report', 'params', 'export_format']
+
+    def validate_params(self, params):
+        if not isinstance(params, dict):
+            raise serializers.ValidationError('params must be an object')
+        return params
+
+    def validate(self, data):
+        if data.get('export_format') and data['report'] not in REPORT_EXPORTS:
+            raise serializers.ValidationError({'export_format': f'{data["report"]} can not be exported'})
+
+        if data['report'] == 'result_analytics':
+            try:
+                parse_percentiles(data['params'].get('percentiles'))
+            except ValueError:
+                raise serializers.ValidationError(
+                    {'params': 'percentiles must be comma separated numbers between 0 and 100'}
+                )
+        return data
+
+
+class ReportJobReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReportJob
+        fields = ['id', 'report', 'params', 'export_format', 'status', 'error', 'attempts', 'created_at',
+                  'started_at', 'finished_at']
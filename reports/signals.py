@@ -0,0 +1,60 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from academic.models.lesson import Attendance
+from academic.models.term_results import TermResult
+from academic.signals import attendance_roster_saved, term_results_computed
+from employees.models.employees import Employee
+from institutions.models.academic_years import AcademicYear
+from institutions.models.classes import Class
+from institutions.models.room import Room
+from reports.methods.institution_overview import invalidate_institution_overview
+from reports.methods.report_cache import (
+    REPORT_SOURCES, bump_source_version, get_academic_year_organization_id, get_source_organization_id
+)
+from students.models.students import Student
+
+# rows counted by (or shown in) the institution overview snapshot
+OVERVIEW_SOURCES = (Student, Employee, Class, Room, AcademicYear)
+
+
+def invalidate_overview(sender, instance, **kwargs):
+    # the institution a row moved out of is caught up by OVERVIEW_CACHE_TIMEOUT
+    invalidate_institution_overview(instance.institution_id)
+
+
+for model in OVERVIEW_SOURCES:
+    post_save.connect(invalidate_overview, sender=model, dispatch_uid=f'overview_post_save_{model.__name__}')
+    post_delete.connect(invalidate_overview, sender=model, dispatch_uid=f'overview_post_delete_{model.__name__}')
+
+
+def invalidate_cached_reports(sender, instance, **kwargs):
+    bump_source_version(sender, get_source_organization_id(instance))
+
+
+def invalidate_cached_reports_on_membership_change(sender, instance, action, **kwargs):
+    # class membership is read by the students report through Class.students
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_source_version(Class, get_source_organization_id(instance))
+
+
+def invalidate_cached_reports_of_roster(sender, lesson, **kwargs):
+    bump_source_version(sender, get_academic_year_organization_id(lesson.academic_year_id))
+
+
+def invalidate_cached_reports_of_term_results(sender, academic_year, **kwargs):
+    bump_source_version(sender, get_academic_year_organization_id(academic_year.pk))
+
+
+for model in {model for models in REPORT_SOURCES.values() for model in models}:
+    post_save.connect(invalidate_cached_reports, sender=model, dispatch_uid=f'report_cache_post_save_{model.__name__}')
+    post_delete.connect(invalidate_cached_reports, sender=model,
+                        dispatch_uid=f'report_cache_post_delete_{model.__name__}')
+
+m2m_changed.connect(invalidate_cached_reports_on_membership_change, sender=Class.students.through,
+                    dispatch_uid='report_cache_class_students')
+
+# roster submissions and computed term results are written with bulk queries, which send no post_save
+attendance_roster_saved.connect(invalidate_cached_reports_of_roster, sender=Attendance,
+                                dispatch_uid='report_cache_attendance_roster')
+term_results_computed.connect(invalidate_cached_reports_of_term_results, sender=TermResult,
+                              dispatch_uid='report_cache_term_results')
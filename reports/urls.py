@@ -2,13 +2,20 @@ from rest_framework.urls import path
 
 from .views import get_institution_overview, get_last_7_days_attendance, get_last_15_days_finance_data, \
     get_teachers_overview, get_teachers_class_attendance, students_report, teachers_report, attendance_report, \
-    get_result_summary, get_result_reports, get_publishers_last_10_days_sales,get_teacher_students,get_teacher_students_list
+    get_result_summary, get_result_reports, get_publishers_last_10_days_sales,get_teacher_students,get_teacher_students_list, \
+    get_attendance_time_series, get_finance_time_series, get_result_analytics_report, get_teachers_dashboard, get_publishers_sales, \
+    get_report_cache_statistics, ReportJobList, ReportJobDetail, get_report_job_result, get_result_positions, \
+    get_chronic_absence
 
 urlpatterns = [
     path('reports/institution-overview', get_institution_overview, name='get_institution_overview'),
     path('reports/attendance/last-7-days', get_last_7_days_attendance, name='get_last_7_days_attendance'),
+    path('reports/attendance/time-series', get_attendance_time_series, name='get_attendance_time_series'),
+    path('reports/attendance/chronic-absence', get_chronic_absence, name='get_chronic_absence'),
     path('reports/finance/last-15-days', get_last_15_days_finance_data, name='get_last_15_days_finance_data'),
+    path('reports/finance/time-series', get_finance_time_series, name='get_finance_time_series'),
 
+    path('reports/teachers-dashboard', get_teachers_dashboard, name='get_teachers_dashboard'),
     path('reports/teachers-overview', get_teachers_overview, name='get_teachers_overview'),
     path('reports/teachers-students', get_teacher_students, name='get_teacher_students'),
     path('reports/teachers-students-list', get_teacher_students_list, name='get_teacher_students_list'),
@@ -18,8 +25,15 @@ urlpatterns = [
     path('reports/teachers-report', teachers_report, name='teachers-report'),
     path('reports/attendance-report', attendance_report, name='attendance-report'),
     path('reports/result-summary', get_result_summary, name='get_result_summary'),
+    path('reports/result-analytics', get_result_analytics_report, name='get_result_analytics_report'),
     path('reports/result-reports', get_result_reports, name='get_result_reports'),
+    path('reports/result-positions', get_result_positions, name='get_result_positions'),
+    path('reports/jobs', ReportJobList.as_view(), name='report_job_list'),
+    path('reports/jobs/<int:pk>', ReportJobDetail.as_view(), name='report_job_detail'),
+    path('reports/jobs/<int:pk>/result', get_report_job_result, name='get_report_job_result'),
+    path('reports/cache-stats', get_report_cache_statistics, name='get_report_cache_statistics'),
 
+    path('reports/publishers-sales', get_publishers_sales, name='get_publishers_sales'),
     path('reports/publishers-last-10-days-sales', get_publishers_last_10_days_sales, name='get_publishers_last_10_days_sales'),
 
 ]
@@ -1,27 +1,36 @@
-from django.db.models import Sum, Q
+from django.db.models import Q
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
 from datetime import datetime, timedelta
 from django.utils import timezone
 
-from academic.models.assignments import Assignment
-from academic.models.exams import Exam
-from academic.models.lesson import Attendance, AttendanceReadSerializer
-from academic.models.term_results import TermResult, TermResultReadSerializer
-from academic.queries import filter_by_academic_year, filter_by_period_day
+from academic.methods.attendance_summaries import CHRONIC_ABSENCE_THRESHOLD, get_chronic_absentees
+from academic.models.lesson import Attendance
 from book_shop.models.book_purchase import BookPurchase
-from employees.models.employees import Employee, EmployeeReadSerializer
-from finance.models.payments import Payment
-from fundamentals.custom_responses import success_w_data, err_forbidden, err_w_msg
+from employees.models.employees import Employee
+from fundamentals.custom_responses import success_w_data, err_forbidden, err_w_msg, streaming_export_response, \
+    EXPORT_FORMATS, err_w_serializer, get_paginated_response
+from fundamentals.storage import get_file_url
 from institutions.methods.academic_year import get_active_academic_year
-from institutions.models.class_subjects import ClassSubject
-from institutions.models.classes import Class
+from institutions.methods.actor_context import get_actor_context
+from institutions.models.academic_years import AcademicYear
 from institutions.models.institution import Institution
-from institutions.models.room import Room
 from institutions.models.subjects import Subject
-from institutions.models.timetables import Period
-from students.models.students import Student, StudentReadSerializer
-from users.permissions import IsTeacher
+from reports.methods.attendance_series import get_attendance_series, get_percentage, ATTENDANCE_GROUPINGS
+from reports.methods.final_reports import REPORT_EXPORTS, compute_report, filter_attendance_by_class, \
+    filter_attendance_by_subject, filter_by_term
+from reports.methods.finance_summary import get_finance_summary
+from reports.methods.institution_overview import get_institution_overview_snapshot
+from reports.methods.report_cache import cached_report, get_report_cache_stats
+from reports.methods.sales_series import get_sales_series
+from reports.methods.teacher_dashboard import get_teacher_overview, \
+    get_teacher_class_attendance, get_teacher_class_student_counts, get_teacher_dashboard, \
+    get_teacher_students_list as get_teacher_students_list_data
+from reports.methods.time_buckets import BUCKETS, parse_date
+from reports.models.report_jobs import ReportJob, ReportJobReadSerializer, ReportJobWriteSerializer
+from students.models.students import Student
+from users.permissions import IsTeacher, IsSuperUser
 
 
 @api_view(['GET'])
@@ -37,65 +46,7 @@ def get_institution_overview(request):
     if institution.organization != request.user.organization:
         return err_forbidden()
 
-    number_of_employees = Employee.objects.filter(
-        institution=params.get('institution')
-    ).count()
-
-    number_of_male_employees = Employee.objects.filter(
-        institution=params.get('institution'),
-        gender='male'
-    ).count()
-
-    number_of_female_employees = Employee.objects.filter(
-        institution=params.get('institution'),
-        gender='female'
-    ).count()
-
-    number_of_students = Student.objects.filter(
-        institution=params.get('institution')
-    ).count()
-
-    number_of_male_students = Student.objects.filter(
-        institution=params.get('institution'),
-        gender='male'
-    ).count()
-
-    number_of_female_students = Student.objects.filter(
-        institution=params.get('institution'),
-        gender='female'
-    ).count()
-
-    # FIX: SHOFIQUL, Subject has no foreign key name institution
-    # number_of_subjects = Subject.objects.filter(
-    #     institution=params.get('institution')
-    # ).count()
-
-    number_of_classes = Class.objects.filter(
-        institution=params.get('institution')
-    ).count()
-
-    number_of_rooms = Room.objects.filter(
-        institution=params.get('institution')
-    ).count()
-
-    current_academic_year = get_active_academic_year(institution)
-    if current_academic_year is None:
-        current_academic_year = 'Academic year not set'
-    # current_academic_year should be string of current_academic_year.start_date and current_academic_year.end_date
-    current_academic_year = f'{current_academic_year.start_date} - {current_academic_year.end_date}'
-
-    return success_w_data(data={
-        'number_of_employees': number_of_employees,
-        'number_of_male_employees': number_of_male_employees,
-        'number_of_female_employees': number_of_female_employees,
-        'number_of_students': number_of_students,
-        'number_of_male_students': number_of_male_students,
-        'number_of_female_students': number_of_female_students,
-        # 'number_of_subjects': number_of_subjects, // TODO: fix by shamimferdous
-        'number_of_classes': number_of_classes,
-        'number_of_rooms': number_of_rooms,
-        'current_academic_year': current_academic_year
-    })
+    return success_w_data(data=get_institution_overview_snapshot(institution))
 
 
 @api_view(['GET'])
@@ -115,27 +66,22 @@ def get_last_7_days_attendance(request):
         institution=params.get('institution')
     ).count()
 
-    start_date = params.get('start_date')
+    start_date = parse_date(params.get('start_date'))
 
-    # parse start_date str (YYYY-MM-DD) to datetime object
-    start_date = datetime.strptime(start_date, '%Y-%m-%d')
+    series = get_attendance_series(
+        Attendance.objects.filter(student__institution=institution),
+        start=start_date - timedelta(days=6),
+        end=start_date,
+    )
 
     results = []
 
-    # loop through the last 7 days
-    for i in range(7):
-        date = start_date - timedelta(days=i)
-        attendance = Attendance.objects.filter(
-            student__institution=params.get('institution'),
-            lesson__date=date,
-            attendance_group__record_late_time=False
-        ).count()
-
-        percentage = (attendance / number_of_students) * 100
+    # latest day first, percentage of the institution's students
+    for point in reversed(series):
         results.append({
-            'date': date,
-            'percentage': percentage,
-            'count': attendance
+            'date': datetime.combine(point['date'], datetime.min.time()),
+            'percentage': get_percentage(point['count'], number_of_students),
+            'count': point['count']
         })
 
     return success_w_data(data=results)
@@ -143,7 +89,7 @@ def get_last_7_days_attendance(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def get_last_15_days_finance_data(request):
+def get_attendance_time_series(request):
     params = request.query_params
 
     institution = Institution.objects.filter(id=params.get('institution')).first()
@@ -154,494 +100,364 @@ def get_last_15_days_finance_data(request):
     if institution.organization != request.user.organization:
         return err_forbidden()
 
-    start_date = params.get('start_date')
+    bucket = params.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        return err_w_msg(f'bucket must be one of {", ".join(BUCKETS)}')
 
-    # parse start_date str (YYYY-MM-DD) to datetime object
-    start_date = datetime.strptime(start_date, '%Y-%m-%d')
+    group_by = params.get('group_by')
+    if group_by is not None and group_by not in ATTENDANCE_GROUPINGS:
+        return err_w_msg(f'group_by must be one of {", ".join(ATTENDANCE_GROUPINGS)}')
 
-    results = []
+    try:
+        end = parse_date(params.get('end'), default=timezone.localdate())
+        start = parse_date(params.get('start'), default=end - timedelta(days=6))
+    except ValueError:
+        return err_w_msg('start and end must be YYYY-MM-DD dates')
 
-    # loop through the last 15 days
-    for i in range(15):
-        number_of_invoice = Payment.objects.filter(
-            institution=params.get('institution'),
-            date=start_date - timedelta(days=i)
-        ).count()
-
-        number_of_paid_invoice = Payment.objects.filter(
-            institution=params.get('institution'),
-            date=start_date - timedelta(days=i),
-            status='paid'
-        ).count()
-
-        number_of_due_invoice = Payment.objects.filter(
-            institution=params.get('institution'),
-            date=start_date - timedelta(days=i),
-            status='due'
-        ).count()
-
-        total_amount = Payment.objects.filter(
-            institution=params.get('institution'),
-            date=start_date - timedelta(days=i),
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-
-        total_paid_amount = Payment.objects.filter(
-            institution=params.get('institution'),
-            date=start_date - timedelta(days=i),
-            status='paid'
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-
-        total_due_amount = Payment.objects.filter(
-            institution=params.get('institution'),
-            date=start_date - timedelta(days=i),
-            status='due'
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-
-        results.append({
-            'date': start_date - timedelta(days=i),
-            'number_of_invoice': number_of_invoice,
-            'number_of_paid_invoice': number_of_paid_invoice,
-            'number_of_due_invoice': number_of_due_invoice,
-            'total_amount': total_amount,
-            'total_paid_amount': total_paid_amount,
-            'total_due_amount': total_due_amount
-        })
-
-    return success_w_data(data=results)
+    if start > end:
+        return err_w_msg('start must be before end')
 
+    queryset = Attendance.objects.filter(
+        Q(student__institution=institution)
+        & filter_attendance_by_class(params.get('_class'))
+        & filter_attendance_by_subject(params.get('subject'))
+        & filter_by_term(params.get('term'))
+    )
 
-#  >>>>>>>>>>>> Teachers Reports <<<<<<<<<<<<<<
+    return success_w_data(data=get_attendance_series(queryset, start, end, bucket=bucket, group_by=group_by))
 
-# get teachers overview
-@api_view(['GET'])
-@permission_classes([IsTeacher])
-def get_teachers_overview(request):
-    employee = Employee.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(employee.institution)
-
-    number_of_classes = ClassSubject.objects.filter(teacher=employee).order_by('-id').count()
-
-    number_of_periods = Period.objects.filter(
-        Q(class_subject__teacher__user=request.user)
-    ).order_by('period').count()
-
-    number_of_exams_taken = Exam.objects.filter(
-        Q(class_subject__teacher__user=request.user) &
-        filter_by_academic_year(active_academic_year)
-    ).order_by('-id').count()
-
-    number_of_assignments_taken = Assignment.objects.filter(
-         Q(class_subject__teacher__user=request.user) &
-        filter_by_academic_year(active_academic_year)
-    ).order_by('-id').count()
-
-    classes = ClassSubject.objects.filter(teacher=employee).values_list('_class_id', flat=True)
-    total_students = Student.objects.filter(
-        classes__id__in=classes,
-        academic_year=active_academic_year
-    ).distinct().count()
-
-    return success_w_data(data={
-        'number_of_classes': number_of_classes,
-        'number_of_periods': number_of_periods,
-        'number_of_exams_taken': number_of_exams_taken,
-        'number_of_assignments_taken': number_of_assignments_taken,
-        'total_students': total_students
-    })
 
-# get teachers class attendance
 @api_view(['GET'])
-@permission_classes([IsTeacher])
-def get_teachers_class_attendance(request):
+@permission_classes([IsAuthenticated])
+def get_chronic_absence(request):
     params = request.query_params
 
-    employee = Employee.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(employee.institution)
+    institution = Institution.objects.filter(id=params.get('institution')).first()
 
-    periods = Period.objects.select_related('class_subject___class', 'class_subject__subject').filter(
-        Q(class_subject__teacher__user=request.user)
-        & filter_by_period_day(params.get('date'))
-    ).order_by('period')
+    if institution is None:
+        return err_w_msg('Institution not found')
 
-    attendance = Attendance.objects.filter(
-        lesson__period__in=periods,
-        academic_year=active_academic_year
-    ).values('attendance_group__name').distinct()
+    if institution.organization != request.user.organization:
+        return err_forbidden()
 
-    results = []
+    if params.get('academic_year'):
+        academic_year = AcademicYear.objects.filter(id=params.get('academic_year'), institution=institution).first()
+    else:
+        academic_year = get_active_academic_year(institution)
 
-    for a in attendance:
-        results.append({
-            'name': a['attendance_group__name'],
-            'count': Attendance.objects.filter(
-                lesson__period__in=periods,
-                academic_year=active_academic_year,
-                attendance_group__name=a['attendance_group__name']
-            ).count()
-        })
+    if academic_year is None:
+        return err_w_msg('AcademicYear not found')
 
-    return success_w_data(data=results)
+    try:
+        threshold = float(params.get('threshold', CHRONIC_ABSENCE_THRESHOLD))
+    except ValueError:
+        return err_w_msg('threshold must be a number')
 
-# total students by classes taught by the teacher
-@api_view(['GET'])
-@permission_classes([IsTeacher])
-def get_teacher_students(request):
-    employee = Employee.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(employee.institution)
-
-    classes = ClassSubject.objects.filter(teacher=employee).values('_class_id', '_class__name')
-
-    if not classes:
-        return success_w_data(data=[])
-
-    class_student_counts = []
-    for class_info in classes:
-        class_id = class_info['_class_id']
-        class_name = class_info['_class__name']
-        student_count = Student.objects.filter(
-            classes__id=class_id,
-            academic_year=active_academic_year
-        ).distinct().count()
-        class_student_counts.append({
-            'class_id': class_id,
-            'class_name': class_name,
-            'student_count': student_count
-        })
+    if not 0 <= threshold <= 100:
+        return err_w_msg('threshold must be between 0 and 100')
+
+    return success_w_data(data=get_chronic_absentees(institution, academic_year, params.get('term'), threshold))
 
-    return success_w_data(data=class_student_counts)
 
-# get teachers students list
 @api_view(['GET'])
-@permission_classes([IsTeacher])
-def get_teacher_students_list(request):
-    employee = Employee.objects.get(user=request.user)
-    active_academic_year = get_active_academic_year(employee.institution)
-
-    # Fetch the classes taught by the teacher
-    classes = ClassSubject.objects.filter(teacher=employee).values_list('_class_id', flat=True)
-
-    # Get filter parameters from the request
-    class_id = request.query_params.get('class_id')
-    gender = request.query_params.get('gender')
-    subject_id = request.query_params.get('subject_id')
-
-    # Fetch the students associated with these classes
-    students = Student.objects.filter(
-        classes__id__in=classes,
-        academic_year=active_academic_year
-    ).distinct()
-
-    # Apply filters
-    if class_id:
-        students = students.filter(classes__id=class_id)
-    if gender:
-        students = students.filter(gender=gender)
-    if subject_id:
-        # Fetch the classes associated with the subject_id
-        class_subjects = ClassSubject.objects.filter(subject_id=subject_id).values_list('_class_id', flat=True)
-        students = students.filter(classes__id__in=class_subjects)
-
-    # Prepare the list of students
-    student_list = []
-    for student in students:
-        student_list.append({
-            'id': student.student_id,
-            'name': f'{student.first_name} {student.last_name}',
-            'email': student.email,
-            '_class': student.classes.filter(id__in=classes).first().name  # Assuming a student can be in multiple classes
-        })
+@permission_classes([IsAuthenticated])
+def get_last_15_days_finance_data(request):
+    params = request.query_params
 
-    return success_w_data(data=student_list)
+    institution = Institution.objects.filter(id=params.get('institution')).first()
 
+    if institution is None:
+        return err_w_msg('Institution not found')
 
+    if institution.organization != request.user.organization:
+        return err_forbidden()
 
-# >>>>>>>>>>>> Final Reports <<<<<<<<<<<<<<
+    start_date = parse_date(params.get('start_date'))
 
-def filter_by_organization(organization):
-    if organization is None:
-        return Q()
-    return Q(institution__organization=organization)
+    series = get_finance_summary(
+        Q(institution=institution),
+        start=start_date - timedelta(days=14),
+        end=start_date,
+    )
 
+    results = []
 
-def filter_by_institution(institution):
-    if institution is None:
-        return Q()
-    return Q(institution=institution)
+    # latest day first
+    for point in reversed(series):
+        point['date'] = datetime.combine(point['date'], datetime.min.time())
+        results.append(point)
 
+    return success_w_data(data=results)
 
-def filter_students_by_grade_level(level):
-    if level is None:
-        return Q()
-    return Q(grade__level=level)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_finance_time_series(request):
+    params = request.query_params
 
-def filter_students_by_class(_class):
-    if _class is None:
-        return Q()
-    return Q(classes=_class)
+    institution = Institution.objects.filter(id=params.get('institution')).first()
 
+    if institution is None:
+        return err_w_msg('Institution not found')
 
-def filter_students_by_subject(subject):
-    if subject is None:
-        return Q()
-    return Q(classes__class_subjects__subject=subject)
+    if institution.organization != request.user.organization:
+        return err_forbidden()
 
+    bucket = params.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        return err_w_msg(f'bucket must be one of {", ".join(BUCKETS)}')
 
-def filter_by_gender(gender):
-    if gender is None:
-        return Q()
-    return Q(gender=gender)
+    try:
+        end = parse_date(params.get('end'), default=timezone.localdate())
+        start = parse_date(params.get('start'), default=end - timedelta(days=14))
+    except ValueError:
+        return err_w_msg('start and end must be YYYY-MM-DD dates')
 
+    if start > end:
+        return err_w_msg('start must be before end')
 
-def filter_students_by_student_type(student_type):
-    if student_type is None:
-        return Q()
-    return Q(student_type=student_type)
+    return success_w_data(data=get_finance_summary(Q(institution=institution), start, end, bucket=bucket))
 
 
-def filter_students_by_payments(term, status):
-    if term is None:
-        return Q()
-    status = status or 'paid'
-    return Q(Q(payments__term=term) & Q(payments__status=status))
+#  >>>>>>>>>>>> Teachers Reports <<<<<<<<<<<<<<
 
+# get teachers overview
+@api_view(['GET'])
+@permission_classes([IsTeacher])
+def get_teachers_overview(request):
+    context = get_actor_context(request, Employee)
+    return success_w_data(data=get_teacher_overview(context['profile'], context['academic_year']))
 
+# get teachers class attendance
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def students_report(request):
+@permission_classes([IsTeacher])
+def get_teachers_class_attendance(request):
     params = request.query_params
 
-    queryset = Student.objects.filter(
-        filter_by_gender(params.get('gender'))
-        & filter_by_organization(params.get('organization'))
-        & filter_by_institution(params.get('institution'))
-        & filter_students_by_grade_level(params.get('level'))
-        & filter_students_by_class(params.get('_class'))
-        & filter_students_by_subject(params.get('subject'))
-        & filter_students_by_student_type(params.get('student_type'))
-        & filter_students_by_payments(params.get('payment_term'), params.get('payment_status'))
-    )
-
-    students_count = queryset.count()
+    context = get_actor_context(request, Employee)
+    results = get_teacher_class_attendance(context['profile'], context['academic_year'], params.get('date'))
 
-    if params.get('data'):
-        students = StudentReadSerializer(queryset, many=True).data
-        return success_w_data(data={
-            'count': students_count,
-            'students': students
-        })
-
-    return success_w_data(data={
-        'count': students_count,
-    })
-
-
-def filter_teachers_by_subject(subject):
-    if subject is None:
-        return Q()
-    return Q(subject_classes__subject=subject)
+    return success_w_data(data=results)
 
+# total students by classes taught by the teacher
+@api_view(['GET'])
+@permission_classes([IsTeacher])
+def get_teacher_students(request):
+    context = get_actor_context(request, Employee)
+    return success_w_data(data=get_teacher_class_student_counts(context['profile'], context['academic_year']))
 
+# get teachers students list
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def teachers_report(request):
+@permission_classes([IsTeacher])
+def get_teacher_students_list(request):
     params = request.query_params
 
-    queryset = Employee.objects.filter(
-        Q(is_teacher=True)
-        & filter_by_organization(params.get('organization'))
-        & filter_by_institution(params.get('institution'))
-        & filter_teachers_by_subject(params.get('subject'))
+    context = get_actor_context(request, Employee)
+    student_list = get_teacher_students_list_data(
+        context['profile'],
+        context['academic_year'],
+        class_id=params.get('class_id'),
+        gender=params.get('gender'),
+        subject_id=params.get('subject_id')
     )
 
-    teachers_count = queryset.count()
-    if params.get('data'):
-        teachers = EmployeeReadSerializer(queryset, many=True).data
+    return success_w_data(data=student_list)
 
-        return success_w_data(data={
-            'count': teachers_count,
-            'teachers': teachers
-        })
+# get every teacher dashboard figure in one request
+@api_view(['GET'])
+@permission_classes([IsTeacher])
+def get_teachers_dashboard(request):
+    context = get_actor_context(request, Employee)
+    return success_w_data(data=get_teacher_dashboard(
+        context['profile'], context['academic_year'], request.query_params.get('date')
+    ))
 
-    return success_w_data(data={
-        'count': teachers_count,
-    })
 
 
-def filter_attendance_or_result_by_organization(organization):
-    if organization is None:
-        return Q()
-    return Q(student__institution__organization=organization)
+# >>>>>>>>>>>> Final Reports <<<<<<<<<<<<<<
 
+def export_report(report, params):
+    """
+    Streams a final report as a csv or ndjson download
+    :param report: key of REPORT_EXPORTS
+    :param params: QueryDict
+    :return: StreamingHttpResponse | Response
+    """
+    if params.get('export') not in EXPORT_FORMATS:
+        return err_w_msg(f'export must be one of {", ".join(EXPORT_FORMATS)}')
 
-def filter_attendance_or_result_by_institution(institution):
-    if institution is None:
-        return Q()
-    return Q(student__institution=institution)
+    get_queryset, columns, file_name = REPORT_EXPORTS[report]
+    return streaming_export_response(get_queryset(params).order_by('id'), columns, params.get('export'), file_name)
 
 
-def filter_attendance_by_subject(subject):
-    if subject is None:
-        return Q()
-    return Q(lesson__period__class_subject__subject=subject)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_report('students_report')
+def students_report(request):
+    params = request.query_params
 
+    if params.get('export'):
+        return export_report('students_report', params)
 
-def filter_attendance_or_result_by_level(level):
-    if level is None:
-        return Q()
-    return Q(student__grade__level=level)
+    return success_w_data(data=compute_report('students_report', params))
 
 
-def filter_attendance_or_result_by_grade(grade):
-    if grade is None:
-        return Q()
-    return Q(student__grade__level=grade)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_report('teachers_report')
+def teachers_report(request):
+    params = request.query_params
 
+    if params.get('export'):
+        return export_report('teachers_report', params)
 
-def filter_by_term(term):
-    if term is None:
-        return Q()
-    return Q(term=term)
+    return success_w_data(data=compute_report('teachers_report', params))
 
 
-def filter_attendance_by_date_range(start, end):
-    if start and end is not None:
-        return Q(lesson__date__range=[start, end])
-    return Q()
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_report('attendance_report')
+def attendance_report(request):
+    params = request.query_params
 
+    if params.get('export'):
+        return export_report('attendance_report', params)
 
-def filter_attendance_by_class(_class):
-    if _class is None:
-        return Q()
-    return Q(lesson__period__class_subject___class=_class)
+    return success_w_data(data=compute_report('attendance_report', params))
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def attendance_report(request):
-    params = request.query_params
+@cached_report('result_summary')
+def get_result_summary(request):
+    return success_w_data(data=compute_report('result_summary', request.query_params))
 
-    queryset = Attendance.objects.filter(
-        filter_attendance_or_result_by_organization(params.get('organization'))
-        & filter_attendance_or_result_by_institution(params.get('institution'))
-        & filter_attendance_by_subject(params.get('subject'))
-        & filter_attendance_or_result_by_level(params.get('level'))
-        & filter_attendance_or_result_by_grade(params.get('grade'))
-        & filter_by_term(params.get('term'))
-        & filter_attendance_by_date_range(params.get('start'), params.get('end'))
-        & filter_attendance_by_class(params.get('_class'))
-    )
 
-    attendance_count = queryset.count()
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_report('result_analytics')
+def get_result_analytics_report(request):
+    try:
+        results = compute_report('result_analytics', request.query_params)
+    except ValueError:
+        return err_w_msg('percentiles must be comma separated numbers between 0 and 100')
 
-    if params.get('data'):
-        attendance = AttendanceReadSerializer(queryset, many=True).data
+    return success_w_data(data=results)
 
-        return success_w_data(data={
-            'count': attendance_count,
-            'attendance': attendance
-        })
 
-    return success_w_data(data={
-        'count': attendance_count,
-    })
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_report('result_reports')
+def get_result_reports(request):
+    return success_w_data(data=compute_report('result_reports', request.query_params))
 
 
-GRADE_LIST = ['A', 'B', 'C', 'D', 'E', 'F']
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_report('result_positions')
+def get_result_positions(request):
+    return success_w_data(data=compute_report('result_positions', request.query_params))
+
 
+# >>>>>>>>>>>> Report Jobs <<<<<<<<<<<<<<
 
-def filter_results_by_subject(subject):
-    if subject is None:
-        return Q()
-    return Q(class_subject__subject=subject)
+class ReportJobList(APIView):
+    permission_classes = [IsAuthenticated]
 
+    @staticmethod
+    def get(request):
+        # the stored results are only read by the result endpoint
+        jobs = ReportJob.objects.filter(user=request.user).defer('result').order_by('-id')
+        return get_paginated_response(request, jobs, ReportJobReadSerializer)
 
-def filter_results_by_class(_class):
-    if _class is None:
-        return Q()
-    return Q(class_subject___class=_class)
+    @staticmethod
+    def post(request):
+        serializer = ReportJobWriteSerializer(data=request.data)
+        if serializer.is_valid():
+            job = serializer.save(user=request.user, organization=request.user.organization)
+            return success_w_data(ReportJobReadSerializer(job).data, msg='Report queued', status=202)
+        return err_w_serializer(serializer.errors)
 
 
-def filter_results_by_student(student):
-    if student is None:
-        return Q()
-    return Q(student=student)
+class ReportJobDetail(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @staticmethod
+    def get(request, pk):
+        job = ReportJob.objects.filter(pk=pk, user=request.user).defer('result').first()
+        if job is None:
+            return err_w_msg('Report job not found', status=404)
+        return success_w_data(ReportJobReadSerializer(job).data)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def get_result_summary(request):
-    params = request.query_params
+def get_report_job_result(request, pk):
+    job = ReportJob.objects.filter(pk=pk, user=request.user).first()
 
-    queryset = TermResult.objects.filter(
-        filter_attendance_or_result_by_organization(params.get('organization'))
-        & filter_attendance_or_result_by_institution(params.get('institution'))
-        & filter_by_term(params.get('term'))
-        & filter_attendance_or_result_by_level(params.get('level'))
-        & filter_results_by_subject(params.get('subject'))
-        & filter_results_by_class(params.get('_class'))
-    )
+    if job is None:
+        return err_w_msg('Report job not found', status=404)
 
-    results = []
+    if job.status != 'completed':
+        return err_w_msg(f'Report job is {job.status}', status=409)
 
-    print(queryset.count())
+    if job.export_format:
+        url = get_file_url(job.file_key, f'{job.report}-{job.id}.{job.export_format}')
+        return success_w_data(data={'url': url})
 
-    for grade in GRADE_LIST:
-        count = queryset.filter(grade__iexact=grade).count()
-        results.append({
-            'grade': grade,
-            'count': count
-        })
+    return success_w_data(data=job.result)
 
-    return success_w_data(data=results)
+
+@api_view(['GET'])
+@permission_classes([IsSuperUser])
+def get_report_cache_statistics(request):
+    return success_w_data(data=get_report_cache_stats())
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def get_result_reports(request):
-    params = request.query_params
+def get_publishers_last_10_days_sales(request):
+    publisher = request.query_params.get('publisher')
 
-    queryset = TermResult.objects.filter(
-        filter_attendance_or_result_by_organization(params.get('organization'))
-        & filter_attendance_or_result_by_institution(params.get('institution'))
-        & filter_by_term(params.get('term'))
-        & filter_attendance_or_result_by_level(params.get('level'))
-        & filter_results_by_subject(params.get('subject'))
-        & filter_results_by_class(params.get('_class'))
-        & filter_results_by_student(params.get('student'))
-    ).order_by('-total_marks')
+    current_date = timezone.localdate()
+    start_date = current_date - timedelta(days=9)
 
-    results = TermResultReadSerializer(queryset, many=True).data
+    results = get_sales_series(
+        BookPurchase.objects.filter(book__publisher=publisher),
+        start=start_date,
+        end=current_date,
+    )
 
     return success_w_data(data=results)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def get_publishers_last_10_days_sales(request):
-    publisher = request.query_params.get('publisher')
+def get_publishers_sales(request):
+    params = request.query_params
 
-    current_date = timezone.now().date()
-    start_date = current_date - timedelta(days=9)
+    publisher = params.get('publisher')
+    if not publisher:
+        return err_w_msg('publisher is required')
 
-    results = []
+    bucket = params.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        return err_w_msg(f'bucket must be one of {", ".join(BUCKETS)}')
 
-    for i in range(10):
-        date = start_date + timedelta(days=i)
-        queryset = BookPurchase.objects.filter(
-            purchase_date__day=date.day,
-            purchase_date__month=date.month,
-            purchase_date__year=date.year,
-            book__publisher=publisher,
-        )
-        total_sales = queryset.aggregate(Sum('total_price'))['total_price__sum'] or 0
+    try:
+        end = parse_date(params.get('end'), default=timezone.localdate())
+        start = parse_date(params.get('start'), default=end - timedelta(days=9))
+    except ValueError:
+        return err_w_msg('start and end must be YYYY-MM-DD dates')
 
-        unit_sold = queryset.count()
+    if start > end:
+        return err_w_msg('start must be before end')
 
-        results.append({
-            'date': date,
-            'total_sales': total_sales,
-            'unit_sold': unit_sold
-        })
+    results = get_sales_series(
+        BookPurchase.objects.filter(book__publisher=publisher),
+        start=start,
+        end=end,
+        bucket=bucket,
+    )
 
     return success_w_data(data=results)
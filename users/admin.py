@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import User
+from .models import User, RefreshToken, RevokedToken
 
 admin.site.register(User)
 
+admin.site.register(RefreshToken)
+admin.site.register(RevokedToken)
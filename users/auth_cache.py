@@ -0,0 +1,143 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import User
+
+# the shared cache holds authenticated users for a short while. It is only used with a shared backend
+# (settings.SHARED_CACHE): a per process cache would miss the invalidations made by the other processes
+AUTH_CACHE_TIMEOUT = 60
+
+# every invalidation bumps the user's version; a cached user of an older version is a miss, so a user loaded
+# before a save and cached after its invalidation is never served. Versions outlive the entries they check
+AUTH_VERSION_TIMEOUT = 24 * 60 * 60
+
+# the process-local cache answers without a network round trip, but is only invalidated in the process that
+# saved the user: a user changed elsewhere is seen at most this many seconds late
+AUTH_LOCAL_CACHE_TIMEOUT = 5
+
+AUTH_LOCAL_CACHE_SIZE = 2048
+
+
+class LocalUserCache:
+    """
+    Thread-safe LRU of pickled users with a per-entry expiry.
+    Users are stored pickled so every request gets its own copy to read and modify.
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+
+            expires_at, data = entry
+            if expires_at < time.monotonic():
+                del self.entries[user_id]
+                return None
+
+            self.entries.move_to_end(user_id)
+        return pickle.loads(data)
+
+    def set(self, user_id, data):
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + self.timeout, data)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_user_cache = LocalUserCache(AUTH_LOCAL_CACHE_SIZE, AUTH_LOCAL_CACHE_TIMEOUT)
+
+
+def get_auth_cache_key(user_id) -> str:
+    return f'auth:user:{user_id}'
+
+
+def get_auth_version_key(user_id) -> str:
+    return f'auth:user-version:{user_id}'
+
+
+def load_user(user_id):
+    return User.objects.select_related('organization').filter(id=user_id).first()
+
+
+def get_authenticated_user(user_id):
+    """
+    Returns the user of a verified token with their organization, from the process-local cache, then the shared
+    cache, then the database. Without a shared cache every call reads the database.
+    :param user_id: pk from the token payload
+    :return: User | None
+    """
+    if not settings.SHARED_CACHE:
+        return load_user(user_id)
+
+    user = local_user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    key = get_auth_cache_key(user_id)
+    version_key = get_auth_version_key(user_id)
+    cached = cache.get_many([key, version_key])
+    version = cached.get(version_key, 0)
+
+    entry = cached.get(key)
+    if entry is not None and entry[0] == version:
+        data = entry[1]
+        user = pickle.loads(data)
+    else:
+        # the version is read before the user: an invalidation in between makes this entry a miss
+        user = load_user(user_id)
+        if user is None:
+            return None
+        data = pickle.dumps(user)
+        cache.set(key, (version, data), AUTH_CACHE_TIMEOUT)
+
+    local_user_cache.set(user_id, data)
+    return user
+
+
+def bump_auth_version(user_id):
+    version_key = get_auth_version_key(user_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        # no version yet: any entry was cached as version 0
+        if not cache.add(version_key, 1, AUTH_VERSION_TIMEOUT):
+            cache.incr(version_key)
+
+
+def invalidate_authenticated_users(user_ids):
+    """
+    Drops cached users, e.g. after a save, a deactivation or a password change
+    :param user_ids: iterable of pks
+    :return: None
+    """
+    user_ids = list(user_ids)
+    for user_id in user_ids:
+        local_user_cache.delete(user_id)
+
+    if not settings.SHARED_CACHE:
+        return
+
+    for user_id in user_ids:
+        bump_auth_version(user_id)
+    cache.delete_many([get_auth_cache_key(user_id) for user_id in user_ids])
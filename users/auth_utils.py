@@ -1,26 +1,44 @@
 import datetime
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
 
 from core.settings import SECRET_KEY
 import jwt
 
-from .models import User
+from .models import User, RefreshToken
+from .token_revocation import purge_expired_revocations, revoke_key
+
+
+ACCESS_TOKEN_LIFETIME = datetime.timedelta(minutes=15)
+
+REFRESH_TOKEN_LIFETIME = datetime.timedelta(days=30)
+
+# a replaced refresh token used again within this window (concurrent refreshes, a retry after a dropped response)
+# gets the successor already issued instead of revoking its family
+REFRESH_REUSE_WINDOW = datetime.timedelta(seconds=30)
 
 
 # defining access_token_generator function
-def access_token_generator(user, days=29):
-    """generates and returns an access token
+def access_token_generator(user, family=None):
+    """generates and returns a short-lived access token
     Args:
         user (User): The user for which the token will be generated
-        days : Number of days the token will be valid
+        family (str): The refresh token family the token is issued from, revoked together with it
     Returns:
         str: access token
     """
 
     payload = {
         'id': user.id,
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=days, minutes=155),
+        'jti': uuid.uuid4().hex,
+        'type': 'access',
+        'exp': datetime.datetime.utcnow() + ACCESS_TOKEN_LIFETIME,
         'iat': datetime.datetime.utcnow()
     }
+    if family is not None:
+        payload['family'] = family
 
     access_token = jwt.encode(payload,
                               SECRET_KEY, algorithm='HS256')
@@ -29,17 +47,39 @@ def access_token_generator(user, days=29):
 
 
 # defining refresh_token_generator function
-def refresh_token_generator(user):
-    """generates and returns an refresh token
+def refresh_token_generator(user, family=None, jti=None):
+    """generates, stores and returns a refresh token
     Args:
         user (User): The user for which the token will be generated
+        family (str): The family of the token being rotated, a new family when None
+        jti (str): The id of the token, a new one when None
+    Returns:
+        str: refresh token
+    """
+
+    jti = jti or uuid.uuid4().hex
+    family = family or uuid.uuid4().hex
+    expires_at = timezone.now() + REFRESH_TOKEN_LIFETIME
+
+    stored = RefreshToken.objects.create(jti=jti, family=family, user=user, expires_at=expires_at)
+
+    return encode_refresh_token(stored)
+
+
+def encode_refresh_token(stored):
+    """encodes a stored refresh token
+    Args:
+        stored (RefreshToken): The stored token
     Returns:
         str: refresh token
     """
 
     payload = {
-        'id': user.id,
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=7),
+        'id': stored.user_id,
+        'jti': stored.jti,
+        'family': stored.family,
+        'type': 'refresh',
+        'exp': stored.expires_at,
         'iat': datetime.datetime.utcnow()
     }
 
@@ -49,6 +89,112 @@ def refresh_token_generator(user):
     return refresh_token
 
 
+def issue_tokens(user, family=None) -> dict:
+    """
+    Issues an access token and a refresh token of the same family
+    :param user: User
+    :param family: str | None for a new login
+    :return: dict with access_token and refresh_token
+    """
+    family = family or uuid.uuid4().hex
+    return {
+        'refresh_token': refresh_token_generator(user, family),
+        'access_token': access_token_generator(user, family),
+    }
+
+
+def revoke_token_family(family):
+    """
+    Revokes every refresh token of a family and the access tokens issued from them
+    :param family: str
+    :return: None
+    """
+    RefreshToken.objects.filter(family=family, revoked_at__isnull=True).update(revoked_at=timezone.now())
+    # access tokens of the family expire at most one lifetime after their refresh token was last used
+    revoke_key(family, timezone.now() + ACCESS_TOKEN_LIFETIME)
+
+
+def revoke_user_tokens(user):
+    """
+    Revokes every token family of a user, e.g. after a password reset or a deactivation
+    :param user: User
+    :return: None
+    """
+    families = RefreshToken.objects.filter(
+        user=user, revoked_at__isnull=True, expires_at__gt=timezone.now()
+    ).values_list('family', flat=True).distinct()
+
+    for family in list(families):
+        revoke_token_family(family)
+
+
+def rotate_refresh_token(refresh_token) -> dict:
+    """
+    Exchanges a refresh token for a new access token and refresh token of the same family.
+    A refresh token used again within REFRESH_REUSE_WINDOW gets the successor already issued, as long as that one
+    is unused. Used again later, it has been stolen or leaked: its whole family is revoked.
+    :param refresh_token: str
+    :return: dict with access_token and refresh_token, raises ValueError when the token is refused
+    """
+    try:
+        payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        raise ValueError('Expired')
+    except jwt.DecodeError:
+        raise ValueError('Invalid Credentials')
+
+    if payload.get('type') != 'refresh':
+        raise ValueError('Invalid Credentials')
+
+    reused = False
+
+    with transaction.atomic():
+        stored = RefreshToken.objects.select_for_update().select_related('user').filter(jti=payload['jti']).first()
+        if stored is None or stored.revoked_at is not None:
+            raise ValueError('Revoked')
+
+        successor = None
+        if stored.replaced_by is not None:
+            if stored.replaced_at is not None and timezone.now() - stored.replaced_at <= REFRESH_REUSE_WINDOW:
+                successor = RefreshToken.objects.filter(
+                    jti=stored.replaced_by, replaced_by__isnull=True, revoked_at__isnull=True
+                ).first()
+            reused = successor is None
+
+        if not reused:
+            if not stored.user.is_active:
+                raise ValueError('User account not activated')
+
+            if successor is not None:
+                new_refresh_token = encode_refresh_token(successor)
+            else:
+                jti = uuid.uuid4().hex
+                new_refresh_token = refresh_token_generator(stored.user, stored.family, jti)
+                stored.replaced_by = jti
+                stored.replaced_at = timezone.now()
+                stored.save(update_fields=['replaced_by', 'replaced_at'])
+
+            tokens = {
+                'refresh_token': new_refresh_token,
+                'access_token': access_token_generator(stored.user, stored.family),
+            }
+
+    if reused:
+        revoke_token_family(stored.family)
+        raise ValueError('Revoked')
+
+    return tokens
+
+
+def purge_expired_tokens() -> int:
+    """
+    Deletes expired refresh tokens and the revocations of expired tokens, run by the scheduler (see SCHEDULED_JOBS)
+    :return: number of rows deleted
+    """
+    refresh_tokens, _ = RefreshToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return refresh_tokens + purge_expired_revocations()
+
+
 def generate_username(full_name):
     # Extract first name and last name
     first_name, *last_name_parts = full_name.split()
@@ -3,7 +3,9 @@ from rest_framework.authentication import BaseAuthentication
 from django.middleware.csrf import CsrfViewMiddleware
 from rest_framework import exceptions
 from django.conf import settings
-from users.models import User
+from django.utils import timezone
+from users.auth_cache import get_authenticated_user
+from users.token_revocation import is_token_revoked
 from core.settings import SECRET_KEY
 
 
@@ -37,8 +39,20 @@ class CustomJwtAuth(BaseAuthentication):
         except jwt.DecodeError:
             raise exceptions.AuthenticationFailed('Invalid Credentials')
 
-        # querying the user
-        user = User.objects.filter(id=payload['id']).first()
+        # refresh tokens are only accepted by the refresh endpoint
+        if payload.get('type') == 'refresh':
+            raise exceptions.AuthenticationFailed('Invalid Credentials')
+
+        # tokens issued before rotation have no type nor jti and cannot be revoked
+        if 'type' not in payload and settings.LEGACY_TOKEN_CUTOVER is not None \
+                and timezone.now() >= settings.LEGACY_TOKEN_CUTOVER:
+            raise exceptions.AuthenticationFailed('Expired')
+
+        if is_token_revoked(payload):
+            raise exceptions.AuthenticationFailed('Revoked')
+
+        # the user and their organization, cached between requests
+        user = get_authenticated_user(payload['id'])
 
         if user is None:
             raise exceptions.AuthenticationFailed('User not found')
@@ -47,7 +61,7 @@ class CustomJwtAuth(BaseAuthentication):
             raise exceptions.AuthenticationFailed('User account not activated')
 
         # self.enforce_csrf(request)
-        return (user, None)
+        return (user, payload)
 
     # def enforce_csrf(self, request):
     #     """
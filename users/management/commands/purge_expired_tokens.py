@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users.auth_utils import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired refresh tokens and the revocations of expired tokens'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_tokens()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} expired tokens and revocations deleted'))
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.2 on 2026-10-18 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_refresh_and_revoked_tokens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='refreshtoken',
+            name='replaced_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
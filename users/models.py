@@ -100,3 +100,30 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return f'{self.username} - {self.role}'
+
+
+class RefreshToken(models.Model):
+    """
+    An issued refresh token. Every refresh rotates it: the token is marked as replaced and a new one of the same
+    family is issued, so presenting a replaced token again reveals a stolen token and revokes the whole family.
+    Within REFRESH_REUSE_WINDOW of replaced_at, a concurrent or retried refresh gets the successor instead.
+    """
+    jti = models.CharField(max_length=32, unique=True)
+    family = models.CharField(max_length=32, db_index=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='refresh_tokens')
+    expires_at = models.DateTimeField()
+    replaced_by = models.CharField(max_length=32, null=True, blank=True)
+    replaced_at = models.DateTimeField(null=True, blank=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class RevokedToken(models.Model):
+    """
+    A revoked access token (by jti) or token family, kept until the tokens it covers have expired
+    """
+    key = models.CharField(max_length=32, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+
+from institutions.models.organization import Organization
+from users.auth_cache import invalidate_authenticated_users
+from users.models import User
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    # saves cover deactivation and password changes
+    invalidate_authenticated_users([instance.pk])
+
+
+def invalidate_cached_organization_users(sender, instance, **kwargs):
+    # cached users carry their organization
+    invalidate_authenticated_users(User.objects.filter(organization=instance).values_list('id', flat=True))
+
+
+post_save.connect(invalidate_cached_user, sender=User, dispatch_uid='auth_cache_post_save_user')
+post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid='auth_cache_post_delete_user')
+post_save.connect(invalidate_cached_organization_users, sender=Organization,
+                  dispatch_uid='auth_cache_post_save_organization')
@@ -1,3 +1,103 @@
-from django.test import TestCase
+import math
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from users.token_revocation import (
+    BLOOM_FALSE_POSITIVE_RATE, BLOOM_MIN_CAPACITY, BloomFilter, RevocationList, get_revocation_keys
+)
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom_filter = BloomFilter(5000)
+        keys = [f'revoked-{index}' for index in range(5000)]
+        for key in keys:
+            bloom_filter.add(key)
+
+        self.assertTrue(all(key in bloom_filter for key in keys))
+
+    def test_false_positive_rate_at_capacity(self):
+        bloom_filter = BloomFilter(5000)
+        for index in range(5000):
+            bloom_filter.add(f'revoked-{index}')
+
+        probes = 20000
+        false_positives = sum(f'valid-{index}' in bloom_filter for index in range(probes))
+        self.assertLess(false_positives / probes, BLOOM_FALSE_POSITIVE_RATE * 3)
+
+    def test_sizing(self):
+        bloom_filter = BloomFilter(10000)
+        expected_size = math.ceil(-10000 * math.log(BLOOM_FALSE_POSITIVE_RATE) / math.log(2) ** 2)
+
+        self.assertEqual(bloom_filter.size, expected_size)
+        self.assertEqual(len(bloom_filter.bits), (expected_size + 7) // 8)
+        self.assertEqual(bloom_filter.hash_count, round(expected_size / 10000 * math.log(2)))
+
+    def test_small_filters_use_the_minimum_capacity(self):
+        self.assertEqual(BloomFilter(0).size, BloomFilter(BLOOM_MIN_CAPACITY).size)
+        self.assertNotIn('anything', BloomFilter(0))
+
+    def test_positions_are_in_range_and_stable(self):
+        bloom_filter = BloomFilter(10)
+        positions = list(bloom_filter.get_positions('key'))
+
+        self.assertEqual(len(positions), bloom_filter.hash_count)
+        self.assertTrue(all(0 <= position < bloom_filter.size for position in positions))
+        self.assertEqual(positions, list(BloomFilter(10).get_positions('key')))
+
+
+class RevocationListTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch('users.token_revocation.RevokedToken')
+        self.revoked_tokens = patcher.start().objects.filter.return_value.values_list
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch('users.token_revocation.time.monotonic', return_value=1000)
+        self.monotonic = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_first_check_syncs(self):
+        self.revoked_tokens.return_value = ['jti-1']
+        revocation_list = RevocationList(sync_interval=30)
+
+        self.assertTrue(revocation_list.might_contain(['jti-1']))
+        self.assertFalse(revocation_list.might_contain(['jti-2']))
+        self.assertEqual(self.revoked_tokens.call_count, 1)
+
+    def test_resyncs_after_the_interval_only(self):
+        self.revoked_tokens.return_value = []
+        revocation_list = RevocationList(sync_interval=30)
+        self.assertFalse(revocation_list.might_contain(['jti-1']))
+
+        # revoked by another process
+        self.revoked_tokens.return_value = ['jti-1']
+
+        self.monotonic.return_value = 1030
+        self.assertFalse(revocation_list.might_contain(['jti-1']))
+
+        self.monotonic.return_value = 1031
+        self.assertTrue(revocation_list.might_contain(['jti-1']))
+        self.assertEqual(self.revoked_tokens.call_count, 2)
+
+    def test_local_revocations_are_seen_at_once(self):
+        self.revoked_tokens.return_value = []
+        revocation_list = RevocationList(sync_interval=30)
+        revocation_list.might_contain(['jti-1'])
+
+        revocation_list.add('jti-1')
+        self.assertTrue(revocation_list.might_contain(['jti-1']))
+        self.assertEqual(self.revoked_tokens.call_count, 1)
+
+    def test_any_key_matches(self):
+        self.revoked_tokens.return_value = ['family-1']
+        revocation_list = RevocationList()
+
+        self.assertTrue(revocation_list.might_contain(['jti-1', 'family-1']))
+
+
+class RevocationKeysTests(SimpleTestCase):
+    def test_keys_of_a_payload(self):
+        self.assertEqual(get_revocation_keys({'jti': 'a', 'family': 'b'}), ['a', 'b'])
+        self.assertEqual(get_revocation_keys({'jti': 'a'}), ['a'])
+        self.assertEqual(get_revocation_keys({}), [])
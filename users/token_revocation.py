@@ -0,0 +1,115 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.utils import timezone
+
+from .models import RevokedToken
+
+# seconds between two loads of the revocation list, a token revoked by another process is refused at most
+# this late; revocations made in this process are seen at once
+REVOCATION_SYNC_INTERVAL = 30
+
+BLOOM_FALSE_POSITIVE_RATE = 0.001
+
+BLOOM_MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """
+    Set membership with no false negatives and a bounded false positive rate, in a fixed bit array
+    """
+
+    def __init__(self, capacity, false_positive_rate=BLOOM_FALSE_POSITIVE_RATE):
+        capacity = max(capacity, BLOOM_MIN_CAPACITY)
+        self.size = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def get_positions(self, key):
+        # double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return ((first + index * second) % self.size for index in range(self.hash_count))
+
+    def add(self, key):
+        for position in self.get_positions(key):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, key):
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self.get_positions(key))
+
+
+class RevocationList:
+    """
+    Process-local Bloom filter of the revoked token keys, rebuilt from the database every sync interval.
+    A key absent from the filter is certainly not revoked, so the common case costs no query.
+    """
+
+    def __init__(self, sync_interval=REVOCATION_SYNC_INTERVAL):
+        self.sync_interval = sync_interval
+        self.lock = threading.Lock()
+        self.bloom_filter = None
+        self.synced_at = 0
+
+    def sync(self):
+        keys = list(RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list('key', flat=True))
+
+        bloom_filter = BloomFilter(len(keys))
+        for key in keys:
+            bloom_filter.add(key)
+
+        with self.lock:
+            self.bloom_filter = bloom_filter
+            self.synced_at = time.monotonic()
+
+    def might_contain(self, keys) -> bool:
+        if self.bloom_filter is None or time.monotonic() - self.synced_at > self.sync_interval:
+            self.sync()
+        return any(key in self.bloom_filter for key in keys)
+
+    def add(self, key):
+        with self.lock:
+            if self.bloom_filter is not None:
+                self.bloom_filter.add(key)
+
+
+revocation_list = RevocationList()
+
+
+def get_revocation_keys(payload) -> list:
+    return [key for key in (payload.get('jti'), payload.get('family')) if key]
+
+
+def is_token_revoked(payload) -> bool:
+    """
+    Checks a decoded token against the revocation list: the Bloom filter first, the database only for keys it
+    might contain
+    :param payload: decoded JWT
+    :return: bool
+    """
+    keys = get_revocation_keys(payload)
+    if not keys or not revocation_list.might_contain(keys):
+        return False
+    return RevokedToken.objects.filter(key__in=keys, expires_at__gt=timezone.now()).exists()
+
+
+def revoke_key(key, expires_at):
+    """
+    Revokes an access token (jti) or a token family until the tokens it covers expire
+    :param key: jti | family
+    :param expires_at: aware datetime
+    :return: None
+    """
+    RevokedToken.objects.update_or_create(key=key, defaults={'expires_at': expires_at})
+    revocation_list.add(key)
+
+
+def purge_expired_revocations() -> int:
+    """
+    Deletes the revocations of tokens that have expired anyway
+    :return: number of revocations deleted
+    """
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
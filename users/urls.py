@@ -1,9 +1,12 @@
 from rest_framework.urls import path
 
-from users.views import login, authenticate, register, get_all_users, change_user_active_status, forgot_password, reset_password
+from users.views import login, authenticate, register, get_all_users, change_user_active_status, forgot_password, reset_password, \
+    refresh_token, logout
 
 urlpatterns = [
     path('users/login', login, name='login'),
+    path('users/refresh-token', refresh_token, name='refresh_token'),
+    path('users/logout', logout, name='logout'),
     path('users/authenticate', authenticate, name='authenticate'),
     path('users/register', register, name='register'),
     path('admin/users', get_all_users, name='get_all_users'),
@@ -1,4 +1,4 @@
-import threading
+from datetime import datetime, timezone as dt_timezone
 
 from django.contrib.auth.models import update_last_login
 from django.db.models import Q
@@ -6,6 +6,7 @@ from django.utils import timezone
 from nanoid import generate
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.status import HTTP_401_UNAUTHORIZED
 
 from book_shop.models.publisher_users import PublisherUser
 from book_shop.models.publishers import Publisher
@@ -13,12 +14,12 @@ from employees.models.employees import Employee
 from finance.models.invoices import Invoice, InvoicesReadSerializer
 from fundamentals.custom_responses import err_w_msg, success_w_data, get_paginated_response, success_w_msg
 from fundamentals.email import send_email
-from institutions.methods.generate_invoices import generate_invoices
 from students.models.students import Student
-from users.auth_utils import access_token_generator
+from users.auth_utils import issue_tokens, rotate_refresh_token, revoke_token_family, revoke_user_tokens
 from users.models import User
 from users.permissions import IsSuperUser
 from users.serializers import UserSerializer, UserRegistrationSerializer
+from users.token_revocation import revoke_key
 
 
 @api_view(['POST'])
@@ -42,9 +43,36 @@ def login(request):
     # updating user last login
     update_last_login(None, user)
     user_data = UserSerializer(user, many=False).data
-    access_token = access_token_generator(user)
+    tokens = issue_tokens(user)
 
-    return success_w_data({'user': user_data, 'access_token': access_token}, 'Login successful')
+    return success_w_data({'user': user_data, **tokens}, 'Login successful')
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def refresh_token(request):
+    if not request.data.get('refresh_token'):
+        return err_w_msg('refresh_token is required')
+
+    try:
+        tokens = rotate_refresh_token(request.data['refresh_token'])
+    except ValueError as e:
+        return err_w_msg(str(e), status=HTTP_401_UNAUTHORIZED)
+
+    return success_w_data(tokens, 'Token refreshed successfully')
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout(request):
+    payload = request.auth or {}
+
+    if payload.get('family'):
+        revoke_token_family(payload['family'])
+    elif payload.get('jti'):
+        revoke_key(payload['jti'], datetime.fromtimestamp(payload['exp'], tz=dt_timezone.utc))
+
+    return success_w_msg('Logout successful')
 
 
 @api_view(['GET'])
@@ -85,8 +113,6 @@ def authenticate(request):
     if unpaid_invoice:
         user_data['unpaid_invoice'] = InvoicesReadSerializer(unpaid_invoice).data
 
-    threading.Thread(target=generate_invoices, args=()).start()
-
     return success_w_data(user_data, 'User authenticated successfully')
 
 
@@ -206,6 +232,9 @@ def change_user_active_status(request, pk):
     user.is_active = not user.is_active
     user.save()
 
+    if not user.is_active:
+        revoke_user_tokens(user)
+
     return success_w_data(UserSerializer(user).data, 'User status updated successfully')
 
 
@@ -254,4 +283,7 @@ def reset_password(request):
     user.reset_code = None
     user.save()
 
+    # sessions opened with the previous password are closed
+    revoke_user_tokens(user)
+
     return success_w_msg('Password reset successfully')